@@ -0,0 +1,181 @@
+"""Benchmark of fim's page cache footprint on a co-resident workload.
+
+A background thread plays a service with a hot working set: it reads random
+4 KiB pages of a hot file and counts how many are served from the page
+cache. While it runs, fim scans a cold tree in each cache mode. Reported are
+the workload's cache hit rate during the scan, how much of the hot file is
+still cached afterwards and how much of the scanned tree the scan left in
+the cache.
+
+Pages are only evicted under memory pressure, so for the hit rate to move,
+run with a memory limit below the size of the tree plus the hot file, e.g.:
+
+    systemd-run --user --scope -p MemoryMax=768M \\
+        python benchmarks/bench_cache.py --tree-mb 2048 --hot-mb 256
+
+Needs Linux: page residency is probed with RWF_NOWAIT reads and mincore().
+
+Usage:
+    python benchmarks/bench_cache.py [--tree-mb N] [--hot-mb N] [--dir PATH]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from fim.baseline import scan_baseline
+from fim.models import ScanOptions
+from fim.pagecache import CACHE_MODES, resident_pages
+
+from synthetic import TreeSpec, generate_tree
+
+_PAGE = 4096
+
+
+class Workload(threading.Thread):
+    """Reads random pages of a hot file, counting page cache hits."""
+    
+    def __init__(self, path: Path, seed: int = 0):
+        super().__init__(daemon=True)
+        self.fd = os.open(path, os.O_RDONLY)
+        self.pages = os.fstat(self.fd).st_size // _PAGE
+        self.rng = random.Random(seed)
+        self.buffer = bytearray(_PAGE)
+        self.hits = 0
+        self.misses = 0
+        self.stopping = threading.Event()
+        # Random access: read-ahead would count the workload's own reads as hits
+        os.posix_fadvise(self.fd, 0, 0, os.POSIX_FADV_RANDOM)
+    
+    def warm(self) -> None:
+        """Bring the whole hot file into the page cache."""
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        while os.read(self.fd, 1 << 20):
+            pass
+    
+    def run(self) -> None:
+        while not self.stopping.is_set():
+            offset = self.rng.randrange(self.pages) * _PAGE
+            try:
+                os.preadv(self.fd, [self.buffer], offset, os.RWF_NOWAIT)
+                self.hits += 1
+            except BlockingIOError:
+                # A miss: the service reads the page from disk
+                self.misses += 1
+                os.preadv(self.fd, [self.buffer], offset)
+            time.sleep(0.0005)
+    
+    def stop(self) -> float:
+        """Stop the thread and return its hit rate."""
+        self.stopping.set()
+        self.join()
+        return self.hits / max(1, self.hits + self.misses)
+    
+    def cached(self) -> float:
+        """Fraction of the hot file currently in the page cache."""
+        return _cached_fraction([self.fd])
+
+
+def _cached_fraction(fds: List[int]) -> float:
+    """Fraction of the pages of the given files that are in the page cache."""
+    resident = total = 0
+    for fd in fds:
+        pages = resident_pages(fd, os.fstat(fd).st_size)
+        if pages is None:
+            raise RuntimeError("mincore() is not available")
+        resident += sum(pages)
+        total += len(pages)
+    return resident / max(1, total)
+
+
+def _evict(paths: List[Path]) -> None:
+    """Drop the given files from the page cache."""
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def run_mode(mode: str, root: Path, files: List[Path], hot: Path, workers: int) -> Dict[str, float]:
+    """Scan the cold tree in one cache mode while the workload runs."""
+    _evict(files)
+    workload = Workload(hot)
+    workload.warm()
+    
+    workload.start()
+    start = time.perf_counter()
+    scan_baseline(root, ScanOptions(workers=workers, cache_mode=mode))
+    seconds = time.perf_counter() - start
+    hit_rate = workload.stop()
+    
+    fds = [os.open(path, os.O_RDONLY) for path in files]
+    try:
+        tree_cached = _cached_fraction(fds)
+    finally:
+        for fd in fds:
+            os.close(fd)
+    
+    hot_cached = workload.cached()
+    os.close(workload.fd)
+    return {
+        'seconds': seconds,
+        'mb_per_s': sum(path.stat().st_size for path in files) / seconds / (1 << 20),
+        'workload_hit_rate': hit_rate,
+        'hot_cached': hot_cached,
+        'tree_cached': tree_cached,
+    }
+
+
+def main() -> None:
+    """Run the benchmark in every cache mode and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tree-mb', type=int, default=512, help='Size of the scanned tree')
+    parser.add_argument('--file-mb', type=int, default=16, help='Size of each scanned file')
+    parser.add_argument('--hot-mb', type=int, default=64, help='Size of the hot working set')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--mode', action='append', choices=CACHE_MODES,
+                        help='Only run this cache mode (repeatable)')
+    parser.add_argument('--dir', help='Directory on the file system to test (default: temp dir)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    if not hasattr(os, 'RWF_NOWAIT'):
+        sys.exit("This benchmark needs Linux with RWF_NOWAIT reads")
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        root = Path(temp_dir) / 'tree'
+        root.mkdir()
+        print(f"Generating {args.tree_mb} MiB tree...", file=sys.stderr)
+        spec = TreeSpec(files=max(1, args.tree_mb // args.file_mb),
+                        sizes=[(args.file_mb << 20, 1)], depth=1)
+        files = [root / rel_path for rel_path in generate_tree(root, spec)]
+        hot = Path(temp_dir) / 'hot.dat'
+        hot.write_bytes(os.urandom(args.hot_mb << 20))
+        
+        results = {
+            mode: run_mode(mode, root, files, hot, args.workers)
+            for mode in args.mode or CACHE_MODES
+        }
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"{'mode':<8}{'MiB/s':>9}{'hit rate':>10}{'hot cached':>12}{'tree cached':>13}")
+    for mode, result in results.items():
+        print(f"{mode:<8}{result['mb_per_s']:>9.1f}{result['workload_hit_rate']:>10.1%}"
+              f"{result['hot_cached']:>12.1%}{result['tree_cached']:>13.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Memory and load-time benchmark for fim.models.Event.
+
+Compares the original plain dataclass with the compact slotted Event by
+loading the same newline-delimited JSON events and keeping them all in
+memory, the way a report or a long-running watcher does.
+
+Usage:
+    python benchmarks/bench_events.py [--count N] [--paths N]
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from fim.models import Event
+
+
+@dataclass
+class LegacyEvent:
+    """Event the way fim stored it before the compact representation."""
+    
+    type: str
+    path: str
+    old_hash: Optional[str] = None
+    new_hash: Optional[str] = None
+    timestamp: Optional[str] = None
+    
+    def __post_init__(self):
+        if self.timestamp is None:
+            self.timestamp = datetime.now().isoformat()
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyEvent':
+        return cls(
+            type=data['type'],
+            path=data['path'],
+            old_hash=data.get('old_hash'),
+            new_hash=data.get('new_hash'),
+            timestamp=data.get('timestamp')
+        )
+
+
+REPRESENTATIONS: Dict[str, Callable[[dict], object]] = {
+    'dataclass': LegacyEvent.from_dict,
+    'compact': Event.from_dict,
+}
+
+
+def make_lines(count: int, paths: int) -> List[str]:
+    """Build journal lines for count events over a set of paths."""
+    start = datetime(2025, 1, 15, 8, 0, 0)
+    lines = []
+    for i in range(count):
+        digest = hashlib.sha256(str(i).encode()).hexdigest()
+        lines.append(json.dumps({
+            'type': ('ADDED', 'MODIFIED', 'DELETED')[i % 3],
+            'path': f"var/lib/app{i % 50}/data/file{i % paths:06d}.db",
+            'old_hash': digest if i % 3 else None,
+            'new_hash': digest[::-1] if i % 3 != 2 else None,
+            'timestamp': (start + timedelta(microseconds=i * 137_123)).isoformat()
+        }))
+    return lines
+
+
+def measure(from_dict: Callable[[dict], object], lines: List[str]) -> Dict[str, float]:
+    """Load every line into a kept list, timing it and tracing its memory."""
+    gc.collect()
+    start = time.perf_counter()
+    events = [from_dict(json.loads(line)) for line in lines]
+    elapsed = time.perf_counter() - start
+    del events
+    
+    gc.collect()
+    tracemalloc.start()
+    events = [from_dict(json.loads(line)) for line in lines]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    
+    return {
+        'seconds': elapsed,
+        'events_per_s': len(lines) / elapsed,
+        'bytes_per_event': current / len(lines),
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print one row per representation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--paths', type=int, default=20_000,
+                        help='Number of distinct paths the events refer to')
+    args = parser.parse_args()
+    
+    lines = make_lines(args.count, args.paths)
+    print(f"{args.count} events over {min(args.paths, args.count)} paths")
+    print(f"{'representation':<16}{'load s':>10}{'events/s':>14}{'bytes/event':>14}")
+    
+    for name, from_dict in REPRESENTATIONS.items():
+        result = measure(from_dict, lines)
+        print(f"{name:<16}{result['seconds']:>10.2f}{result['events_per_s']:>14.0f}"
+              f"{result['bytes_per_event']:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark of scan orders on a cold page cache.
+
+Generates a synthetic tree, then for each scan order drops the tree from the
+page cache and builds a baseline, reporting the throughput and the distance
+the disk head travels between files: the sum of the jumps between the
+physical offsets of consecutively hashed files, from FIEMAP. The distance
+is what rotational disks pay for in seeks; on SSDs and in VMs the throughput
+difference is small, so run it on the storage you care about with --dir.
+
+Needs Linux: the cache is dropped with posix_fadvise() and offsets are read
+with FIEMAP.
+
+Usage:
+    python benchmarks/bench_layout.py [--files N] [--sizes SPEC] [--workers N] [--dir PATH]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fim.baseline import scan_baseline
+from fim.layout import SCAN_ORDERS, order_files, physical_offset
+from fim.models import ScanOptions
+from fim.walker import iter_files
+
+from synthetic import TreeSpec, generate_tree, parse_sizes
+
+
+def _evict(paths: List[Path]) -> None:
+    """Drop the given files from the page cache."""
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def seek_distance(root: Path, scan_order: str, workers: int) -> Optional[float]:
+    """Sum of the jumps between the first extents of consecutive files, in GiB."""
+    distance = 0
+    previous = None
+    for _, path in order_files(iter_files(root), scan_order, workers):
+        try:
+            offset = physical_offset(path)
+        except OSError:
+            return None
+        if offset is None:
+            continue
+        if previous is not None:
+            distance += abs(offset - previous)
+        previous = offset
+    return distance / (1 << 30)
+
+
+def run_order(scan_order: str, root: Path, files: List[Path], workers: int) -> Dict[str, float]:
+    """Build a baseline of the cold tree in one scan order."""
+    _evict(files)
+    start = time.perf_counter()
+    scan_baseline(root, ScanOptions(workers=workers, scan_order=scan_order))
+    seconds = time.perf_counter() - start
+    return {
+        'seconds': seconds,
+        'mb_per_s': sum(path.stat().st_size for path in files) / seconds / (1 << 20),
+        'seek_gib': seek_distance(root, scan_order, workers),
+    }
+
+
+def main() -> None:
+    """Run the benchmark in every scan order and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--sizes', default='4k:80,64k:15,4m:5',
+                        help='Weighted file sizes, e.g. 4k:90,1m:10')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per order; the best is kept')
+    parser.add_argument('--dir', help='Directory on the storage to test (default: temp dir)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    if not hasattr(os, 'posix_fadvise'):
+        sys.exit("This benchmark needs posix_fadvise() to drop the page cache")
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        root = Path(temp_dir)
+        print(f"Generating {args.files} files...", file=sys.stderr)
+        spec = TreeSpec(files=args.files, sizes=parse_sizes(args.sizes))
+        files = [root / rel_path for rel_path in generate_tree(root, spec)]
+        
+        results = {}
+        for scan_order in SCAN_ORDERS:
+            runs = [run_order(scan_order, root, files, args.workers) for _ in range(args.repeat)]
+            results[scan_order] = min(runs, key=lambda run: run['seconds'])
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"{'order':<10}{'seconds':>9}{'MiB/s':>9}{'seek GiB':>10}")
+    for scan_order, result in results.items():
+        seek = result['seek_gib']
+        print(f"{scan_order:<10}{result['seconds']:>9.2f}{result['mb_per_s']:>9.1f}"
+              f"{'n/a' if seek is None else f'{seek:.1f}':>10}")
+
+
+if __name__ == '__main__':
+    main()
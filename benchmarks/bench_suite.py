@@ -0,0 +1,323 @@
+"""End-to-end benchmark suite for fim with machine-readable results.
+
+Generates a deterministic synthetic tree (see synthetic.py) and times the
+main code paths on it: scanning a baseline, verifying, loading baselines
+in both formats, watcher event handling under a scripted churn workload,
+loading events and rendering a report. Results are written as JSON, and
+an earlier results file can be compared against to catch regressions.
+
+Usage:
+    python benchmarks/bench_suite.py [--files N] [--out results.json]
+    python benchmarks/bench_suite.py --compare previous.json [--tolerance 0.2]
+"""
+
+import argparse
+import contextlib
+import gc
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, FileModifiedEvent
+
+from fim import __version__
+from fim.baseline import load_baseline, load_baseline_data, save_baseline_data, scan_baseline
+from fim.journal import iter_journal, save_journal
+from fim.models import Event, ScanOptions, WatchOptions
+from fim.reporter import render_report_file
+from fim.storage import load_events, save_events
+from fim.verifier import verify_tree
+from fim.watcher import FIMEventHandler
+
+from synthetic import DEFAULT_SIZES, TreeSpec, churn, generate_tree, parse_sizes
+
+# Results files with another layout can't be compared
+RESULTS_VERSION = 1
+
+_EVENT_CLASSES = {
+    'created': FileCreatedEvent,
+    'modified': FileModifiedEvent,
+    'deleted': FileDeletedEvent,
+}
+
+Benchmark = Callable[[int], Dict[str, float]]
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    """Run func once after a garbage collection and return the seconds it took."""
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _make_events(count: int, paths: List[str]) -> List[Event]:
+    """Build count events over the given paths, one every 137 ms."""
+    start = datetime(2025, 1, 15, 8, 0, 0)
+    events = []
+    for i in range(count):
+        digest = hashlib.sha256(str(i).encode()).hexdigest()
+        event_type = ('ADDED', 'MODIFIED', 'DELETED')[i % 3]
+        events.append(Event(
+            type=event_type,
+            path=paths[i % len(paths)],
+            old_hash=digest if event_type != 'ADDED' else None,
+            new_hash=digest[::-1] if event_type != 'DELETED' else None,
+            timestamp=(start + timedelta(microseconds=i * 137_123)).isoformat()
+        ))
+    return events
+
+
+class Suite:
+    """The benchmarks, sharing one synthetic tree and the files made from it."""
+    
+    def __init__(self, work_dir: Path, spec: TreeSpec, options: ScanOptions,
+                 churn_operations: int, event_count: int):
+        self.root = work_dir / 'tree'
+        self.work_dir = work_dir
+        self.options = options
+        self.churn_operations = churn_operations
+        self.event_count = event_count
+        
+        self.root.mkdir()
+        self.files = generate_tree(self.root, spec)
+        self.total_bytes = sum(self.files.values())
+        self.data = scan_baseline(self.root, options)
+    
+    def benchmarks(self) -> Dict[str, Benchmark]:
+        """Get the benchmarks in the order they run."""
+        return {
+            'scan': self.bench_scan,
+            'verify': self.bench_verify,
+            'load_baseline_json': lambda run: self.bench_load_baseline('.json'),
+            'load_baseline_fimb': lambda run: self.bench_load_baseline('.fimb'),
+            'watch_churn': self.bench_watch,
+            'load_events_json': lambda run: self.bench_load_events('.json'),
+            'load_events_jsonl': lambda run: self.bench_load_events('.jsonl'),
+            'render_report': self.bench_report,
+        }
+    
+    def bench_scan(self, run: int) -> Dict[str, float]:
+        """Hash the whole tree into a new baseline."""
+        seconds = _timed(lambda: scan_baseline(self.root, self.options))
+        return {
+            'seconds': seconds,
+            'files_per_s': len(self.files) / seconds,
+            'mb_per_s': self.total_bytes / seconds / (1 << 20),
+        }
+    
+    def bench_verify(self, run: int) -> Dict[str, float]:
+        """Verify the unchanged tree against its baseline."""
+        results: List[Any] = []
+        seconds = _timed(lambda: results.extend(verify_tree(self.root, self.data, self.options)))
+        if results:
+            raise RuntimeError(f"Unexpected differences: {results[:5]}")
+        return {'seconds': seconds, 'files_per_s': len(self.files) / seconds}
+    
+    def bench_load_baseline(self, suffix: str) -> Dict[str, float]:
+        """Load a saved baseline and look up every path."""
+        path = self.work_dir / f'baseline{suffix}'
+        if not path.exists():
+            save_baseline_data(self.data, path)
+        
+        def load() -> None:
+            data = load_baseline_data(path)
+            for rel_path in self.data.hashes:
+                data.hashes[rel_path]
+            if hasattr(data.hashes, 'close'):
+                data.hashes.close()
+        
+        seconds = _timed(load)
+        return {
+            'seconds': seconds,
+            'entries_per_s': len(self.data.hashes) / seconds,
+            'dict_seconds': _timed(lambda: load_baseline(path)),
+            'file_bytes': path.stat().st_size,
+        }
+    
+    def bench_watch(self, run: int) -> Dict[str, float]:
+        """Feed the events of a scripted churn to the watcher and process them all."""
+        script = churn(self.root, self.files, self.churn_operations, seed=run)
+        events = [
+            _EVENT_CLASSES[kind](str(self.root / rel_path)) for kind, rel_path in script
+        ]
+        handler = FIMEventHandler(
+            self.root, self.data.hashes, self.options.algorithm,
+            WatchOptions(quiet_window=0.5, hash_workers=2)
+        )
+        
+        def handle() -> None:
+            for event in events:
+                handler.dispatch(event)
+            handler.close()
+        
+        seconds = _timed(handle)
+        # Later benchmarks see the churned tree
+        self.data.hashes = handler.baseline
+        return {
+            'seconds': seconds,
+            'events_per_s': len(events) / seconds,
+            'hashes': handler.hashes_performed,
+            'changes': len(handler.events),
+        }
+    
+    def _events_path(self, suffix: str) -> Path:
+        """Write the synthetic events once and return their path."""
+        path = self.work_dir / f'events{suffix}'
+        if not path.exists():
+            events = _make_events(self.event_count, sorted(self.files))
+            if suffix == '.jsonl':
+                save_journal(events, path)
+            else:
+                save_events(events, path)
+        return path
+    
+    def bench_load_events(self, suffix: str) -> Dict[str, float]:
+        """Load every event of an events file or journal."""
+        path = self._events_path(suffix)
+        if suffix == '.jsonl':
+            seconds = _timed(lambda: list(iter_journal(path)))
+        else:
+            seconds = _timed(lambda: load_events(path))
+        return {'seconds': seconds, 'events_per_s': self.event_count / seconds}
+    
+    def bench_report(self, run: int) -> Dict[str, float]:
+        """Render the HTML report of the journal."""
+        path = self._events_path('.jsonl')
+        output = self.work_dir / f'report{run}' / 'report.html'
+        seconds = _timed(lambda: render_report_file(path, output, max_rows=10000))
+        return {'seconds': seconds, 'events_per_s': self.event_count / seconds}
+
+
+def run_suite(work_dir: Path, spec: TreeSpec, options: ScanOptions, churn_operations: int,
+              event_count: int, repeat: int, only: Optional[List[str]] = None) -> dict:
+    """
+    Run the benchmarks, keeping the fastest of repeat runs of each.
+    
+    Returns:
+        Results document: environment, parameters and one entry per benchmark
+    """
+    print(f"Generating {spec.files} files...", file=sys.stderr)
+    suite = Suite(work_dir, spec, options, churn_operations, event_count)
+    results: Dict[str, Dict[str, float]] = {}
+    
+    for name, benchmark in suite.benchmarks().items():
+        if only and name not in only:
+            continue
+        # fim's own progress output would mix with the results on stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            runs = [benchmark(run) for run in range(repeat)]
+        results[name] = min(runs, key=lambda result: result['seconds'])
+        print(f"{name:<22}{results[name]['seconds']:>10.4f} s", file=sys.stderr)
+    
+    return {
+        'version': RESULTS_VERSION,
+        'fim_version': __version__,
+        'created': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'parameters': {
+            'tree': spec.to_dict(),
+            'workers': options.workers,
+            'algorithm': options.algorithm,
+            'churn_operations': churn_operations,
+            'events': event_count,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(previous: dict, current: dict, tolerance: float) -> List[str]:
+    """
+    Compare the timings of two results documents, printing a table to stderr.
+    
+    Args:
+        previous: Earlier results
+        current: New results
+        tolerance: Allowed relative slowdown, e.g. 0.2 for 20%
+    
+    Returns:
+        Names of the benchmarks that got slower than allowed
+    """
+    if previous.get('version') != RESULTS_VERSION:
+        raise ValueError("Results were written by an incompatible version of the suite")
+    if previous.get('parameters') != current['parameters']:
+        print("Warning: the runs used different parameters", file=sys.stderr)
+    
+    regressions = []
+    print(f"{'benchmark':<22}{'before s':>10}{'after s':>10}{'change':>9}", file=sys.stderr)
+    for name, result in current['results'].items():
+        before = previous['results'].get(name, {}).get('seconds')
+        if before is None:
+            print(f"{name:<22}{'':>10}{result['seconds']:>10.4f}{'new':>9}", file=sys.stderr)
+            continue
+        
+        change = result['seconds'] / before - 1
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<22}{before:>10.4f}{result['seconds']:>10.4f}{change:>+9.1%}{flag}",
+              file=sys.stderr)
+    return regressions
+
+
+def main() -> None:
+    """Run the suite, save its results and optionally compare them."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=TreeSpec.files)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Weighted size distribution (default: {DEFAULT_SIZES})')
+    parser.add_argument('--depth', type=int, default=TreeSpec.depth)
+    parser.add_argument('--fanout', type=int, default=TreeSpec.fanout)
+    parser.add_argument('--seed', type=int, default=TreeSpec.seed)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--churn', type=int, default=2000, metavar='N',
+                        help='Changes made for the watcher benchmark (default: 2000)')
+    parser.add_argument('--events', type=int, default=200_000, metavar='N',
+                        help='Events loaded and reported (default: 200000)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', action='append', metavar='NAME',
+                        help='Only run this benchmark (repeatable)')
+    parser.add_argument('--out', metavar='PATH', help='Write the results JSON here')
+    parser.add_argument('--compare', metavar='PATH', help='Earlier results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown before --compare fails (default: 0.2)')
+    args = parser.parse_args()
+    
+    spec = TreeSpec(args.files, parse_sizes(args.sizes), args.depth, args.fanout, args.seed)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        current = run_suite(
+            Path(temp_dir), spec, ScanOptions(workers=args.workers), args.churn,
+            args.events, args.repeat, args.only
+        )
+    
+    document = json.dumps(current, indent=2)
+    if args.out:
+        Path(args.out).write_text(document + '\n', encoding='utf-8')
+    else:
+        print(document)
+    
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(previous, current, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmarks regressed by more than "
+                  f"{args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
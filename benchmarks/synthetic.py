@@ -0,0 +1,190 @@
+"""Deterministic synthetic workloads for the fim benchmarks.
+
+The same seed always produces the same tree, file contents and churn
+script, so timings from different runs and releases are comparable.
+
+Usage:
+    python benchmarks/synthetic.py DIRECTORY [--files N] [--sizes SPEC] [--depth N]
+"""
+
+import argparse
+import os
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Weighted file sizes: mostly small files, a few large ones
+DEFAULT_SIZES = '1k:40,16k:40,256k:15,4m:5'
+
+_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+# Contents are slices of one random pool, so generating them costs no hashing
+_POOL_SIZE = 1 << 20
+
+
+def parse_sizes(spec: str) -> List[Tuple[int, int]]:
+    """
+    Parse a size distribution such as '1k:40,16k:40,4m:5'.
+    
+    Args:
+        spec: Comma separated size:weight pairs; sizes take a k, m or g suffix
+    
+    Returns:
+        List of (size in bytes, weight)
+    
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    sizes = []
+    for part in spec.split(','):
+        size, _, weight = part.strip().lower().partition(':')
+        unit = size[-1:] if size[-1:] in _UNITS else ''
+        number = size[:-1] if unit else size
+        if not number.isdigit() or (weight and not weight.isdigit()):
+            raise ValueError(f"Invalid size distribution entry: {part!r}")
+        sizes.append((int(number) * _UNITS[unit], int(weight or 1)))
+    return sizes
+
+
+@dataclass
+class TreeSpec:
+    """Shape of a synthetic directory tree."""
+    
+    files: int = 10000
+    sizes: List[Tuple[int, int]] = field(default_factory=lambda: parse_sizes(DEFAULT_SIZES))
+    depth: int = 4  # Directory levels below the root
+    fanout: int = 8  # Subdirectories per directory
+    seed: int = 0
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON results."""
+        return {
+            'files': self.files,
+            'sizes': [list(size) for size in self.sizes],
+            'depth': self.depth,
+            'fanout': self.fanout,
+            'seed': self.seed
+        }
+
+
+def _content(rng: random.Random, pool: bytes, size: int) -> bytes:
+    """Get size bytes of deterministic content unique to this file."""
+    header = rng.getrandbits(128).to_bytes(16, 'little')
+    if size <= len(header):
+        return header[:size]
+    
+    chunks = [header]
+    remaining = size - len(header)
+    while remaining:
+        start = rng.randrange(len(pool))
+        chunk = pool[start:start + remaining]
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def generate_tree(root: Path, spec: TreeSpec) -> Dict[str, int]:
+    """
+    Create a synthetic directory tree.
+    
+    Files are spread over directories of up to spec.depth levels, each with
+    up to spec.fanout subdirectories, with sizes drawn from spec.sizes.
+    
+    Args:
+        root: Directory to create the tree in
+        spec: Shape of the tree
+    
+    Returns:
+        Dictionary mapping relative file paths to their sizes
+    """
+    rng = random.Random(spec.seed)
+    pool = rng.getrandbits(_POOL_SIZE * 8).to_bytes(_POOL_SIZE, 'little')
+    sizes, weights = zip(*spec.sizes)
+    
+    files: Dict[str, int] = {}
+    for index in range(spec.files):
+        parts = [f"d{rng.randrange(spec.fanout)}" for _ in range(rng.randint(0, spec.depth))]
+        rel_path = os.path.join(*parts, f"file{index:07d}.dat")
+        size = rng.choices(sizes, weights)[0]
+        
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_content(rng, pool, size))
+        files[rel_path] = size
+    
+    return files
+
+
+def churn(
+    root: Path,
+    files: Dict[str, int],
+    operations: int,
+    seed: int = 0
+) -> List[Tuple[str, str]]:
+    """
+    Apply a scripted mix of changes to a generated tree.
+    
+    Roughly half the operations modify files (several writes each, like a
+    program saving in steps), a quarter create files and a quarter delete
+    them. files is updated to match the tree.
+    
+    Args:
+        root: Root of a tree created by generate_tree()
+        files: Its relative paths and sizes
+        operations: Number of changes to make
+        seed: Random seed of the script
+    
+    Returns:
+        File system events the changes produce, as (kind, relative path)
+        with kind 'created', 'modified' or 'deleted'
+    """
+    rng = random.Random(seed)
+    existing = sorted(files)
+    events: List[Tuple[str, str]] = []
+    
+    for index in range(operations):
+        roll = rng.random()
+        
+        if roll < 0.25 or not existing:
+            rel_path = f"new{seed}-{index:07d}.dat"
+            (root / rel_path).write_bytes(rng.getrandbits(8192).to_bytes(1024, 'little'))
+            files[rel_path] = 1024
+            existing.append(rel_path)
+            events += [('created', rel_path), ('modified', rel_path)]
+        elif roll < 0.5:
+            rel_path = existing.pop(rng.randrange(len(existing)))
+            (root / rel_path).unlink()
+            del files[rel_path]
+            events.append(('deleted', rel_path))
+        else:
+            rel_path = rng.choice(existing)
+            with open(root / rel_path, 'ab') as f:
+                for _ in range(rng.randint(1, 4)):
+                    f.write(rng.getrandbits(512).to_bytes(64, 'little'))
+                    events.append(('modified', rel_path))
+            files[rel_path] += 64
+    
+    return events
+
+
+def main() -> None:
+    """Generate a tree and print its summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', help='Directory to create the tree in')
+    parser.add_argument('--files', type=int, default=TreeSpec.files)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Weighted size distribution (default: {DEFAULT_SIZES})')
+    parser.add_argument('--depth', type=int, default=TreeSpec.depth)
+    parser.add_argument('--fanout', type=int, default=TreeSpec.fanout)
+    parser.add_argument('--seed', type=int, default=TreeSpec.seed)
+    args = parser.parse_args()
+    
+    spec = TreeSpec(args.files, parse_sizes(args.sizes), args.depth, args.fanout, args.seed)
+    files = generate_tree(Path(args.directory), spec)
+    print(f"Created {len(files)} files, {sum(files.values()) / (1 << 20):.1f} MiB "
+          f"in {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
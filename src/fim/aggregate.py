@@ -0,0 +1,315 @@
+"""Single-pass event statistics for File Integrity Monitor."""
+
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .journal import is_journal, iter_segment, journal_segments
+from .models import Event, format_timestamp
+from .storage import iter_events
+
+GRANULARITIES = {'hour': 13, 'day': 10}  # Length of the ISO timestamp prefix per bucket
+STATS_SUFFIX = '.stats'
+
+_NS_PER_MINUTE = 60_000_000_000
+_hour_labels: Dict[int, str] = {}  # Epoch minute -> local 'YYYY-MM-DDTHH'
+
+
+def _hour_label(minute: int) -> str:
+    """Get the local hour bucket of an epoch minute."""
+    label = _hour_labels.get(minute)
+    if label is None:
+        if len(_hour_labels) >= 65536:
+            _hour_labels.clear()
+        label = _hour_labels[minute] = datetime.fromtimestamp(minute * 60).isoformat()[:13]
+    return label
+
+
+class EventStats:
+    """
+    Report statistics accumulated in one pass over events.
+    
+    Histogram buckets are local ISO hour prefixes, looked up once per minute
+    of epoch time, so timestamps are not formatted per event. Counts per
+    path and per parent directory are exact; rollups at
+    other depths and top-N lists are derived from them on demand. Stats of
+    separate event sets can be merged, e.g. one per journal segment.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.total = 0
+        self.type_counts: Counter = Counter()
+        self.hourly: Counter = Counter()
+        self.path_counts: Counter = Counter()
+        self.directory_counts: Counter = Counter()
+        self._first_text: Optional[str] = None
+        self._last_text: Optional[str] = None
+        self._first_ns: Optional[int] = None
+        self._last_ns: Optional[int] = None
+    
+    @property
+    def first_timestamp(self) -> Optional[str]:
+        """Timestamp of the earliest event."""
+        candidates = [self._first_text]
+        if self._first_ns is not None:
+            candidates.append(format_timestamp(self._first_ns))
+        return min(filter(None, candidates), default=None)
+    
+    @first_timestamp.setter
+    def first_timestamp(self, value: Optional[str]) -> None:
+        self._first_text, self._first_ns = value, None
+    
+    @property
+    def last_timestamp(self) -> Optional[str]:
+        """Timestamp of the latest event."""
+        candidates = [self._last_text]
+        if self._last_ns is not None:
+            candidates.append(format_timestamp(self._last_ns))
+        return max(filter(None, candidates), default=None)
+    
+    @last_timestamp.setter
+    def last_timestamp(self, value: Optional[str]) -> None:
+        self._last_text, self._last_ns = value, None
+    
+    def add(self, event: Event) -> None:
+        """
+        Account for a single event.
+        
+        Args:
+            event: Event to add
+        """
+        self.total += 1
+        self.type_counts[event.type] += 1
+        self.path_counts[event.path] += 1
+        self.directory_counts[event.path.rpartition(os.sep)[0] or '.'] += 1
+        
+        ns = event.timestamp_ns
+        if ns is not None:
+            self.hourly[_hour_label(ns // _NS_PER_MINUTE)] += 1
+            if self._first_ns is None or ns < self._first_ns:
+                self._first_ns = ns
+            if self._last_ns is None or ns > self._last_ns:
+                self._last_ns = ns
+            return
+        
+        timestamp = event.timestamp
+        if timestamp:
+            self.hourly[timestamp[:GRANULARITIES['hour']]] += 1
+            if self._first_text is None or timestamp < self._first_text:
+                self._first_text = timestamp
+            if self._last_text is None or timestamp > self._last_text:
+                self._last_text = timestamp
+    
+    def update(self, events: Iterable[Event]) -> 'EventStats':
+        """
+        Account for many events.
+        
+        Args:
+            events: Events to add
+        
+        Returns:
+            self, for chaining
+        """
+        for event in events:
+            self.add(event)
+        return self
+    
+    def merge(self, other: 'EventStats') -> 'EventStats':
+        """
+        Add the statistics of another event set.
+        
+        Args:
+            other: Statistics to merge into these
+        
+        Returns:
+            self, for chaining
+        """
+        self.total += other.total
+        self.type_counts.update(other.type_counts)
+        self.hourly.update(other.hourly)
+        self.path_counts.update(other.path_counts)
+        self.directory_counts.update(other.directory_counts)
+        
+        timestamps = [t for t in (self.first_timestamp, other.first_timestamp) if t]
+        self.first_timestamp = min(timestamps) if timestamps else None
+        timestamps = [t for t in (self.last_timestamp, other.last_timestamp) if t]
+        self.last_timestamp = max(timestamps) if timestamps else None
+        return self
+    
+    def histogram(self, granularity: str = 'day') -> List[Tuple[str, int]]:
+        """
+        Count events per time bucket.
+        
+        Args:
+            granularity: 'hour' or 'day'
+        
+        Returns:
+            (bucket, count) pairs in time order, e.g. ('2025-01-15', 42)
+        
+        Raises:
+            ValueError: If the granularity is unknown
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(
+                f"Unknown granularity '{granularity}', "
+                f"expected one of: {', '.join(GRANULARITIES)}"
+            )
+        
+        buckets: Counter = Counter()
+        width = GRANULARITIES[granularity]
+        for hour, count in self.hourly.items():
+            buckets[hour[:width]] += count
+        return sorted(buckets.items())
+    
+    def top_paths(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Get the n paths with the most events."""
+        return self.path_counts.most_common(n)
+    
+    def top_directories(self, n: int = 10, depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Get the n directories with the most events below them.
+        
+        Args:
+            n: Number of directories to return
+            depth: Roll events up to directories this many levels below the
+                root; None counts each file's parent directory
+        
+        Returns:
+            (directory, count) pairs, most events first
+        """
+        if depth is None:
+            return self.directory_counts.most_common(n)
+        
+        rollup: Counter = Counter()
+        for directory, count in self.directory_counts.items():
+            parts = Path(directory).parts if directory != '.' else ()
+            rollup[os.path.join(*parts[:depth]) if parts[:depth] else '.'] += count
+        return rollup.most_common(n)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert statistics to a JSON-serializable dictionary."""
+        return {
+            'total': self.total,
+            'types': dict(self.type_counts),
+            'hourly': dict(self.hourly),
+            'paths': dict(self.path_counts),
+            'directories': dict(self.directory_counts),
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EventStats':
+        """Create statistics from a dictionary made by to_dict."""
+        stats = cls()
+        stats.total = data['total']
+        stats.type_counts.update(data.get('types', {}))
+        stats.hourly.update(data.get('hourly', {}))
+        stats.path_counts.update(data.get('paths', {}))
+        stats.directory_counts.update(data.get('directories', {}))
+        stats.first_timestamp = data.get('first_timestamp')
+        stats.last_timestamp = data.get('last_timestamp')
+        return stats
+
+
+def aggregate_events(events: Iterable[Event]) -> EventStats:
+    """
+    Compute statistics over events in a single pass.
+    
+    Args:
+        events: Events to aggregate
+    
+    Returns:
+        Event statistics
+    """
+    return EventStats().update(events)
+
+
+def save_stats(stats: EventStats, path: Path) -> None:
+    """
+    Save pre-aggregated statistics to a JSON file.
+    
+    Args:
+        stats: Statistics to save
+        path: Path to save to
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'stats': stats.to_dict()}, f, ensure_ascii=False)
+
+
+def load_stats(path: Path) -> EventStats:
+    """
+    Load pre-aggregated statistics saved by save_stats.
+    
+    Args:
+        path: Path to statistics file
+    
+    Returns:
+        Event statistics
+    
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If the file does not hold statistics
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or 'stats' not in data:
+        raise ValueError(f"{path} is not an event statistics file")
+    return EventStats.from_dict(data['stats'])
+
+
+def _segment_stats(segment: Path, cache: bool) -> EventStats:
+    """Aggregate a rotated journal segment, reusing its cached statistics."""
+    cache_path = segment.with_name(segment.name + STATS_SUFFIX)
+    st = segment.stat()
+    key = [st.st_size, st.st_mtime_ns]
+    
+    if cache:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('segment') == key:
+                return EventStats.from_dict(data['stats'])
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    stats = aggregate_events(iter_segment(segment))
+    if cache:
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'segment': key, 'stats': stats.to_dict()}, f, ensure_ascii=False)
+        except OSError:
+            pass
+    return stats
+
+
+def aggregate_file(path: Path, cache: bool = True) -> EventStats:
+    """
+    Compute statistics for an events file or journal.
+    
+    Rotated journal segments never change, so their statistics are cached
+    next to them (events.000001.jsonl.stats) and only the active segment is
+    read on later runs.
+    
+    Args:
+        path: Path to events JSON file, or a .jsonl journal
+        cache: Read and write cached statistics of rotated segments
+    
+    Returns:
+        Event statistics
+    """
+    if not is_journal(path):
+        return aggregate_events(iter_events(path))
+    
+    stats = EventStats()
+    for segment in journal_segments(path):
+        if segment == path:
+            stats.update(iter_segment(segment))
+        else:
+            stats.merge(_segment_stats(segment, cache))
+    return stats
@@ -0,0 +1,378 @@
+"""Asyncio API for File Integrity Monitor.
+
+Scans, verifications and watches run on executor threads and hand their
+results to the event loop, so an asyncio service can run them without
+blocking the loop:
+
+    async for rel_path, hash_value in scan(root):
+        ...
+
+    async for result in verify(root, data):
+        ...
+
+    async with AsyncWatcher(root, data.hashes, data.algorithm) as watcher:
+        async for event in watcher:
+            ...
+
+Leaving an async for loop early, or cancelling the task running it, stops
+the scan after the files being hashed and waits until its hashing pool has
+shut down. Up to STREAM_BUFFER_SIZE results are buffered; a slower consumer
+holds the scan back rather than letting results pile up.
+
+The executor argument picks the threads blocking work runs on, e.g. a
+ThreadPoolExecutor shared by the service; by default the loop's default
+executor is used. Parallel hashing within a scan follows ScanOptions, as
+for the synchronous functions.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Mapping, Optional, Tuple, cast
+
+from . import baseline as _baseline
+from .baseline_store import BaselineStore
+from .hasher import DEFAULT_ALGORITHM, file_hash
+from .models import BaselineData, Event, ScanOptions, VerifyResult, WatchOptions
+from .scanner import check_cancelled
+from .verifier import TreeVerifier
+from .walker import PathFilter
+from .watcher import Checkpoint, WatchSession
+
+# Results a scan or verification gets ahead of its consumer
+STREAM_BUFFER_SIZE = 256
+
+# Seconds between checks for cancellation while the buffer is full
+_POLL_INTERVAL = 0.1
+
+# Marks the end of a stream or watch in its queue
+_DONE = object()
+
+
+async def _stop(future: 'asyncio.Future[Any]', cancel: threading.Event) -> None:
+    """Cancel work running on an executor thread and wait until it has stopped."""
+    cancel.set()
+    await asyncio.wait([future])
+    # Nobody is waiting for the result any more, so don't log its error
+    future.exception()
+
+
+async def _stream(
+    run: Callable[[Callable[[Any], None], threading.Event], None],
+    executor: Optional[Executor]
+) -> AsyncIterator[Any]:
+    """
+    Run a blocking function on an executor thread and yield what it emits.
+    
+    Args:
+        run: Function called with (emit, cancel); it passes each result to
+            emit, which raises ScanCancelled once the stream is closed
+        executor: Executor to run the function on (default: the loop's)
+    
+    Returns:
+        Async iterator of the emitted results
+    """
+    loop = asyncio.get_running_loop()
+    results: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(STREAM_BUFFER_SIZE)
+    cancel = threading.Event()
+    
+    def emit(item: Any) -> None:
+        while not slots.acquire(timeout=_POLL_INTERVAL):
+            check_cancelled(cancel)
+        check_cancelled(cancel)
+        loop.call_soon_threadsafe(results.put_nowait, item)
+    
+    def produce() -> None:
+        try:
+            run(emit, cancel)
+        finally:
+            loop.call_soon_threadsafe(results.put_nowait, _DONE)
+    
+    producer = loop.run_in_executor(executor, produce)
+    try:
+        while (item := await results.get()) is not _DONE:
+            slots.release()
+            yield item
+        await producer  # Raises the scan's error, if any
+    finally:
+        await _stop(producer, cancel)
+
+
+async def hash_file(
+    path: Path,
+    algorithm: str = DEFAULT_ALGORITHM,
+    executor: Optional[Executor] = None
+) -> Optional[str]:
+    """
+    Calculate the digest of a file on an executor thread.
+    
+    Args:
+        path: Path to the file
+        algorithm: Hash algorithm, see fim.hasher.ALGORITHMS
+        executor: Executor to hash on (default: the loop's)
+    
+    Returns:
+        Hex digest, or None if the file can't be read
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, file_hash, path, algorithm)
+
+
+def scan(
+    root: Path,
+    options: Optional[ScanOptions] = None,
+    previous: Optional[BaselineData] = None,
+    path_filter: Optional[PathFilter] = None,
+    executor: Optional[Executor] = None
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Scan a directory tree, yielding each file's hash as it is recorded.
+    
+    Args:
+        root: Root directory to scan
+        options: Scan options, see fim.baseline.scan_baseline()
+        previous: Earlier scan of the same tree, for options.trust_stat
+        path_filter: Include/exclude patterns for the walk
+        executor: Executor to walk and collect results on (default: the loop's)
+    
+    Returns:
+        Async iterator of (relative path, hash) pairs, the entries
+        scan_baseline() records, in the order they are recorded
+    """
+    def run(emit: Callable[[Any], None], cancel: threading.Event) -> None:
+        _baseline.scan_baseline(
+            root, options, previous, path_filter,
+            on_hash=lambda rel_path, hash_value: emit((rel_path, hash_value)),
+            cancel=cancel
+        )
+    
+    return _stream(run, executor)
+
+
+async def scan_baseline(
+    root: Path,
+    options: Optional[ScanOptions] = None,
+    previous: Optional[BaselineData] = None,
+    path_filter: Optional[PathFilter] = None,
+    executor: Optional[Executor] = None
+) -> BaselineData:
+    """
+    Scan a directory tree on an executor thread, see fim.baseline.scan_baseline().
+    
+    Args:
+        root: Root directory to scan
+        options: Scan options
+        previous: Earlier scan of the same tree, for options.trust_stat
+        path_filter: Include/exclude patterns for the walk
+        executor: Executor to scan on (default: the loop's)
+    
+    Returns:
+        Baseline data for the tree
+    """
+    cancel = threading.Event()
+    future = asyncio.get_running_loop().run_in_executor(
+        executor,
+        partial(_baseline.scan_baseline, root, options, previous, path_filter, cancel=cancel)
+    )
+    try:
+        return await asyncio.shield(future)
+    finally:
+        await _stop(future, cancel)
+
+
+def verify(
+    root: Path,
+    data: BaselineData,
+    options: Optional[ScanOptions] = None,
+    path_filter: Optional[PathFilter] = None,
+    executor: Optional[Executor] = None
+) -> AsyncIterator[VerifyResult]:
+    """
+    Verify a directory tree against a baseline, yielding differences as they are found.
+    
+    Args:
+        root: Root directory to verify
+        data: Baseline to verify against
+        options: Scan options, see fim.verifier.TreeVerifier
+        path_filter: Include/exclude patterns
+        executor: Executor to walk and collect results on (default: the loop's)
+    
+    Returns:
+        Async iterator of MODIFIED, EXTRA and finally MISSING results
+    """
+    def run(emit: Callable[[Any], None], cancel: threading.Event) -> None:
+        for result in TreeVerifier(root, data, options, path_filter, cancel).results():
+            emit(result)
+    
+    return _stream(run, executor)
+
+
+class AsyncWatcher:
+    """
+    Watches a directory for changes, yielding events from an asyncio.Queue.
+    
+    Use it as an async context manager, or call start() and stop().
+    Iterating yields every event as it is recorded, and ends once stop()
+    has run and the events recorded while stopping have been yielded.
+    Paths are hashed and checkpoints written on executor threads.
+    """
+    
+    def __init__(
+        self,
+        root_path: Path,
+        baseline: Mapping[str, str],
+        algorithm: str = DEFAULT_ALGORITHM,
+        options: Optional[WatchOptions] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        path_filter: Optional[PathFilter] = None,
+        block_hash: Optional[Mapping[str, int]] = None,
+        export_metrics: Optional[Callable[[], None]] = None,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize watcher; see fim.watcher.watch_directory() for the arguments.
+        
+        Without a checkpoint function, events are only kept until they are
+        queued. With one, they are kept until checkpointed, as in
+        watch_directory().
+        
+        Args:
+            executor: Executor to hash and checkpoint on (default: the loop's)
+        """
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.executor = executor
+        self._session = WatchSession(
+            root_path, baseline, algorithm, options, checkpoint, path_filter, block_hash,
+            export_metrics, on_event=self._on_event
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = asyncio.Event()
+        self._task: Optional['asyncio.Task[None]'] = None
+        self._stopped: Optional['asyncio.Future[None]'] = None
+        self.error: Optional[Exception] = None  # Why the watch loop ended early, if it did
+    
+    @property
+    def baseline(self) -> BaselineStore:
+        """The baseline, updated with every change seen so far."""
+        return self._session.event_handler.baseline
+    
+    def _started_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the loop start() was called on."""
+        if self._loop is None:
+            raise RuntimeError("AsyncWatcher has not been started")
+        return self._loop
+    
+    def _on_event(self, event: Event) -> None:
+        """Queue an event; called on whichever thread recorded it."""
+        # The loop is set before the observer starts, so it is known here
+        self._started_loop().call_soon_threadsafe(self.events.put_nowait, event)
+    
+    async def start(self) -> None:
+        """Start watching."""
+        self._loop = asyncio.get_running_loop()
+        await self._loop.run_in_executor(self.executor, self._session.start)
+        self._task = asyncio.create_task(self._run())
+    
+    async def _run(self) -> None:
+        """Step the session every tick until stopped."""
+        session = self._session
+        loop = self._started_loop()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), session.tick)
+                except asyncio.TimeoutError:
+                    await loop.run_in_executor(self.executor, self._step)
+        except Exception as e:
+            self.error = e
+            self.events.put_nowait(_DONE)
+    
+    def _step(self) -> None:
+        """Run one step of the session on an executor thread."""
+        self._session.step()
+        self._release_queued()
+    
+    def _release_queued(self) -> None:
+        """Drop the handler's copies of queued events, unless they await a checkpoint."""
+        session = self._session
+        if session.checkpoint is None:
+            event_handler = session.event_handler
+            event_handler.release_events(len(event_handler.events))
+    
+    async def stop(self) -> None:
+        """Stop watching, process what is pending and checkpoint one last time."""
+        if self._task is None:
+            return
+        if self._stopped is None:
+            self._stopped = asyncio.ensure_future(self._shutdown(self._task))
+        # Shut down completely even if the caller is cancelled meanwhile
+        await asyncio.shield(self._stopped)
+    
+    async def _shutdown(self, task: 'asyncio.Task[None]') -> None:
+        """Stop the watch loop task, then the session, then end the iteration."""
+        self._stopping.set()
+        await task
+        await self._started_loop().run_in_executor(self.executor, self._stop_session)
+        self.events.put_nowait(_DONE)
+    
+    def _stop_session(self) -> None:
+        """Stop the session on an executor thread."""
+        self._session.stop()
+        self._release_queued()
+    
+    async def __aenter__(self) -> 'AsyncWatcher':
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+    
+    def __aiter__(self) -> 'AsyncWatcher':
+        return self
+    
+    async def __anext__(self) -> Event:
+        event = await self.events.get()
+        if event is _DONE:
+            # Later calls end as well
+            self.events.put_nowait(_DONE)
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        return cast(Event, event)
+
+
+async def watch(
+    root_path: Path,
+    baseline: Mapping[str, str],
+    algorithm: str = DEFAULT_ALGORITHM,
+    options: Optional[WatchOptions] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    path_filter: Optional[PathFilter] = None,
+    block_hash: Optional[Mapping[str, int]] = None,
+    executor: Optional[Executor] = None
+) -> AsyncIterator[Event]:
+    """
+    Watch a directory until the caller stops iterating or is cancelled.
+    
+    Args:
+        root_path: Directory to watch
+        baseline: Initial baseline
+        algorithm: Hash algorithm the baseline was built with
+        options: Coalescing, hashing and checkpoint options
+        checkpoint: Function persisting (baseline, new_events)
+        path_filter: Include/exclude patterns
+        block_hash: Block hashing parameters of the baseline, if any
+        executor: Executor to hash and checkpoint on (default: the loop's)
+    
+    Returns:
+        Async iterator of events as they are recorded
+    """
+    async with AsyncWatcher(
+        root_path, baseline, algorithm, options, checkpoint, path_filter, block_hash,
+        executor=executor
+    ) as watcher:
+        async for event in watcher:
+            yield event
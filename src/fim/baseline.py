@@ -1,35 +1,195 @@
 """Baseline management for File Integrity Monitor."""
 
-import os
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from .hasher import file_sha256
+from .baseline_store import BaselineStore
+from .binary_baseline import (
+    BINARY_SUFFIX, is_binary_baseline, load_binary_baseline, save_binary_baseline,
+)
+from .hasher import (
+    BLOCK_HASH_MIN_SIZE, HASH_BLOCK_SIZE, QUICK_BLOCK_SIZE, QUICK_MIN_SIZE, QUICK_SAMPLES,
+    file_block_digests, file_fingerprint,
+)
+from .layout import order_files
+from .merkle import build_tree
+from .metrics import FILES_WALKED, REGISTRY
+from .models import BaselineData, ScanOptions
+from .scanner import check_cancelled, hash_files, hash_files_with_checksums
 from .storage import load_json, save_json
+from .walker import PathFilter, iter_files
 
 
-def build_baseline(root: Path) -> Dict[str, str]:
+def scan_baseline(
+    root: Path,
+    options: Optional[ScanOptions] = None,
+    previous: Optional[BaselineData] = None,
+    path_filter: Optional[PathFilter] = None,
+    on_hash: Optional[Callable[[str, str], None]] = None,
+    cancel: Optional[threading.Event] = None
+) -> BaselineData:
     """
-    Build baseline by scanning all files in directory tree.
+    Scan directory tree, recording file hashes and stat fingerprints.
+    
+    With options.trust_stat set, files whose fingerprint matches the one in
+    previous keep their hash from previous instead of being read again.
+    With options.precheck set, CRC32 checksums are recorded in the same read.
+    With options.quick set, files of at least QUICK_MIN_SIZE bytes also get
+    a sampled fingerprint, so verify can check them without a full read.
+    With options.block_hash set, files of at least BLOCK_HASH_MIN_SIZE bytes
+    are hashed as blocks on options.workers threads each, and with
+    options.block_digests the digest of every block is kept as well.
+    With options.scan_order other than 'walk', the tree is walked first and
+    files are hashed in layout order; the results are the same.
+    A Merkle tree of directory digests is built over the hashes.
     
     Args:
         root: Root directory to scan
-        
+        options: Scan options such as the number of hashing workers
+        previous: Earlier scan of the same tree
+        path_filter: Include/exclude patterns for the walk
+        on_hash: Called with (relative path, hash) of every file as its
+            hash is recorded, on the thread running the scan
+        cancel: Event that stops the scan when set, checked between files
+    
     Returns:
-        Dictionary mapping relative file paths to SHA256 hashes
+        Baseline data for the tree
+    
+    Raises:
+        ScanCancelled: If cancel was set
     """
-    baseline = {}
+    options = options or ScanOptions()
     root = Path(root).resolve()
     
-    for file_path in root.rglob('*'):
-        if file_path.is_file():
-            relative_path = file_path.relative_to(root)
-            hash_value = file_sha256(file_path)
+    hashes = BaselineStore(algorithm=options.algorithm)
+    stats: Dict[str, List[int]] = {}
+    checksums: Dict[str, str] = {}
+    fingerprints: Dict[str, str] = {}
+    blocks: Dict[str, List[str]] = {}
+    header: Dict[str, Any] = {'algorithm': options.algorithm}
+    
+    quick = {'samples': QUICK_SAMPLES, 'block_size': QUICK_BLOCK_SIZE, 'min_size': QUICK_MIN_SIZE}
+    if options.quick:
+        header['quick'] = quick
+    if options.block_hash:
+        header['block_hash'] = {'block_size': HASH_BLOCK_SIZE, 'min_size': BLOCK_HASH_MIN_SIZE}
+    
+    # Hashes are only comparable between baselines hashed the same way
+    reuse = (
+        options.trust_stat and previous is not None
+        and previous.algorithm == options.algorithm
+        and previous.block_hash == header.get('block_hash', {})
+    )
+    # Stands in for previous below; empty when nothing may be reused
+    prior = previous if reuse and previous is not None else BaselineData()
+    reuse_fingerprints = reuse and prior.quick == quick
+    
+    def block_hashed(fingerprint: List[int]) -> bool:
+        return options.block_hash and fingerprint[2] >= BLOCK_HASH_MIN_SIZE
+    
+    def reusable(relative_path: str, fingerprint: List[int]) -> bool:
+        if not (reuse and prior.stats.get(relative_path) == fingerprint
+                and relative_path in prior.hashes):
+            return False
+        if block_hashed(fingerprint):
+            # Block-hashed files have no checksum, but may need block digests
+            return not options.block_digests or relative_path in prior.blocks
+        return not options.precheck or relative_path in prior.checksums
+    
+    def record(relative_path: str, hash_value: str) -> None:
+        hashes[relative_path] = hash_value
+        if on_hash is not None:
+            on_hash(relative_path, hash_value)
+    
+    def files_to_hash() -> Iterator[Tuple[str, Path, List[int]]]:
+        for relative_path, file_path, fingerprint in iter_files(root, path_filter):
+            check_cancelled(cancel)
+            stats[relative_path] = fingerprint
             
-            if hash_value is not None:
-                baseline[str(relative_path)] = hash_value
+            if reusable(relative_path, fingerprint):
+                record(relative_path, prior.hashes[relative_path])
+                if block_hashed(fingerprint):
+                    if options.block_digests:
+                        blocks[relative_path] = prior.blocks[relative_path]
+                elif options.precheck:
+                    checksums[relative_path] = prior.checksums[relative_path]
+            elif block_hashed(fingerprint):
+                # Hashed here, with every worker on this file's blocks
+                digests = file_block_digests(
+                    file_path, options.algorithm, HASH_BLOCK_SIZE, options.workers,
+                    options.cache_mode
+                )
+                if digests is None:
+                    stats.pop(relative_path, None)
+                    continue
+                record(relative_path, digests[0])
+                if options.block_digests:
+                    blocks[relative_path] = digests[1]
+            else:
+                yield relative_path, file_path, fingerprint
+    
+    with REGISTRY.phase('scan'):
+        ordered = order_files(files_to_hash(), options.scan_order, options.workers)
+        if options.precheck:
+            for relative_path, digests in hash_files_with_checksums(ordered, options):
+                check_cancelled(cancel)
+                if digests is not None:
+                    record(relative_path, digests[0])
+                    checksums[relative_path] = digests[1]
+                else:
+                    stats.pop(relative_path, None)
+        else:
+            for relative_path, hash_value in hash_files(ordered, options):
+                check_cancelled(cancel)
+                if hash_value is not None:
+                    record(relative_path, hash_value)
+                else:
+                    stats.pop(relative_path, None)
+    if REGISTRY.enabled:
+        FILES_WALKED.inc(len(stats))
+    
+    if options.quick:
+        with REGISTRY.phase('fingerprint'):
+            for relative_path, fingerprint in stats.items():
+                check_cancelled(cancel)
+                if fingerprint[2] < QUICK_MIN_SIZE or relative_path not in hashes:
+                    continue
+                if reuse_fingerprints and relative_path in prior.fingerprints \
+                        and prior.stats.get(relative_path) == fingerprint \
+                        and prior.hashes.get(relative_path) == hashes[relative_path]:
+                    fingerprints[relative_path] = prior.fingerprints[relative_path]
+                    continue
+                sampled = file_fingerprint(root / relative_path, options.algorithm)
+                if sampled is not None:
+                    fingerprints[relative_path] = sampled
+    
+    with REGISTRY.phase('tree'):
+        tree = build_tree(hashes, options.algorithm)
+    
+    return BaselineData(
+        hashes=hashes,
+        stats=stats,
+        checksums=checksums,
+        fingerprints=fingerprints,
+        tree=tree,
+        blocks=blocks,
+        header=header
+    )
+
+
+def build_baseline(root: Path, options: Optional[ScanOptions] = None) -> Dict[str, str]:
+    """
+    Build baseline by scanning all files in directory tree.
     
-    return baseline
+    Args:
+        root: Root directory to scan
+        options: Scan options such as the number of hashing workers
+        
+    Returns:
+        Dictionary mapping relative file paths to hashes (SHA256 by default)
+    """
+    return dict(scan_baseline(root, options).hashes)
 
 
 def save_baseline(baseline: Dict[str, str], path: Path) -> None:
@@ -40,10 +200,81 @@ def save_baseline(baseline: Dict[str, str], path: Path) -> None:
         baseline: Dictionary mapping file paths to hashes
         path: Path to save baseline to
     """
-    data = {
-        'baseline': baseline
+    save_baseline_data(BaselineData(hashes=baseline), path)
+
+
+def save_baseline_data(data: BaselineData, path: Path) -> None:
+    """
+    Save baseline hashes and their metadata.
+    
+    Paths ending in .fimb are written in the compact binary format,
+    anything else as JSON. The Merkle tree is built first if data has none.
+    
+    Args:
+        data: Baseline data to save
+        path: Path to save baseline to
+    """
+    with REGISTRY.phase('save'):
+        _save_baseline_data(data, path)
+
+
+def _save_baseline_data(data: BaselineData, path: Path) -> None:
+    """Save baseline data in the format chosen by the path suffix."""
+    if not data.tree:
+        data.tree = build_tree(data.hashes, data.algorithm)
+    
+    if path.suffix == BINARY_SUFFIX:
+        save_binary_baseline(data, path)
+        return
+    
+    document = {
+        'header': dict(data.header, algorithm=data.algorithm),
+        'baseline': dict(data.hashes)
     }
-    save_json(data, path)
+    if data.stats:
+        document['stats'] = dict(data.stats)
+    if data.checksums:
+        document['checksums'] = dict(data.checksums)
+    if data.fingerprints:
+        document['fingerprints'] = dict(data.fingerprints)
+    document['tree'] = dict(data.tree)
+    if data.blocks:
+        document['blocks'] = {path: list(digests) for path, digests in data.blocks.items()}
+    save_json(document, path)
+
+
+def load_baseline_data(path: Path) -> BaselineData:
+    """
+    Load baseline hashes and their metadata.
+    
+    Binary baselines are detected by their magic bytes and memory mapped
+    instead of parsed; JSON baselines are loaded into a BaselineStore.
+    
+    Args:
+        path: Path to baseline JSON or binary file
+    
+    Returns:
+        Baseline data; baselines without a header are SHA256
+    
+    Raises:
+        FileNotFoundError: If baseline file doesn't exist
+    """
+    with REGISTRY.phase('load'):
+        if is_binary_baseline(path):
+            return load_binary_baseline(path)
+        
+        document = load_json(path)
+        data = BaselineData(
+            stats=document.get('stats', {}),
+            checksums=document.get('checksums', {}),
+            fingerprints=document.get('fingerprints', {}),
+            tree=document.get('tree', {}),
+            blocks=document.get('blocks', {}),
+            header=document.get('header', {})
+        )
+        # The parsed dictionary is dropped once its hashes are stored compactly
+        data.hashes = BaselineStore(document.pop('baseline', {}), data.algorithm)
+        return data
 
 
 def load_baseline(path: Path) -> Dict[str, str]:
@@ -59,5 +290,70 @@ def load_baseline(path: Path) -> Dict[str, str]:
     Raises:
         FileNotFoundError: If baseline file doesn't exist
     """
-    data = load_json(path)
-    return data.get('baseline', {})
+    return dict(load_baseline_data(path).hashes)
+
+
+def convert_baseline(source: Path, destination: Path) -> BaselineData:
+    """
+    Convert a baseline between the JSON and binary formats.
+    
+    Args:
+        source: Path to existing baseline (either format)
+        destination: Output path; the format is chosen from its suffix
+    
+    Returns:
+        The converted baseline data
+    """
+    data = load_baseline_data(source)
+    save_baseline_data(data, destination)
+    return data
+
+
+def _state_path(baseline_path: Path) -> Path:
+    """Get path of the run state file kept next to a baseline."""
+    return baseline_path.with_name(baseline_path.name + '.state')
+
+
+def needs_full_rehash(baseline_path: Path, options: ScanOptions) -> bool:
+    """
+    Decide whether this run must rehash every file.
+    
+    Args:
+        baseline_path: Path to baseline file
+        options: Scan options with trust-stat and quick settings
+    
+    Returns:
+        True unless trust-stat or quick mode is enabled and no full rehash is due
+    """
+    if not (options.trust_stat or options.quick):
+        return True
+    
+    if options.full_rehash_every <= 0:
+        return False
+    
+    try:
+        runs: int = load_json(_state_path(baseline_path)).get('incremental_runs', 0)
+    except (OSError, ValueError):
+        runs = 0
+    
+    return runs + 1 >= options.full_rehash_every
+
+
+def record_run(baseline_path: Path, full_rehash: bool) -> None:
+    """
+    Record a completed scan in the run state file next to the baseline.
+    
+    Args:
+        baseline_path: Path to baseline file
+        full_rehash: Whether every file was hashed during this run
+    """
+    state_path = _state_path(baseline_path)
+    runs = 0
+    
+    if not full_rehash:
+        try:
+            runs = load_json(state_path).get('incremental_runs', 0) + 1
+        except (OSError, ValueError):
+            runs = 1
+    
+    save_json({'incremental_runs': runs}, state_path)
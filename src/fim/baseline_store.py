@@ -0,0 +1,303 @@
+"""Compact in-memory baseline store for File Integrity Monitor."""
+
+import hashlib
+import os
+import sys
+import threading
+from collections.abc import ItemsView, MutableMapping
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .hasher import DEFAULT_ALGORITHM
+
+# Digest slots per page; pages are the unit copied on write after a snapshot
+PAGE_ENTRIES = 4096
+
+_ROOT = 0
+
+
+class _Directories:
+    """
+    Append-only table of directories, shared by a store and its snapshots.
+    
+    Each directory is stored once as (parent id, interned name), so the
+    common prefixes of millions of paths are kept once per directory
+    instead of once per file.
+    """
+    
+    def __init__(self) -> None:
+        self.parents: List[int] = [-1]
+        self.names: List[str] = ['']
+        self.ids: Dict[str, int] = {}  # Relative directory path -> id
+        self._lock = threading.RLock()
+    
+    def add(self, head: str) -> int:
+        """Get the id of a directory, adding it and its parents if needed."""
+        with self._lock:
+            dir_id = self.ids.get(head)
+            if dir_id is None:
+                parent_head, sep, name = head.rpartition(os.sep)
+                parent = self.add(parent_head) if sep else _ROOT
+                dir_id = len(self.names)
+                self.parents.append(parent)
+                self.names.append(sys.intern(name))
+                self.ids[head] = dir_id
+            return dir_id
+    
+    def path(self, dir_id: int) -> str:
+        """Get the relative path of a directory."""
+        parts = []
+        while dir_id != _ROOT:
+            parts.append(self.names[dir_id])
+            dir_id = self.parents[dir_id]
+        return os.sep.join(reversed(parts))
+
+
+class _Items(ItemsView):
+    """Items view that walks the tables instead of looking up every key."""
+    
+    _mapping: 'BaselineStore'
+    
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return self._mapping.iter_items()
+
+
+class BaselineStore(MutableMapping):
+    """
+    Mapping of relative paths to hex digests, stored compactly.
+    
+    Paths are split into a directory id and an interned file name, and
+    digests are kept as raw bytes in fixed-width slots of contiguous pages.
+    snapshot() and copy() share everything with the store; whichever side
+    changes a page or a directory's file table afterwards copies just that
+    part first. Values that aren't hex digests of the expected size are kept
+    as given.
+    """
+    
+    def __init__(self, items: Optional[Mapping[str, str]] = None, algorithm: str = DEFAULT_ALGORITHM):
+        """
+        Initialize store.
+        
+        Args:
+            items: Initial path to hex digest mapping
+            algorithm: Hash algorithm of the digests, fixes the slot width
+        """
+        self.algorithm = algorithm
+        self.digest_size = hashlib.new(algorithm).digest_size
+        self.read_only = False
+        
+        self._dirs = _Directories()
+        self._files: List[Optional[Dict[str, int]]] = [{}]  # Per directory: name -> slot
+        self._pages: List[bytearray] = []
+        self._free: List[int] = []
+        self._other: Dict[str, str] = {}  # Values that aren't digests, by path
+        self._next_slot = 0
+        self._count = 0
+        
+        # Parts this store may change in place; the rest is shared
+        self._owned = True
+        self._owned_dirs: Set[int] = {_ROOT}
+        self._owned_pages: Set[int] = set()
+        
+        if items is not None:
+            self.update(items)
+    
+    @classmethod
+    def from_mapping(cls, mapping: Mapping[str, str], algorithm: str = DEFAULT_ALGORITHM) -> 'BaselineStore':
+        """
+        Get a store with the contents of a mapping.
+        
+        Stores with the same algorithm are copied on write instead of
+        being rebuilt.
+        
+        Args:
+            mapping: Path to hex digest mapping
+            algorithm: Hash algorithm of the digests
+        
+        Returns:
+            New store that can be changed independently of mapping
+        """
+        if isinstance(mapping, cls) and mapping.algorithm == algorithm:
+            return mapping.copy()
+        return cls(mapping, algorithm)
+    
+    def _share(self, read_only: bool) -> 'BaselineStore':
+        """Create a store sharing all data with this one."""
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.read_only = read_only
+        other._owned = False
+        other._owned_dirs = set()
+        other._owned_pages = set()
+        
+        self._owned = False
+        self._owned_dirs = set()
+        self._owned_pages = set()
+        return other
+    
+    def snapshot(self) -> 'BaselineStore':
+        """
+        Take a read-only snapshot without copying any data.
+        
+        Returns:
+            Store with the current contents that never changes
+        """
+        return self._share(read_only=True)
+    
+    def copy(self) -> 'BaselineStore':
+        """
+        Take a copy without copying any data up front.
+        
+        Returns:
+            Store with the current contents that can be changed independently
+        """
+        return self._share(read_only=False)
+    
+    def _split(self, rel_path: str) -> Tuple[Optional[int], str]:
+        """Get the directory id and file name of a path; the id is None if unknown."""
+        head, sep, name = rel_path.rpartition(os.sep)
+        if not sep:
+            return _ROOT, name
+        return self._dirs.ids.get(head), name
+    
+    def _split_adding(self, rel_path: str) -> Tuple[int, str]:
+        """Get the directory id and file name of a path, adding the directory if needed."""
+        head, sep, name = rel_path.rpartition(os.sep)
+        return (self._dirs.add(head) if sep else _ROOT), name
+    
+    def _names(self, dir_id: Optional[int]) -> Optional[Dict[str, int]]:
+        """Get the file table of a directory for reading."""
+        if dir_id is None or dir_id >= len(self._files):
+            return None
+        return self._files[dir_id]
+    
+    def _writable(self) -> None:
+        """Take ownership of the lists before changing them."""
+        if self.read_only:
+            raise TypeError("Baseline snapshots are read-only")
+        if not self._owned:
+            self._files = list(self._files)
+            self._pages = list(self._pages)
+            self._free = list(self._free)
+            self._other = dict(self._other)
+            self._owned = True
+    
+    def _writable_names(self, dir_id: int) -> Dict[str, int]:
+        """Get the file table of a directory for changing it."""
+        if dir_id >= len(self._files):
+            self._files.extend([None] * (dir_id + 1 - len(self._files)))
+        names = self._files[dir_id]
+        if names is None or dir_id not in self._owned_dirs:
+            names = self._files[dir_id] = dict(names) if names else {}
+            self._owned_dirs.add(dir_id)
+        return names
+    
+    def _writable_page(self, page: int) -> bytearray:
+        """Get a digest page for changing it."""
+        if page == len(self._pages):
+            self._pages.append(bytearray(PAGE_ENTRIES * self.digest_size))
+            self._owned_pages.add(page)
+        elif page not in self._owned_pages:
+            self._pages[page] = bytearray(self._pages[page])
+            self._owned_pages.add(page)
+        return self._pages[page]
+    
+    def _pack(self, value: str) -> Optional[bytes]:
+        """Get the raw digest of a hex digest, None if it isn't one."""
+        try:
+            digest = bytes.fromhex(value)
+        except (ValueError, TypeError):
+            return None
+        if len(digest) != self.digest_size or digest.hex() != value:
+            return None
+        return digest
+    
+    def _digest(self, slot: int) -> str:
+        page, index = divmod(slot, PAGE_ENTRIES)
+        start = index * self.digest_size
+        return self._pages[page][start:start + self.digest_size].hex()
+    
+    def __getitem__(self, rel_path: str) -> str:
+        dir_id, name = self._split(rel_path)
+        names = self._names(dir_id)
+        slot = names.get(name) if names else None
+        if slot is not None:
+            return self._digest(slot)
+        return self._other[rel_path]
+    
+    def __contains__(self, rel_path: object) -> bool:
+        if not isinstance(rel_path, str):
+            return False
+        dir_id, name = self._split(rel_path)
+        names = self._names(dir_id)
+        return (names is not None and name in names) or rel_path in self._other
+    
+    def __setitem__(self, rel_path: str, value: str) -> None:
+        self._writable()
+        digest = self._pack(value)
+        
+        if digest is None:
+            if rel_path not in self._other:
+                self._remove(rel_path)
+                self._count += 1
+            self._other[rel_path] = value
+            return
+        
+        if self._other.pop(rel_path, None) is not None:
+            self._count -= 1
+        
+        dir_id, name = self._split_adding(rel_path)
+        names = self._writable_names(dir_id)
+        slot = names.get(name)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = self._next_slot
+                self._next_slot += 1
+            names[sys.intern(name)] = slot
+            self._count += 1
+        
+        page, index = divmod(slot, PAGE_ENTRIES)
+        start = index * self.digest_size
+        self._writable_page(page)[start:start + self.digest_size] = digest
+    
+    def _remove(self, rel_path: str) -> bool:
+        """Remove a path stored as a digest slot."""
+        dir_id, name = self._split(rel_path)
+        names = self._names(dir_id)
+        if dir_id is None or not names or name not in names:
+            return False
+        slot = self._writable_names(dir_id).pop(name)
+        self._free.append(slot)
+        self._count -= 1
+        return True
+    
+    def __delitem__(self, rel_path: str) -> None:
+        self._writable()
+        if self._remove(rel_path):
+            return
+        del self._other[rel_path]
+        self._count -= 1
+    
+    def __iter__(self) -> Iterator[str]:
+        for rel_path, _ in self.iter_items():
+            yield rel_path
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def items(self) -> _Items:
+        return _Items(self)
+    
+    def iter_items(self) -> Iterator[Tuple[str, str]]:
+        """Iterate (path, digest) pairs, grouped by directory."""
+        for dir_id, names in enumerate(self._files):
+            if not names:
+                continue
+            prefix = self._dirs.path(dir_id) + os.sep if dir_id != _ROOT else ''
+            for name, slot in names.items():
+                yield prefix + name, self._digest(slot)
+        yield from self._other.items()
+    
+    def __repr__(self) -> str:
+        return f"BaselineStore({len(self)} entries, algorithm={self.algorithm!r})"
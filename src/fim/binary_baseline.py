@@ -0,0 +1,580 @@
+"""Compact binary baseline format for File Integrity Monitor.
+
+Layout (little endian, every section padded to 8 bytes):
+    
+    header        magic, version, digest size, flags, entry count,
+                  path table size, metadata size
+    metadata      JSON baseline header (algorithm, ...)
+    offsets       (count + 1) uint64 offsets into the path table
+    path table    UTF-8 paths sorted bytewise, concatenated
+    digests       count raw digests of digest size bytes
+    stats         optional, count x (dev, inode, size, mtime_ns, ctime_ns)
+    checksums     optional, count x int64 CRC32 (-1 if not recorded)
+    fingerprints  optional, count x sampled fingerprint of digest size
+                  (all zero if not recorded)
+    tree          optional Merkle directory tree: uint64 directory count and
+                  path table size, then offsets, sorted directory paths and
+                  digests laid out like the sections above
+    blocks        optional block digests: uint64 total block count, then
+                  (count + 1) uint64 offsets into the digests, counted in
+                  blocks, and the raw block digests of every entry in order
+
+Files are memory mapped and looked up by binary search over the sorted path
+table, so nothing is parsed up front.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import ItemsView
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from .models import BaselineData
+
+MAGIC = b'FIMB'
+VERSION = 1
+
+# Baselines saved to paths with this suffix use the binary format
+BINARY_SUFFIX = '.fimb'
+
+FLAG_STATS = 1
+FLAG_CHECKSUMS = 2
+FLAG_FINGERPRINTS = 4
+FLAG_TREE = 8
+FLAG_BLOCKS = 16
+
+_HEADER = struct.Struct('<4sHHIQQQ')
+_OFFSET = struct.Struct('<Q')
+_STAT = struct.Struct('<QQQqq')
+_CHECKSUM = struct.Struct('<q')
+_TREE_HEADER = struct.Struct('<QQ')
+
+_NO_STAT = (0, 0, 0, 0, 0)
+_NO_CHECKSUM = -1
+
+# Number of entries written per write() call
+_WRITE_BATCH = 4096
+
+
+def _padding(size: int) -> bytes:
+    """Get the zero bytes needed to align size to 8 bytes."""
+    return b'\0' * (-size % 8)
+
+
+def _encode_path(path: str) -> bytes:
+    """Encode a relative path as stored in the path table."""
+    return path.encode('utf-8', 'surrogateescape')
+
+
+def _decode_path(data: bytes) -> str:
+    """Decode a path from the path table."""
+    return data.decode('utf-8', 'surrogateescape')
+
+
+def _bisect(path_bytes: Callable[[int], bytes], count: int, target: bytes) -> int:
+    """Find the first index of a sorted path table whose path is >= target."""
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        if path_bytes(middle) < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def is_binary_baseline(path: Path) -> bool:
+    """
+    Check whether a file is a binary baseline.
+    
+    Args:
+        path: Path to baseline file
+    
+    Returns:
+        True if the file starts with the binary baseline magic
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def save_binary_baseline(data: BaselineData, path: Path) -> None:
+    """
+    Save baseline data in the binary format.
+    
+    The file is written next to path and renamed into place, so a baseline
+    that is currently memory mapped can be replaced safely.
+    
+    Args:
+        data: Baseline data to save
+        path: Path to save baseline to
+    
+    Raises:
+        ValueError: If a hash is not a hex digest of the baseline's algorithm
+    """
+    digest_size = hashlib.new(data.algorithm).digest_size
+    entries = sorted((_encode_path(rel_path), rel_path) for rel_path in data.hashes)
+    
+    flags = 0
+    if data.stats:
+        flags |= FLAG_STATS
+    if data.checksums:
+        flags |= FLAG_CHECKSUMS
+    if data.fingerprints:
+        flags |= FLAG_FINGERPRINTS
+    if data.tree:
+        flags |= FLAG_TREE
+    if data.blocks:
+        flags |= FLAG_BLOCKS
+    
+    metadata = json.dumps(dict(data.header, algorithm=data.algorithm)).encode('utf-8')
+    names_size = sum(len(encoded) for encoded, _ in entries)
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(
+                MAGIC, VERSION, digest_size, flags, len(entries), names_size, len(metadata)
+            ))
+            f.write(metadata + _padding(len(metadata)))
+            
+            offset = 0
+            f.write(_OFFSET.pack(offset))
+            for start in range(0, len(entries), _WRITE_BATCH):
+                chunk = []
+                for encoded, _ in entries[start:start + _WRITE_BATCH]:
+                    offset += len(encoded)
+                    chunk.append(_OFFSET.pack(offset))
+                f.write(b''.join(chunk))
+            
+            for start in range(0, len(entries), _WRITE_BATCH):
+                f.write(b''.join(encoded for encoded, _ in entries[start:start + _WRITE_BATCH]))
+            f.write(_padding(names_size))
+            
+            for start in range(0, len(entries), _WRITE_BATCH):
+                chunk = []
+                for _, rel_path in entries[start:start + _WRITE_BATCH]:
+                    digest = bytes.fromhex(data.hashes[rel_path])
+                    if len(digest) != digest_size:
+                        raise ValueError(f"Invalid {data.algorithm} digest for {rel_path}")
+                    chunk.append(digest)
+                f.write(b''.join(chunk))
+            f.write(_padding(len(entries) * digest_size))
+            
+            if flags & FLAG_STATS:
+                for start in range(0, len(entries), _WRITE_BATCH):
+                    f.write(b''.join(
+                        _STAT.pack(*data.stats.get(rel_path, _NO_STAT))
+                        for _, rel_path in entries[start:start + _WRITE_BATCH]
+                    ))
+            
+            if flags & FLAG_CHECKSUMS:
+                for start in range(0, len(entries), _WRITE_BATCH):
+                    f.write(b''.join(
+                        _CHECKSUM.pack(_checksum_value(data.checksums.get(rel_path)))
+                        for _, rel_path in entries[start:start + _WRITE_BATCH]
+                    ))
+            
+            if flags & FLAG_FINGERPRINTS:
+                no_fingerprint = b'\0' * digest_size
+                for start in range(0, len(entries), _WRITE_BATCH):
+                    chunk = []
+                    for _, rel_path in entries[start:start + _WRITE_BATCH]:
+                        fingerprint = data.fingerprints.get(rel_path)
+                        chunk.append(
+                            bytes.fromhex(fingerprint) if fingerprint is not None else no_fingerprint
+                        )
+                    f.write(b''.join(chunk))
+                f.write(_padding(len(entries) * digest_size))
+            
+            if flags & FLAG_TREE:
+                _write_tree(f, data.tree)
+            
+            if flags & FLAG_BLOCKS:
+                _write_blocks(f, [data.blocks.get(rel_path, ()) for _, rel_path in entries])
+            
+            f.flush()
+            os.fsync(f.fileno())
+        
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_tree(f: Any, tree: Mapping[str, str]) -> None:
+    """Write the Merkle tree section: a sorted table of directory digests."""
+    directories = sorted((_encode_path(directory), digest) for directory, digest in tree.items())
+    names_size = sum(len(encoded) for encoded, _ in directories)
+    f.write(_TREE_HEADER.pack(len(directories), names_size))
+    
+    offset = 0
+    offsets = [_OFFSET.pack(offset)]
+    for encoded, _ in directories:
+        offset += len(encoded)
+        offsets.append(_OFFSET.pack(offset))
+    f.write(b''.join(offsets))
+    
+    f.write(b''.join(encoded for encoded, _ in directories) + _padding(names_size))
+    digests = b''.join(bytes.fromhex(digest) for _, digest in directories)
+    f.write(digests + _padding(len(digests)))
+
+
+def _write_blocks(f: Any, entry_blocks: List[Any]) -> None:
+    """Write the block digests section, entry_blocks holding each entry's digests."""
+    total = sum(len(digests) for digests in entry_blocks)
+    f.write(_OFFSET.pack(total))
+    
+    offset = 0
+    offsets = [_OFFSET.pack(offset)]
+    for digests in entry_blocks:
+        offset += len(digests)
+        offsets.append(_OFFSET.pack(offset))
+    f.write(b''.join(offsets))
+    
+    size = 0
+    for digests in entry_blocks:
+        if digests:
+            chunk = b''.join(bytes.fromhex(digest) for digest in digests)
+            size += len(chunk)
+            f.write(chunk)
+    f.write(_padding(size))
+
+
+def _checksum_value(checksum: Optional[str]) -> int:
+    """Convert a hex CRC32 to its stored integer form."""
+    return int(checksum, 16) if checksum is not None else _NO_CHECKSUM
+
+
+class _Items(ItemsView):
+    """Items view that reads entries sequentially instead of searching."""
+    
+    _mapping: 'BinaryBaseline'
+    
+    def __iter__(self) -> Iterator[Any]:
+        return self._mapping.iter_items()
+
+
+class _Column(Mapping[str, Any]):
+    """Read-only mapping over one per-entry column of a binary baseline."""
+    
+    def __init__(self, baseline: 'BinaryBaseline', getter: Callable[[int], Any], present: bool):
+        """
+        Initialize column.
+        
+        Args:
+            baseline: Baseline the column belongs to
+            getter: Function getting the value of an entry index, None if unset
+            present: Whether the file has this column at all
+        """
+        self._baseline = baseline
+        self._getter = getter
+        self._present = present
+        self._len: Optional[int] = None
+    
+    def __getitem__(self, rel_path: str) -> Any:
+        index = self._baseline.index(rel_path)
+        value = self._getter(index) if index is not None else None
+        if value is None:
+            raise KeyError(rel_path)
+        return value
+    
+    def __iter__(self) -> Iterator[str]:
+        for index, rel_path in enumerate(self._baseline):
+            if self._getter(index) is not None:
+                yield rel_path
+    
+    def __len__(self) -> int:
+        # Counting walks the whole column, so it is done once; the file is read-only
+        if self._len is None:
+            self._len = sum(1 for _ in self) if self._present else 0
+        return self._len
+    
+    def __bool__(self) -> bool:
+        # Stops at the first set entry instead of counting them all
+        return self._present and next(iter(self), None) is not None
+
+
+class _TreeTable(Mapping[str, str]):
+    """Read-only mapping of directory paths to Merkle digests in a binary baseline."""
+    
+    def __init__(self, mapped: mmap.mmap, position: int, digest_size: int):
+        self._mmap = mapped
+        count, names_size = _TREE_HEADER.unpack_from(mapped, position)
+        self._count: int = count
+        self.digest_size = digest_size
+        
+        self._offsets_start = position + _TREE_HEADER.size
+        self._names_start = self._offsets_start + (self._count + 1) * _OFFSET.size
+        self._digests_start = self._names_start + names_size + len(_padding(names_size))
+        self.end = self._digests_start + self._count * digest_size
+        self.end += len(_padding(self._count * digest_size))
+    
+    def _path_bytes(self, index: int) -> bytes:
+        start, end = struct.unpack_from(
+            '<QQ', self._mmap, self._offsets_start + index * _OFFSET.size
+        )
+        return self._mmap[self._names_start + start:self._names_start + end]
+    
+    def __getitem__(self, directory: str) -> str:
+        target = _encode_path(directory)
+        index = _bisect(self._path_bytes, self._count, target)
+        if index == self._count or self._path_bytes(index) != target:
+            raise KeyError(directory)
+        start = self._digests_start + index * self.digest_size
+        return self._mmap[start:start + self.digest_size].hex()
+    
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield _decode_path(self._path_bytes(index))
+    
+    def __len__(self) -> int:
+        return self._count
+
+
+class BinaryBaseline(Mapping[str, str]):
+    """Memory mapped binary baseline, mapping relative paths to hex digests."""
+    
+    def __init__(self, path: Path):
+        """
+        Open a binary baseline.
+        
+        Args:
+            path: Path to binary baseline file
+        
+        Raises:
+            ValueError: If the file is not a supported binary baseline
+        """
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            
+            magic, version, digest_size, flags, count, names_size, metadata_size = \
+                _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a binary baseline")
+            if version != VERSION:
+                raise ValueError(f"Unsupported binary baseline version {version}")
+        except (ValueError, struct.error):
+            self._file.close()
+            raise ValueError(f"{path} is not a valid binary baseline")
+        
+        self.digest_size = digest_size
+        self._count: int = count
+        
+        position = _HEADER.size
+        self.header: Dict[str, Any] = json.loads(
+            self._mmap[position:position + metadata_size].decode('utf-8')
+        )
+        position += metadata_size + len(_padding(metadata_size))
+        
+        self._offsets_start = position
+        position += (count + 1) * _OFFSET.size
+        
+        self._names_start = position
+        position += names_size + len(_padding(names_size))
+        
+        self._digests_start = position
+        position += count * digest_size + len(_padding(count * digest_size))
+        
+        self._stats_start: Optional[int] = None
+        if flags & FLAG_STATS:
+            self._stats_start = position
+            position += count * _STAT.size
+        
+        self._checksums_start: Optional[int] = None
+        if flags & FLAG_CHECKSUMS:
+            self._checksums_start = position
+            position += count * _CHECKSUM.size
+        
+        self._fingerprints_start: Optional[int] = None
+        if flags & FLAG_FINGERPRINTS:
+            self._fingerprints_start = position
+            position += count * digest_size + len(_padding(count * digest_size))
+        
+        self.tree: Mapping[str, str] = {}
+        self._blocks_start: Optional[int] = None
+        try:
+            if flags & FLAG_TREE:
+                self.tree = _TreeTable(self._mmap, position, digest_size)
+                position = self.tree.end
+            
+            if flags & FLAG_BLOCKS:
+                total, = _OFFSET.unpack_from(self._mmap, position)
+                self._blocks_start = position + _OFFSET.size
+                self._block_digests_start = self._blocks_start + (count + 1) * _OFFSET.size
+                position = self._block_digests_start + total * digest_size
+                position += len(_padding(total * digest_size))
+        except struct.error:
+            position = len(self._mmap) + 1
+        
+        if position > len(self._mmap):
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        
+        self.stats: Mapping[str, List[int]] = _Column(
+            self, self.stat_at, self._stats_start is not None
+        )
+        self.checksums: Mapping[str, str] = _Column(
+            self, self.checksum_at, self._checksums_start is not None
+        )
+        self.fingerprints: Mapping[str, str] = _Column(
+            self, self.fingerprint_at, self._fingerprints_start is not None
+        )
+        self.blocks: Mapping[str, List[str]] = _Column(
+            self, self.blocks_at, self._blocks_start is not None
+        )
+    
+    def _path_bytes(self, index: int) -> bytes:
+        """Get the encoded path of entry index."""
+        start, end = struct.unpack_from(
+            '<QQ', self._mmap, self._offsets_start + index * _OFFSET.size
+        )
+        return self._mmap[self._names_start + start:self._names_start + end]
+    
+    def index(self, rel_path: str) -> Optional[int]:
+        """
+        Find the entry index of a path by binary search.
+        
+        Args:
+            rel_path: Relative file path
+        
+        Returns:
+            Entry index, or None if the path is not in the baseline
+        """
+        target = _encode_path(rel_path)
+        index = self.bisect(target)
+        
+        if index < self._count and self._path_bytes(index) == target:
+            return index
+        return None
+    
+    def bisect(self, target: bytes) -> int:
+        """
+        Find the first entry whose encoded path is not less than target.
+        
+        Args:
+            target: UTF-8 encoded path or path prefix
+        
+        Returns:
+            Entry index, len(self) if every path is less than target
+        """
+        return _bisect(self._path_bytes, self._count, target)
+    
+    def path_bytes_at(self, index: int) -> bytes:
+        """Get the UTF-8 encoded path of entry index."""
+        return self._path_bytes(index)
+    
+    def path_at(self, index: int) -> str:
+        """Get the relative path of entry index."""
+        return _decode_path(self._path_bytes(index))
+    
+    def digest_at(self, index: int) -> str:
+        """Get the hex digest of entry index."""
+        start = self._digests_start + index * self.digest_size
+        return self._mmap[start:start + self.digest_size].hex()
+    
+    def stat_at(self, index: int) -> Optional[List[int]]:
+        """Get the stat fingerprint of entry index, if recorded."""
+        if self._stats_start is None:
+            return None
+        fingerprint = _STAT.unpack_from(self._mmap, self._stats_start + index * _STAT.size)
+        return list(fingerprint) if fingerprint != _NO_STAT else None
+    
+    def checksum_at(self, index: int) -> Optional[str]:
+        """Get the pre-check CRC32 of entry index, if recorded."""
+        if self._checksums_start is None:
+            return None
+        value, = _CHECKSUM.unpack_from(
+            self._mmap, self._checksums_start + index * _CHECKSUM.size
+        )
+        return f'{value:08x}' if value != _NO_CHECKSUM else None
+    
+    def fingerprint_at(self, index: int) -> Optional[str]:
+        """Get the sampled fingerprint of entry index, if recorded."""
+        if self._fingerprints_start is None:
+            return None
+        start = self._fingerprints_start + index * self.digest_size
+        fingerprint = self._mmap[start:start + self.digest_size]
+        return fingerprint.hex() if fingerprint.count(0) != self.digest_size else None
+    
+    def blocks_at(self, index: int) -> Optional[List[str]]:
+        """Get the block digests of entry index, if recorded."""
+        if self._blocks_start is None:
+            return None
+        first, last = struct.unpack_from(
+            '<QQ', self._mmap, self._blocks_start + index * _OFFSET.size
+        )
+        if first == last:
+            return None
+        size = self.digest_size
+        start = self._block_digests_start
+        return [
+            self._mmap[start + block * size:start + (block + 1) * size].hex()
+            for block in range(first, last)
+        ]
+    
+    def __getitem__(self, rel_path: str) -> str:
+        index = self.index(rel_path)
+        if index is None:
+            raise KeyError(rel_path)
+        return self.digest_at(index)
+    
+    def __contains__(self, rel_path: object) -> bool:
+        return isinstance(rel_path, str) and self.index(rel_path) is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self.path_at(index)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def items(self) -> _Items:
+        return _Items(self)
+    
+    def iter_items(self) -> Iterator[Any]:
+        """Iterate (path, digest) pairs in path order."""
+        for index in range(self._count):
+            yield self.path_at(index), self.digest_at(index)
+    
+    def close(self) -> None:
+        """Unmap and close the baseline file."""
+        self._mmap.close()
+        self._file.close()
+    
+    def __enter__(self) -> 'BinaryBaseline':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def load_binary_baseline(path: Path) -> BaselineData:
+    """
+    Open a binary baseline as baseline data backed by the memory mapped file.
+    
+    Args:
+        path: Path to binary baseline file
+    
+    Returns:
+        Baseline data whose hashes, stats, checksums, fingerprints, tree
+        and blocks are read-only mappings
+    """
+    baseline = BinaryBaseline(path)
+    return BaselineData(
+        hashes=baseline,
+        stats=baseline.stats,
+        checksums=baseline.checksums,
+        fingerprints=baseline.fingerprints,
+        tree=baseline.tree,
+        blocks=baseline.blocks,
+        header=baseline.header
+    )
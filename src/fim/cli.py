@@ -1,16 +1,196 @@
 """Command Line Interface for File Integrity Monitor."""
 
 import argparse
+import json
 import sys
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Mapping, Tuple
 
-from .baseline import build_baseline, save_baseline, load_baseline
-from .storage import load_events, save_events
-from .watcher import watch_directory
-from .reporter import render_report
-from .hasher import file_sha256
-from .models import Event
+from .aggregate import GRANULARITIES, EventStats, aggregate_file, load_stats, save_stats
+from .baseline import (
+    convert_baseline, load_baseline_data, needs_full_rehash, record_run,
+    save_baseline_data, scan_baseline,
+)
+from .hasher import ALGORITHMS, DEFAULT_ALGORITHM
+from .journal import FSYNC_POLICIES, EventJournal, is_journal, journal_segments, save_journal
+from .merkle import baseline_events
+from .metrics import (
+    BYTES_HASHED, FILES_HASHED, FILES_WALKED, HASH_SECONDS, PHASE_SECONDS, REGISTRY,
+    THROTTLE_PACE, THROTTLE_SECONDS, WATCH_COALESCED, WATCH_DROPPED, WATCH_EVENTS,
+    WATCH_QUEUE_DEPTH, WATCH_QUEUE_FULL, hash_throughput,
+)
+from .storage import merge_pending_events, pending_events_path, save_events
+from .watcher import BACKPRESSURE_POLICIES, watch_directory
+from .reporter import render_report_file
+from .layout import SCAN_ORDERS
+from .models import Event, ScanOptions, ThrottleOptions, WatchOptions
+from .pagecache import CACHE_MODES, cache_modes_supported
+from .scanner import default_workers
+from .throttle import THROTTLE, parse_size
+from .verifier import TreeVerifier
+from .walker import PathFilter, load_config
+
+
+def _scan_options(args: argparse.Namespace) -> ScanOptions:
+    """Build scan options from command line arguments."""
+    if args.workers < 0:
+        print("Error: --workers must not be negative")
+        sys.exit(1)
+    
+    if args.full_rehash_every < 0:
+        print("Error: --full-rehash-every must not be negative")
+        sys.exit(1)
+    
+    if args.cache_mode != 'normal' and not cache_modes_supported():
+        print(f"Error: --cache-mode {args.cache_mode} needs posix_fadvise(), e.g. on Linux")
+        sys.exit(1)
+    
+    workers = args.workers or default_workers()
+    return ScanOptions(
+        workers=workers,
+        use_processes=args.processes,
+        use_mmap=args.mmap,
+        trust_stat=args.trust_stat,
+        full_rehash_every=args.full_rehash_every,
+        algorithm=getattr(args, 'algo', DEFAULT_ALGORITHM),
+        precheck=args.precheck,
+        quick=args.quick,
+        block_hash=getattr(args, 'block_hash', False) or getattr(args, 'block_digests', False),
+        block_digests=getattr(args, 'block_digests', False),
+        cache_mode=args.cache_mode,
+        scan_order=args.scan_order
+    )
+
+
+def _watch_options(args: argparse.Namespace) -> WatchOptions:
+    """Build watch options from command line arguments."""
+    if args.quiet_window < 0 or args.max_delay < 0:
+        print("Error: --quiet-window and --max-delay must not be negative")
+        sys.exit(1)
+    
+    if args.checkpoint_interval < 0 or args.checkpoint_events < 0:
+        print("Error: --checkpoint-interval and --checkpoint-events must not be negative")
+        sys.exit(1)
+    
+    if args.hash_workers < 0 or args.queue_size < 1:
+        print("Error: --hash-workers must not be negative and --queue-size must be positive")
+        sys.exit(1)
+    
+    if args.metrics_interval < 0:
+        print("Error: --metrics-interval must not be negative")
+        sys.exit(1)
+    
+    if args.cache_mode != 'normal' and not cache_modes_supported():
+        print(f"Error: --cache-mode {args.cache_mode} needs posix_fadvise(), e.g. on Linux")
+        sys.exit(1)
+    
+    return WatchOptions(
+        quiet_window=args.quiet_window,
+        max_delay=args.max_delay,
+        hash_workers=args.hash_workers,
+        queue_size=args.queue_size,
+        backpressure=args.backpressure,
+        checkpoint_interval=args.checkpoint_interval,
+        checkpoint_events=args.checkpoint_events,
+        metrics_interval=args.metrics_interval,
+        cache_mode=args.cache_mode
+    )
+
+
+def _configure_throttle(args: argparse.Namespace) -> None:
+    """Apply the resource limits from command line arguments to all hashing."""
+    try:
+        THROTTLE.configure(ThrottleOptions(
+            max_bytes_per_s=args.max_bytes_per_sec,
+            max_files_per_s=args.max_files_per_sec,
+            cpu_share=args.cpu_share,
+            max_read_latency=args.max_read_latency / 1000
+        ))
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def _path_filter(args: argparse.Namespace, root_path: Path, *own_files: Path) -> PathFilter:
+    """Build the include/exclude filter from the config file and command line."""
+    include: List[str] = []
+    exclude: List[str] = []
+    
+    if args.config:
+        try:
+            include, exclude = load_config(Path(args.config))
+        except (OSError, ValueError) as e:
+            print(f"Error loading config: {e}")
+            sys.exit(1)
+    
+    path_filter = PathFilter(include + (args.include or []), exclude + (args.exclude or []))
+    # Never monitor the files FIM itself writes
+    if getattr(args, 'metrics_file', None):
+        own_files += (Path(args.metrics_file),)
+    path_filter.exclude_own_files(root_path, own_files)
+    return path_filter
+
+
+def _start_metrics(args: argparse.Namespace) -> None:
+    """Enable the metrics registry if --stats or --metrics-file was given."""
+    if args.stats or args.metrics_file:
+        REGISTRY.enable()
+
+
+def _finish_metrics(args: argparse.Namespace) -> None:
+    """Write the metrics file and print the performance summary as requested."""
+    if args.metrics_file:
+        try:
+            REGISTRY.write_prometheus(Path(args.metrics_file))
+        except OSError as e:
+            print(f"Warning: Could not write metrics to {args.metrics_file}: {e}")
+    if args.stats:
+        _print_metrics()
+
+
+def _print_metrics() -> None:
+    """Print per-phase wall time, hashing throughput and watcher counters."""
+    print("\nPerformance:")
+    for phase in PHASE_SECONDS.labels():
+        print(f"    {phase:<12}{PHASE_SECONDS.value(phase):>10.3f} s")
+    
+    files_per_s, bytes_per_s = hash_throughput()
+    print(f"    Walked {int(FILES_WALKED.value())} files, hashed {int(FILES_HASHED.value())} "
+          f"({BYTES_HASHED.value() / (1 << 20):.1f} MiB) in {REGISTRY.elapsed():.3f} s: "
+          f"{files_per_s:.1f} files/s, {bytes_per_s / (1 << 20):.1f} MiB/s")
+    
+    if HASH_SECONDS.count():
+        quantiles = ', '.join(
+            f"p{round(q * 100)} <= {(HASH_SECONDS.quantile(q) or 0.0) * 1000:g} ms"
+            for q in (0.5, 0.9, 0.99)
+        )
+        print(f"    Hash latency: {quantiles}")
+    
+    if THROTTLE.active:
+        limits = THROTTLE.options
+        settings = [
+            f"{limits.max_bytes_per_s / (1 << 20):g} MiB/s" if limits.max_bytes_per_s else '',
+            f"{limits.max_files_per_s:g} files/s" if limits.max_files_per_s else '',
+            f"CPU share {limits.cpu_share:g}" if limits.cpu_share else '',
+            f"reads under {limits.max_read_latency * 1000:g} ms" if limits.max_read_latency else '',
+        ]
+        waits = ', '.join(
+            f"{limit} {THROTTLE_SECONDS.value(limit):.3f} s" for limit in THROTTLE_SECONDS.labels()
+        )
+        print(f"    Throttle: {', '.join(filter(None, settings))}; waited {waits or 'never'}")
+        if limits.max_read_latency:
+            # Worker processes adapt their own pace; the gauge holds the last one reported
+            pace = THROTTLE_PACE.value() if THROTTLE_PACE.labels() else THROTTLE.pace
+            print(f"    Read pace after back-off: {pace:.2f}")
+    
+    if WATCH_EVENTS.labels():
+        print(f"    Watcher: {int(WATCH_EVENTS.value())} events received, "
+              f"{int(WATCH_COALESCED.value())} coalesced, {int(WATCH_DROPPED.value())} dropped, "
+              f"queues full {int(WATCH_QUEUE_FULL.value())} times, "
+              f"final queue depth {int(WATCH_QUEUE_DEPTH.value())}")
 
 
 def cmd_init(args: argparse.Namespace) -> None:
@@ -26,13 +206,32 @@ def cmd_init(args: argparse.Namespace) -> None:
         print(f"Error: {root_path} is not a directory")
         sys.exit(1)
     
-    print(f"Scanning {root_path}...")
-    baseline = build_baseline(root_path)
-    
-    print(f"Found {len(baseline)} files")
-    save_baseline(baseline, baseline_path)
+    options = _scan_options(args)
+    _configure_throttle(args)
+    _start_metrics(args)
+    # Reuse hashes of unchanged files from the existing baseline if trusted
+    previous = None
+    if options.trust_stat and not needs_full_rehash(baseline_path, options) \
+            and baseline_path.exists():
+        try:
+            previous = load_baseline_data(baseline_path)
+        except (OSError, ValueError):
+            pass
+    
+    path_filter = _path_filter(args, root_path, baseline_path)
+    print(f"Scanning {root_path} ({options.algorithm})...")
+    data = scan_baseline(root_path, options, previous, path_filter)
+    
+    print(f"Found {len(data.hashes)} files")
+    save_baseline_data(data, baseline_path)
+    
+    if options.trust_stat:
+        full_rehash = previous is None or previous.algorithm != options.algorithm \
+            or previous.block_hash != data.block_hash
+        record_run(baseline_path, full_rehash)
     
     print(f"Baseline saved to {baseline_path}")
+    _finish_metrics(args)
 
 
 def cmd_watch(args: argparse.Namespace) -> None:
@@ -40,6 +239,7 @@ def cmd_watch(args: argparse.Namespace) -> None:
     root_path = Path(args.path).resolve()
     baseline_path = Path(args.baseline)
     events_path = Path(args.events)
+    options = _watch_options(args)
     
     if not root_path.exists():
         print(f"Error: Directory {root_path} does not exist")
@@ -49,32 +249,80 @@ def cmd_watch(args: argparse.Namespace) -> None:
         print(f"Error: Baseline file {baseline_path} does not exist")
         sys.exit(1)
     
+    _configure_throttle(args)
+    _start_metrics(args)
     try:
-        baseline = load_baseline(baseline_path)
+        data = load_baseline_data(baseline_path)
     except Exception as e:
         print(f"Error loading baseline: {e}")
         sys.exit(1)
     
-    # Load existing events if they exist
-    existing_events = load_events(events_path)
-    
-    # Watch for changes
-    updated_baseline, new_events = watch_directory(root_path, baseline)
-    
-    # Combine with existing events
-    all_events = existing_events + new_events
+    path_filter = _path_filter(
+        args, root_path, baseline_path, events_path, events_path.parent / "report.html"
+    )
+    if is_journal(events_path):
+        journal = _open_journal(args, events_path)
+    else:
+        # Checkpoints append to a pending journal instead of rewriting the
+        # JSON file; it is merged on shutdown, or on the next run after a crash
+        merge_pending_events(events_path)
+        journal = EventJournal(pending_events_path(events_path), fsync=args.fsync,
+                               fsync_interval=args.fsync_interval)
+    detected = 0
+    
+    def checkpoint(baseline: Mapping[str, str], new_events: List[Event]) -> None:
+        """Persist the baseline and append the events detected since the last call."""
+        nonlocal detected
+        
+        # Save events first: a crash in between only replays them. Only the
+        # new events are written; history is never read back
+        journal.extend(new_events)
+        
+        # Stats and checksums of changed files are dropped so
+        # --trust-stat and --precheck can't vouch for them
+        data.hashes = baseline
+        data.discard_metadata(event.path for event in new_events)
+        save_baseline_data(data, baseline_path)
+        detected += len(new_events)
     
-    # Save updated baseline and events
-    save_baseline(updated_baseline, baseline_path)
-    save_events(all_events, events_path)
+    def export_metrics() -> None:
+        REGISTRY.write_prometheus(Path(args.metrics_file))
     
-    print(f"Detected {len(new_events)} new events")
+    # Watch for changes, checkpointing as configured and on shutdown
+    try:
+        with REGISTRY.phase('watch'):
+            watch_directory(root_path, data.hashes, data.algorithm, options, checkpoint,
+                            path_filter, data.block_hash,
+                            export_metrics if args.metrics_file else None)
+    finally:
+        journal.close()
+    
+    print(f"Detected {detected} new events")
     print(f"Updated baseline saved to {baseline_path}")
-    print(f"Events saved to {events_path}")
     
-    # Generate report
-    report_path = events_path.parent / "report.html"
-    render_report(all_events, report_path)
+    if is_journal(events_path):
+        print(f"Events appended to {events_path}")
+        print(f"Run 'fim report --events {events_path}' to generate a report")
+    else:
+        merge_pending_events(events_path)
+        print(f"Events saved to {events_path}")
+        
+        # Generate report
+        report_path = events_path.parent / "report.html"
+        render_report_file(events_path, report_path)
+    
+    _finish_metrics(args)
+
+
+def _open_journal(args: argparse.Namespace, events_path: Path) -> EventJournal:
+    """Open the events journal with the policy given on the command line."""
+    return EventJournal(
+        events_path,
+        fsync=args.fsync,
+        fsync_interval=args.fsync_interval,
+        max_bytes=args.rotate_bytes,
+        max_age=args.rotate_seconds
+    )
 
 
 def cmd_report(args: argparse.Namespace) -> None:
@@ -82,17 +330,87 @@ def cmd_report(args: argparse.Namespace) -> None:
     events_path = Path(args.events)
     output_path = Path(args.out)
     
-    if not events_path.exists():
+    if not events_path.exists() and not journal_segments(events_path):
         print(f"Error: Events file {events_path} does not exist")
         sys.exit(1)
     
+    if (args.page_size is not None and args.page_size < 1) or \
+            (args.max_rows is not None and args.max_rows < 1):
+        print("Error: --page-size and --max-rows must be positive")
+        sys.exit(1)
+    
+    # Events are streamed twice (count, then render) instead of loaded whole
     try:
-        events = load_events(events_path)
+        render_report_file(events_path, output_path, args.page_size, args.max_rows)
     except Exception as e:
+        print(f"Error generating report: {e}")
+        sys.exit(1)
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    """Summarize events: counts by type and time, most changed files and directories."""
+    if args.top < 1 or (args.depth is not None and args.depth < 0):
+        print("Error: --top must be positive and --depth must not be negative")
+        sys.exit(1)
+    
+    try:
+        if args.summary:
+            stats = load_stats(Path(args.summary))
+        else:
+            events_path = Path(args.events)
+            if not events_path.exists() and not journal_segments(events_path):
+                print(f"Error: Events file {events_path} does not exist")
+                sys.exit(1)
+            stats = aggregate_file(events_path)
+    except (OSError, ValueError) as e:
         print(f"Error loading events: {e}")
         sys.exit(1)
     
-    render_report(events, output_path)
+    if args.save:
+        save_stats(stats, Path(args.save))
+    
+    histogram = stats.histogram(args.by)
+    top_paths = stats.top_paths(args.top)
+    top_directories = stats.top_directories(args.top, args.depth)
+    
+    if args.json:
+        print(json.dumps({
+            'total': stats.total,
+            'types': dict(stats.type_counts),
+            'first_timestamp': stats.first_timestamp,
+            'last_timestamp': stats.last_timestamp,
+            'histogram': dict(histogram),
+            'top_paths': dict(top_paths),
+            'top_directories': dict(top_directories)
+        }, indent=2, ensure_ascii=False))
+        return
+    
+    _print_stats(stats, histogram, top_paths, top_directories, args.by)
+
+
+def _print_stats(stats: EventStats, histogram: List[Tuple[str, int]],
+                 top_paths: List[Tuple[str, int]], top_directories: List[Tuple[str, int]],
+                 granularity: str) -> None:
+    """Print event statistics as text."""
+    print(f"Total events: {stats.total}")
+    first, last = stats.first_timestamp, stats.last_timestamp
+    if first and last:
+        print(f"Period: {first[:19].replace('T', ' ')} to {last[:19].replace('T', ' ')}")
+    for event_type in ('ADDED', 'MODIFIED', 'DELETED'):
+        print(f"  {event_type:<10} {stats.type_counts.get(event_type, 0)}")
+    
+    sections = (
+        (f"Events per {granularity}", [(bucket.replace('T', ' '), n) for bucket, n in histogram]),
+        ("Most changed files", top_paths),
+        ("Most changed directories", top_directories),
+    )
+    for title, rows in sections:
+        if not rows:
+            continue
+        print(f"\n{title}:")
+        width = max(len(str(count)) for _, count in rows)
+        for label, count in rows:
+            print(f"  {count:>{width}}  {label}")
 
 
 def cmd_verify(args: argparse.Namespace) -> None:
@@ -108,63 +426,217 @@ def cmd_verify(args: argparse.Namespace) -> None:
         print(f"Error: Baseline file {baseline_path} does not exist")
         sys.exit(1)
     
+    options = _scan_options(args)
+    _configure_throttle(args)
+    _start_metrics(args)
     try:
-        baseline = load_baseline(baseline_path)
+        data = load_baseline_data(baseline_path)
     except Exception as e:
         print(f"Error loading baseline: {e}")
         sys.exit(1)
     
-    print(f"Verifying {len(baseline)} files...")
-    
-    mismatches = []
-    missing_files = []
-    extra_files = []
-    
-    # Check files in baseline
-    for rel_path, expected_hash in baseline.items():
-        file_path = root_path / rel_path
+    full_rehash = needs_full_rehash(baseline_path, options)
+    if full_rehash:
+        options = replace(options, trust_stat=False, quick=False)
+    
+    print(f"Verifying {len(data.hashes)} files ({data.algorithm})...")
+    
+    # Stream differences as the tree is walked
+    path_filter = _path_filter(args, root_path, baseline_path)
+    verifier = TreeVerifier(root_path, data, options, path_filter)
+    issue_counts: Counter = Counter()
+    
+    with REGISTRY.phase('verify'):
+        for result in verifier.results():
+            issue_counts[result.status] += 1
+            print(f"{result.status}: {result.path}")
+            
+            if result.status == 'MODIFIED':
+                print(f"    Expected: {result.expected_hash}")
+                print(f"    Actual:   {result.actual_hash}")
+                if result.changed_ranges:
+                    ranges = ', '.join(f"{start}-{end}" for start, end in result.changed_ranges)
+                    print(f"    Changed bytes: {ranges}")
         
-        if not file_path.exists():
-            missing_files.append(rel_path)
-        else:
-            actual_hash = file_sha256(file_path)
-            if actual_hash != expected_hash:
-                mismatches.append((rel_path, expected_hash, actual_hash))
-    
-    # Check for extra files
-    current_baseline = build_baseline(root_path)
-    for rel_path in current_baseline:
-        if rel_path not in baseline:
-            extra_files.append(rel_path)
-    
-    # Report results
-    if mismatches:
-        print(f"\nMODIFIED FILES ({len(mismatches)}):")
-        for path, expected, actual in mismatches:
-            print(f"  {path}")
-            print(f"    Expected: {expected}")
-            print(f"    Actual:   {actual}")
-    
-    if missing_files:
-        print(f"\nMISSING FILES ({len(missing_files)}):")
-        for path in missing_files:
-            print(f"  {path}")
-    
-    if extra_files:
-        print(f"\nEXTRA FILES ({len(extra_files)}):")
-        for path in extra_files:
-            print(f"  {path}")
-    
-    total_issues = len(mismatches) + len(missing_files) + len(extra_files)
+    if args.trust_stat or args.quick:
+        record_run(baseline_path, full_rehash)
+    if args.trust_stat:
+        if verifier.files_trusted:
+            print(f"Skipped {verifier.files_trusted} files with unchanged stat fingerprints")
+    
+    if options.precheck and verifier.files_prechecked:
+        print(f"Reported {verifier.files_prechecked} files as modified on a changed CRC32 "
+              f"without hashing them")
+    
+    if verifier.sampled_paths:
+        print(f"SAMPLED ONLY: {len(verifier.sampled_paths)} large files were verified by "
+              f"sampled fingerprint, not a full hash:")
+        for rel_path in verifier.sampled_paths:
+            print(f"    {rel_path}")
+    elif args.quick and full_rehash and data.fingerprints:
+        print("Full hash run: sampled fingerprints were not used")
+    
+    _finish_metrics(args)
+    total_issues = sum(issue_counts.values())
     
     if total_issues == 0:
         print("\nAll files match baseline ✓")
         sys.exit(0)
     else:
-        print(f"\nFound {total_issues} integrity issues")
+        summary = ', '.join(
+            f"{issue_counts[status]} {status.lower()}"
+            for status in ('MODIFIED', 'MISSING', 'EXTRA') if issue_counts[status]
+        )
+        print(f"\nFound {total_issues} integrity issues ({summary})")
         sys.exit(2)
 
 
+def cmd_convert(args: argparse.Namespace) -> None:
+    """Convert baseline between JSON and binary formats."""
+    baseline_path = Path(args.baseline)
+    output_path = Path(args.out)
+    
+    if not baseline_path.exists():
+        print(f"Error: Baseline file {baseline_path} does not exist")
+        sys.exit(1)
+    
+    try:
+        data = convert_baseline(baseline_path, output_path)
+    except Exception as e:
+        print(f"Error converting baseline: {e}")
+        sys.exit(1)
+    
+    print(f"Converted {len(data.hashes)} entries to {output_path}")
+
+
+def cmd_diff(args: argparse.Namespace) -> None:
+    """Compare two baselines and list what changed between them."""
+    old_path = Path(args.old)
+    new_path = Path(args.new)
+    
+    for path in (old_path, new_path):
+        if not path.exists():
+            print(f"Error: Baseline file {path} does not exist")
+            sys.exit(1)
+    
+    try:
+        old = load_baseline_data(old_path)
+        new = load_baseline_data(new_path)
+    except Exception as e:
+        print(f"Error loading baseline: {e}")
+        sys.exit(1)
+    
+    if old.algorithm != new.algorithm:
+        print(f"Error: Baselines use different hash algorithms ({old.algorithm}, {new.algorithm})")
+        sys.exit(1)
+    
+    if old.block_hash != new.block_hash:
+        print("Error: Baselines hash large files differently (--block-hash)")
+        sys.exit(1)
+    
+    # Events are dated when the newer baseline was written
+    timestamp = datetime.fromtimestamp(new_path.stat().st_mtime).isoformat()
+    counts: Counter = Counter()
+    
+    def counted(events: Iterable[Event]) -> Iterator[Event]:
+        for event in events:
+            counts[event.type] += 1
+            yield event
+    
+    events = counted(baseline_events(old, new, timestamp))
+    if args.out:
+        output_path = Path(args.out)
+        if is_journal(output_path):
+            # Streamed, so memory stays flat however many paths changed
+            save_journal(events, output_path)
+        else:
+            save_events(list(events), output_path)
+    else:
+        for event in events:
+            print(f"{event.type}: {event.path}")
+    
+    total = sum(counts.values())
+    if args.out:
+        print(f"Events saved to {args.out}")
+        print(f"Run 'fim report --events {args.out}' to generate a report")
+    
+    if total == 0:
+        print("\nBaselines are identical ✓")
+        sys.exit(0)
+    
+    summary = ', '.join(
+        f"{counts[event_type]} {event_type.lower()}"
+        for event_type in ('ADDED', 'MODIFIED', 'DELETED') if counts[event_type]
+    )
+    print(f"\nFound {total} differences ({summary})")
+    sys.exit(2)
+
+
+def _add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add options shared by commands that scan and hash a directory tree."""
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of parallel hashing workers, 0 for one per CPU (default: 1)')
+    parser.add_argument('--processes', action='store_true',
+                        help='Hash in worker processes instead of threads')
+    parser.add_argument('--mmap', action='store_true',
+                        help='Memory map large files while hashing')
+    parser.add_argument('--trust-stat', action='store_true',
+                        help='Only rehash files whose size, times or inode changed')
+    parser.add_argument('--full-rehash-every', type=int, default=0, metavar='N',
+                        help='With --trust-stat or --quick, rehash every file every N runs '
+                             '(default: never)')
+    parser.add_argument('--precheck', action='store_true',
+                        help='Record (init) or compare (verify) fast CRC32 checksums; '
+                             'verify reports files whose CRC32 changed without hashing them '
+                             'and still hashes the others')
+    parser.add_argument('--quick', action='store_true',
+                        help='Record (init) or compare (verify) sampled fingerprints of files '
+                             'of 64 MiB or more; verify only hashes them fully when the '
+                             'fingerprint changed or a full rehash is due')
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default='normal',
+                        help='Keep hashed files out of the page cache: drop evicts the pages '
+                             'each file brought in once hashed, direct reads with O_DIRECT '
+                             '(default: normal)')
+    parser.add_argument('--scan-order', choices=SCAN_ORDERS, default='walk',
+                        help='Walk the whole tree first and hash files by inode number or by '
+                             'physical disk offset, for rotational disks and network storage '
+                             '(default: walk, hashing while walking)')
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add include/exclude options shared by commands that walk a directory tree."""
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only monitor files matching this pattern (repeatable)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB',
+                        help='Skip files and directories matching this pattern (repeatable)')
+    parser.add_argument('--config', metavar='PATH',
+                        help='INI file with include/exclude patterns in a [fim] section')
+
+
+def _add_throttle_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add resource limits shared by commands that hash files."""
+    parser.add_argument('--max-bytes-per-sec', type=parse_size, default=0, metavar='RATE',
+                        help='Read at most this many bytes per second, e.g. 50M '
+                             '(default: unlimited)')
+    parser.add_argument('--max-files-per-sec', type=float, default=0, metavar='N',
+                        help='Hash at most this many files per second (default: unlimited)')
+    parser.add_argument('--cpu-share', type=float, default=0, metavar='FRACTION',
+                        help='Let each hashing thread use at most this fraction of a CPU, '
+                             'e.g. 0.25 (default: unlimited)')
+    parser.add_argument('--max-read-latency', type=float, default=0, metavar='MS',
+                        help='Back off reading while reads take longer than this many '
+                             'milliseconds on average (default: never)')
+
+
+def _add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add options shared by commands that can report performance metrics."""
+    parser.add_argument('--stats', action='store_true',
+                        help='Print per-phase wall time, hashing throughput and latency')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='Write metrics in the Prometheus text format, e.g. for the '
+                             'node exporter textfile collector')
+
+
 def main() -> None:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -177,22 +649,113 @@ def main() -> None:
     init_parser = subparsers.add_parser('init', help='Create baseline for directory')
     init_parser.add_argument('--path', required=True, help='Directory to scan')
     init_parser.add_argument('--baseline', required=True, help='Baseline file path')
+    init_parser.add_argument('--algo', choices=ALGORITHMS, default=DEFAULT_ALGORITHM,
+                             help='Hash algorithm (default: sha256)')
+    init_parser.add_argument('--block-hash', action='store_true',
+                             help='Hash files of 64 MiB or more as 16 MiB blocks, --workers '
+                                  'blocks at a time; verify and watch follow the baseline')
+    init_parser.add_argument('--block-digests', action='store_true',
+                             help='With --block-hash, also store each block digest so verify '
+                                  'reports which byte ranges changed')
+    _add_scan_arguments(init_parser)
+    _add_filter_arguments(init_parser)
+    _add_throttle_arguments(init_parser)
+    _add_metrics_arguments(init_parser)
     
     # Watch command
     watch_parser = subparsers.add_parser('watch', help='Watch directory for changes')
     watch_parser.add_argument('--path', required=True, help='Directory to watch')
     watch_parser.add_argument('--baseline', required=True, help='Baseline file path')
-    watch_parser.add_argument('--events', required=True, help='Events file path')
+    watch_parser.add_argument('--events', required=True,
+                              help='Events file path (.jsonl for an append-only journal)')
+    watch_parser.add_argument('--fsync', choices=FSYNC_POLICIES, default='interval',
+                              help='Journal fsync policy (default: interval)')
+    watch_parser.add_argument('--fsync-interval', type=float, default=1.0, metavar='SECONDS',
+                              help='Seconds between journal fsyncs (default: 1)')
+    watch_parser.add_argument('--rotate-bytes', type=int, metavar='BYTES',
+                              help='Rotate the journal segment at this size')
+    watch_parser.add_argument('--rotate-seconds', type=float, metavar='SECONDS',
+                              help='Rotate the journal segment after this long')
+    watch_parser.add_argument('--quiet-window', type=float, default=0.5, metavar='SECONDS',
+                              help='Hash a changed file once it has been quiet this long '
+                                   '(default: 0.5, 0 hashes on every event)')
+    watch_parser.add_argument('--max-delay', type=float, default=5.0, metavar='SECONDS',
+                              help='Hash a continuously changing file at least this often '
+                                   '(default: 5)')
+    watch_parser.add_argument('--hash-workers', type=int, default=2, metavar='N',
+                              help='Threads hashing changed files off the event thread '
+                                   '(default: 2, 0 hashes on the event thread)')
+    watch_parser.add_argument('--queue-size', type=int, default=1024, metavar='N',
+                              help='Maximum queued files per hashing thread (default: 1024)')
+    watch_parser.add_argument('--backpressure', choices=BACKPRESSURE_POLICIES, default='block',
+                              help='When a hashing queue is full, wait for room (block) '
+                                   'or keep the file pending and retry later (defer)')
+    watch_parser.add_argument('--checkpoint-interval', type=float, default=60.0, metavar='SECONDS',
+                              help='Save the baseline and new events this often '
+                                   '(default: 60, 0 only on shutdown)')
+    watch_parser.add_argument('--checkpoint-events', type=int, default=1000, metavar='N',
+                              help='Also save once this many events are unsaved '
+                                   '(default: 1000, 0 for no limit)')
+    watch_parser.add_argument('--metrics-interval', type=float, default=15.0, metavar='SECONDS',
+                              help='Rewrite --metrics-file this often (default: 15, '
+                                   '0 only on shutdown)')
+    watch_parser.add_argument('--cache-mode', choices=CACHE_MODES, default='normal',
+                              help='Keep hashed files out of the page cache, see init '
+                                   '(default: normal)')
+    _add_filter_arguments(watch_parser)
+    _add_throttle_arguments(watch_parser)
+    _add_metrics_arguments(watch_parser)
     
     # Report command
     report_parser = subparsers.add_parser('report', help='Generate HTML report')
     report_parser.add_argument('--events', required=True, help='Events file path')
     report_parser.add_argument('--out', required=True, help='Output HTML file path')
+    report_parser.add_argument('--page-size', type=int, metavar='N',
+                               help='Split the event table into linked pages of N rows')
+    report_parser.add_argument('--max-rows', type=int, metavar='N',
+                               help='Write at most N rows inline; the full data goes to '
+                                    'a sidecar file loaded on demand')
+    
+    # Stats command
+    stats_parser = subparsers.add_parser('stats', help='Summarize recorded events')
+    stats_source = stats_parser.add_mutually_exclusive_group(required=True)
+    stats_source.add_argument('--events', help='Events file path')
+    stats_source.add_argument('--summary', help='Statistics saved earlier with --save')
+    stats_parser.add_argument('--by', choices=list(GRANULARITIES), default='day',
+                              help='Histogram granularity (default: day)')
+    stats_parser.add_argument('--top', type=int, default=10, metavar='N',
+                              help='Number of most changed files and directories (default: 10)')
+    stats_parser.add_argument('--depth', type=int, metavar='N',
+                              help='Roll directories up to N levels below the root '
+                                   '(default: parent directory of each file)')
+    stats_parser.add_argument('--save', metavar='PATH',
+                              help='Save the aggregated statistics for later --summary runs')
+    stats_parser.add_argument('--json', action='store_true', help='Print statistics as JSON')
     
     # Verify command
     verify_parser = subparsers.add_parser('verify', help='Verify files against baseline')
     verify_parser.add_argument('--path', required=True, help='Directory to verify')
     verify_parser.add_argument('--baseline', required=True, help='Baseline file path')
+    _add_scan_arguments(verify_parser)
+    _add_filter_arguments(verify_parser)
+    _add_throttle_arguments(verify_parser)
+    _add_metrics_arguments(verify_parser)
+    
+    # Diff command
+    diff_parser = subparsers.add_parser('diff', help='Compare two baselines')
+    diff_parser.add_argument('old', help='Older baseline file path')
+    diff_parser.add_argument('new', help='Newer baseline file path')
+    diff_parser.add_argument('--out', metavar='PATH',
+                             help='Save the differences as events for fim report '
+                                  '(.jsonl journals are streamed)')
+    
+    # Convert command
+    convert_parser = subparsers.add_parser(
+        'convert', help='Convert baseline between JSON and binary (.fimb) formats'
+    )
+    convert_parser.add_argument('--baseline', required=True, help='Input baseline file path')
+    convert_parser.add_argument('--out', required=True,
+                                help='Output baseline file path (.fimb for binary)')
     
     args = parser.parse_args()
     
@@ -207,8 +770,14 @@ def main() -> None:
         cmd_watch(args)
     elif args.command == 'report':
         cmd_report(args)
+    elif args.command == 'stats':
+        cmd_stats(args)
     elif args.command == 'verify':
         cmd_verify(args)
+    elif args.command == 'diff':
+        cmd_diff(args)
+    elif args.command == 'convert':
+        cmd_convert(args)
 
 
 if __name__ == '__main__':
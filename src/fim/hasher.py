@@ -1,29 +1,516 @@
 """File hashing utilities for File Integrity Monitor."""
 
 import hashlib
+import mmap
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, List, Optional, Protocol, Sequence, Tuple
 
+from .metrics import record_hash
+from .pagecache import (
+    CACHE_MODES, drop_pages, open_direct, read_direct, read_dropping, resident_pages,
+)
+from .throttle import THROTTLE, Throttle
 
-def file_sha256(path: Path, chunk_size: int = 1 << 20) -> Optional[str]:
+# Cryptographic algorithms that can be used for baselines
+ALGORITHMS = ('sha256', 'sha512', 'blake2b', 'blake2s')
+
+DEFAULT_ALGORITHM = 'sha256'
+
+# Fast non-cryptographic checksum used by the optional pre-check tier
+CHECKSUM_ALGORITHM = 'crc32'
+
+# Files up to this size are read in a single call
+SMALL_FILE_SIZE = 256 * 1024
+
+# Largest chunk read at once; also the size of each thread's read buffer
+MAX_CHUNK_SIZE = 1 << 20
+
+# Files at least this large are mapped into memory when mmap is enabled
+MMAP_MIN_SIZE = 64 * 1024 * 1024
+
+# Sampled fingerprints read this many evenly spaced blocks besides head and tail
+QUICK_SAMPLES = 16
+
+# Size of each block read for a sampled fingerprint
+QUICK_BLOCK_SIZE = 64 * 1024
+
+# Files at least this large get a sampled fingerprint in quick mode
+QUICK_MIN_SIZE = 64 * 1024 * 1024
+
+# Size of each block of a block-hashed file
+HASH_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Files at least this large are hashed as blocks in block-hash mode
+BLOCK_HASH_MIN_SIZE = 64 * 1024 * 1024
+
+# Sample offsets are aligned to this many bytes
+_SAMPLE_ALIGNMENT = 4096
+
+# Read buffers are reused per thread so hashing allocates nothing per chunk
+_local = threading.local()
+
+
+def _get_buffer(size: int) -> memoryview:
+    """Get this thread's reusable read buffer, growing it if needed."""
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None or len(buffer) < size:
+        buffer = memoryview(bytearray(max(size, MAX_CHUNK_SIZE)))
+        _local.buffer = buffer
+    return buffer
+
+
+def choose_chunk_size(file_size: int) -> int:
+    """
+    Pick a read chunk size for a file of the given size.
+    
+    Small files are read with one call (plus one more to detect EOF);
+    larger files use the maximum chunk size.
+    
+    Args:
+        file_size: Size of the file in bytes
+    
+    Returns:
+        Number of bytes to read per call
+    """
+    if file_size < SMALL_FILE_SIZE:
+        return file_size + 1
+    return MAX_CHUNK_SIZE
+
+
+class HashObject(Protocol):
+    """The part of the hashlib interface used for hashing files."""
+    
+    def update(self, data: Any, /) -> None: ...
+    
+    def digest(self) -> bytes: ...
+    
+    def hexdigest(self) -> str: ...
+
+
+class _CRC32:
+    """hashlib-style wrapper around zlib.crc32 for the fast pre-check tier."""
+    
+    def __init__(self) -> None:
+        self._value = 0
+    
+    def update(self, data: Any, /) -> None:
+        self._value = zlib.crc32(data, self._value)
+    
+    def digest(self) -> bytes:
+        return self._value.to_bytes(4, 'big')
+    
+    def hexdigest(self) -> str:
+        return f'{self._value:08x}'
+
+
+def new_hash(algorithm: str) -> HashObject:
+    """
+    Create a hash object for a supported algorithm.
+    
+    Args:
+        algorithm: One of ALGORITHMS, or CHECKSUM_ALGORITHM
+    
+    Returns:
+        Object with hashlib-style update(), digest() and hexdigest() methods
+    
+    Raises:
+        ValueError: If the algorithm is not supported
+    """
+    if algorithm == CHECKSUM_ALGORITHM:
+        return _CRC32()
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+    return hashlib.new(algorithm)
+
+
+def _hash_mmap(fd: int, size: int, hash_objs: List[Any]) -> None:
+    """Feed a memory mapped file into each hash object."""
+    with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        for hash_obj in hash_objs:
+            hash_obj.update(mapped)
+
+
+def _read_throttled(f: Any, view: memoryview, hash_objs: List[Any], throttle: Throttle) -> None:
+    """Feed a file into each hash object, reporting every chunk to the throttle."""
+    while True:
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        n = f.readinto(view)
+        read_seconds = time.perf_counter() - start
+        if not n:
+            return
+        for hash_obj in hash_objs:
+            hash_obj.update(view[:n])
+        throttle.consumed(n, read_seconds, time.thread_time() - cpu_start)
+
+
+def file_digests(
+    path: Path,
+    algorithms: Sequence[str],
+    chunk_size: Optional[int] = None,
+    use_mmap: bool = False,
+    cache_mode: str = 'normal'
+) -> Optional[List[str]]:
+    """
+    Calculate several digests of a file in a single read.
+    
+    Data is read with readinto() into a reusable per-thread buffer, so no
+    new bytes objects are created per chunk. With use_mmap, files of at
+    least MMAP_MIN_SIZE bytes are memory mapped instead. This is opt-in
+    because a mapped file truncated by another process raises SIGBUS.
+    While THROTTLE is active files are always read, so every chunk is paced.
+    
+    Args:
+        path: Path to the file
+        algorithms: Algorithm names, see new_hash()
+        chunk_size: Size of chunks to read (default: chosen from file size)
+        use_mmap: Memory map large files instead of reading them
+        cache_mode: One of CACHE_MODES; 'drop' and 'direct' keep the file
+            out of the page cache and take precedence over use_mmap, see
+            fim.pagecache
+    
+    Returns:
+        Hex digests in the order of algorithms, or None if file cannot be read
+    
+    Raises:
+        ValueError: If an algorithm or the cache mode is not supported
+    """
+    if cache_mode not in CACHE_MODES:
+        raise ValueError(f"Unsupported cache mode: {cache_mode}")
+    hash_objs = [new_hash(algorithm) for algorithm in algorithms]
+    throttle = THROTTLE if THROTTLE.active else None
+    if throttle is not None:
+        throttle.begin_file()
+    start = time.perf_counter()
+    
+    try:
+        direct_fd = open_direct(path) if cache_mode == 'direct' else None
+        if direct_fd is not None:
+            try:
+                size = os.fstat(direct_fd).st_size
+                read_direct(direct_fd, hash_objs, throttle)
+            finally:
+                os.close(direct_fd)
+            record_hash(size, time.perf_counter() - start)
+            return [hash_obj.hexdigest() for hash_obj in hash_objs]
+        
+        with open(path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            
+            if cache_mode != 'normal':
+                # Also the fallback for file systems that refuse direct reads
+                chunk_size = chunk_size or choose_chunk_size(size)
+                view = _get_buffer(chunk_size)[:chunk_size]
+                read_dropping(f.fileno(), size, view, hash_objs, throttle)
+            elif use_mmap and chunk_size is None and size >= MMAP_MIN_SIZE and throttle is None:
+                _hash_mmap(f.fileno(), size, hash_objs)
+            else:
+                chunk_size = chunk_size or choose_chunk_size(size)
+                view = _get_buffer(chunk_size)[:chunk_size]
+                
+                if throttle is not None:
+                    _read_throttled(f, view, hash_objs, throttle)
+                else:
+                    while n := f.readinto(view):
+                        for hash_obj in hash_objs:
+                            hash_obj.update(view[:n])
+        
+        record_hash(size, time.perf_counter() - start)
+        return [hash_obj.hexdigest() for hash_obj in hash_objs]
+    
+    except (OSError, IOError, PermissionError):
+        return None
+
+
+def file_hash(
+    path: Path,
+    algorithm: str = DEFAULT_ALGORITHM,
+    chunk_size: Optional[int] = None,
+    use_mmap: bool = False,
+    cache_mode: str = 'normal'
+) -> Optional[str]:
+    """
+    Calculate the digest of a file with the given algorithm.
+    
+    Args:
+        path: Path to the file
+        algorithm: Algorithm name, see new_hash()
+        chunk_size: Size of chunks to read (default: chosen from file size)
+        use_mmap: Memory map large files instead of reading them
+        cache_mode: Page cache policy, see file_digests()
+    
+    Returns:
+        Hex digest, or None if file cannot be read
+    """
+    digests = file_digests(path, (algorithm,), chunk_size, use_mmap, cache_mode)
+    return digests[0] if digests is not None else None
+
+
+def file_sha256(
+    path: Path,
+    chunk_size: Optional[int] = None,
+    use_mmap: bool = False
+) -> Optional[str]:
     """
     Calculate SHA256 hash of a file.
     
     Args:
         path: Path to the file
-        chunk_size: Size of chunks to read (default 1MB)
+        chunk_size: Size of chunks to read (default: chosen from file size)
+        use_mmap: Memory map large files instead of reading them
         
     Returns:
         SHA256 hash as hex string, or None if file cannot be read
     """
+    return file_hash(path, 'sha256', chunk_size, use_mmap)
+
+
+def sample_offsets(size: int, samples: int = QUICK_SAMPLES, block_size: int = QUICK_BLOCK_SIZE) -> List[int]:
+    """
+    Get the offsets of the blocks read for a sampled fingerprint.
+    
+    Args:
+        size: File size in bytes
+        samples: Number of blocks between the first and the last block
+        block_size: Size of each block
+    
+    Returns:
+        Increasing block offsets; every block of the file if it is no larger
+        than the blocks sampled
+    """
+    if size <= (samples + 2) * block_size:
+        return list(range(0, size, block_size))
+    
+    last = size - block_size
+    middle = [last * i // (samples + 1) for i in range(1, samples + 1)]
+    return [0] + [offset - offset % _SAMPLE_ALIGNMENT for offset in middle] + [last]
+
+
+def file_fingerprint(
+    path: Path,
+    algorithm: str = DEFAULT_ALGORITHM,
+    samples: int = QUICK_SAMPLES,
+    block_size: int = QUICK_BLOCK_SIZE
+) -> Optional[str]:
+    """
+    Calculate a sampled fingerprint of a file.
+    
+    The fingerprint covers the file size, the first and last block and
+    samples evenly spaced blocks in between, so at most (samples + 2)
+    blocks are read however large the file is. It catches truncation,
+    appends and most rewrites, but not changes confined to unsampled
+    ranges; use it to decide when a full hash is needed, not instead of one.
+    
+    Args:
+        path: Path to the file
+        algorithm: Algorithm name, see new_hash()
+        samples: Number of blocks between the first and the last block
+        block_size: Size of each block
+    
+    Returns:
+        Hex digest, or None if file cannot be read
+    """
+    hash_obj = new_hash(algorithm)
+    
     try:
-        sha256_hash = hashlib.sha256()
-        
-        with open(path, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                sha256_hash.update(chunk)
+        with open(path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            hash_obj.update(size.to_bytes(8, 'little'))
+            view = _get_buffer(block_size)[:block_size]
+            
+            for offset in sample_offsets(size, samples, block_size):
+                f.seek(offset)
+                n = f.readinto(view)
+                hash_obj.update(view[:n])
         
-        return sha256_hash.hexdigest()
+        return hash_obj.hexdigest()
     
     except (OSError, IOError, PermissionError):
         return None
+
+
+def _hash_block(path: Path, fd: int, offset: int, length: int, algorithm: str) -> Optional[bytes]:
+    """Hash one block of an open file (runs on block hashing threads)."""
+    hash_obj = new_hash(algorithm)
+    buffer = _get_buffer(MAX_CHUNK_SIZE)
+    end = offset + length
+    throttle = THROTTLE if THROTTLE.active else None
+    
+    # Threads share the descriptor through positional reads; without
+    # preadv() each block opens its own handle
+    f = None if hasattr(os, 'preadv') else open(path, 'rb', buffering=0)
+    try:
+        while offset < end:
+            view = buffer[:min(MAX_CHUNK_SIZE, end - offset)]
+            read_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            if f is None:
+                n = os.preadv(fd, [view], offset)
+            else:
+                f.seek(offset)
+                n = f.readinto(view)
+            if not n:
+                return None  # Truncated while hashing
+            read_seconds = time.perf_counter() - read_start
+            hash_obj.update(view[:n])
+            offset += n
+            if throttle is not None:
+                throttle.consumed(n, read_seconds, time.thread_time() - cpu_start)
+    finally:
+        if f is not None:
+            f.close()
+    
+    return hash_obj.digest()
+
+
+def block_root(blocks: Sequence[bytes], size: int, block_size: int, algorithm: str) -> str:
+    """
+    Combine block digests into the digest recorded for a block-hashed file.
+    
+    Args:
+        blocks: Raw digests of the blocks in file order
+        size: File size in bytes
+        block_size: Size of each block
+        algorithm: Algorithm name, see new_hash()
+    
+    Returns:
+        Hex digest over the file size, block size and block digests
+    """
+    hash_obj = new_hash(algorithm)
+    hash_obj.update(b'fim-blocks' + size.to_bytes(8, 'little') + block_size.to_bytes(8, 'little'))
+    for digest in blocks:
+        hash_obj.update(digest)
+    return hash_obj.hexdigest()
+
+
+def file_block_digests(
+    path: Path,
+    algorithm: str = DEFAULT_ALGORITHM,
+    block_size: int = HASH_BLOCK_SIZE,
+    workers: int = 1,
+    cache_mode: str = 'normal'
+) -> Optional[Tuple[str, List[str]]]:
+    """
+    Hash a file as independent blocks, several blocks at a time.
+    
+    Each block is hashed on its own, so one large file keeps up to workers
+    cores busy instead of one; the file's digest is block_root() of the
+    block digests. Only the bytes present when hashing starts are read.
+    
+    Args:
+        path: Path to the file
+        algorithm: Algorithm name, see new_hash()
+        block_size: Size of each block
+        workers: Number of threads hashing blocks
+        cache_mode: Page cache policy, see file_digests(); with 'drop' or
+            'direct', the pages of each block are evicted once it is hashed
+    
+    Returns:
+        Tuple of (root hex digest, hex digest per block), or None if the
+        file cannot be read
+    """
+    if THROTTLE.active:
+        THROTTLE.begin_file()
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            offsets = range(0, size, block_size)
+            drop = cache_mode != 'normal'
+            resident = resident_pages(f.fileno(), size) if drop else None
+            
+            def hash_block(offset: int) -> Optional[bytes]:
+                length = min(block_size, size - offset)
+                digest = _hash_block(path, f.fileno(), offset, length, algorithm)
+                if drop:
+                    drop_pages(f.fileno(), resident, offset, offset + length)
+                return digest
+            
+            if workers > 1 and len(offsets) > 1:
+                with ThreadPoolExecutor(max_workers=min(workers, len(offsets))) as executor:
+                    blocks = list(executor.map(hash_block, offsets))
+            else:
+                blocks = [hash_block(offset) for offset in offsets]
+    
+    except (OSError, IOError, PermissionError):
+        return None
+    
+    digests = [digest for digest in blocks if digest is not None]
+    if len(digests) < len(blocks):
+        return None
+    record_hash(size, time.perf_counter() - start)
+    return block_root(digests, size, block_size, algorithm), [digest.hex() for digest in digests]
+
+
+def file_hash_blocks(
+    path: Path,
+    algorithm: str = DEFAULT_ALGORITHM,
+    block_size: int = HASH_BLOCK_SIZE,
+    min_size: int = BLOCK_HASH_MIN_SIZE,
+    workers: int = 1,
+    cache_mode: str = 'normal'
+) -> Optional[str]:
+    """
+    Calculate the digest a block-hash baseline records for a file.
+    
+    Args:
+        path: Path to the file
+        algorithm: Algorithm name, see new_hash()
+        block_size: Size of each block
+        min_size: Files smaller than this get a plain file_hash()
+        workers: Number of threads hashing blocks
+        cache_mode: Page cache policy, see file_block_digests()
+    
+    Returns:
+        Hex digest, or None if file cannot be read
+    """
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return None
+    
+    if size < min_size:
+        return file_hash(path, algorithm, cache_mode=cache_mode)
+    digests = file_block_digests(path, algorithm, block_size, workers, cache_mode)
+    return digests[0] if digests is not None else None
+
+
+def changed_ranges(
+    expected: Sequence[str],
+    actual: Sequence[str],
+    block_size: int,
+    size: int
+) -> List[Tuple[int, int]]:
+    """
+    Find the byte ranges whose block digests differ.
+    
+    Args:
+        expected: Recorded hex digest per block
+        actual: Current hex digest per block
+        block_size: Size of each block
+        size: Current file size in bytes
+    
+    Returns:
+        Sorted, merged (start, end) byte ranges; blocks past the end of a
+        truncated file are reported up to their recorded block boundary
+    """
+    ranges: List[Tuple[int, int]] = []
+    previous = -2
+    for index in range(max(len(expected), len(actual))):
+        if index < len(expected) and index < len(actual) and expected[index] == actual[index]:
+            continue
+        start = index * block_size
+        end = start + block_size if index >= len(actual) else min(start + block_size, size)
+        if index == previous + 1:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+        else:
+            ranges.append((start, end))
+        previous = index
+    return ranges
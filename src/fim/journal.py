@@ -0,0 +1,300 @@
+"""Append-only event journal for File Integrity Monitor.
+
+The journal is newline-delimited JSON, one event per line. The active segment
+lives at the journal path (e.g. events.jsonl); rotated segments are renamed to
+events.000001.jsonl, events.000002.jsonl, ... and read back oldest first.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, List, Optional
+
+from .models import Event
+
+# Events files with this suffix are journals instead of JSON documents
+JOURNAL_SUFFIX = '.jsonl'
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+# Bytes read at a time while looking for the last complete line
+_TAIL_CHUNK_SIZE = 64 * 1024
+
+
+def is_journal(path: Path) -> bool:
+    """
+    Check whether an events path refers to a journal.
+    
+    Args:
+        path: Events file path
+    
+    Returns:
+        True if the path has the journal suffix
+    """
+    return path.suffix == JOURNAL_SUFFIX
+
+
+def journal_segments(path: Path) -> List[Path]:
+    """
+    List the segments of a journal, oldest first.
+    
+    Args:
+        path: Path of the journal's active segment
+    
+    Returns:
+        Rotated segments in rotation order, followed by the active segment
+    """
+    pattern = re.compile(re.escape(path.stem) + r'\.(\d+)' + re.escape(path.suffix) + '$')
+    rotated = []
+    
+    if path.parent.is_dir():
+        for candidate in path.parent.iterdir():
+            match = pattern.match(candidate.name)
+            if match:
+                rotated.append((int(match.group(1)), candidate))
+    
+    segments = [candidate for _, candidate in sorted(rotated)]
+    if path.exists():
+        segments.append(path)
+    return segments
+
+
+def iter_journal(path: Path) -> Iterator[Event]:
+    """
+    Stream events from every segment of a journal.
+    
+    A torn final line left by a crash mid-write is skipped.
+    
+    Args:
+        path: Path of the journal's active segment
+    
+    Returns:
+        Iterator of Event objects in the order they were appended
+    """
+    for segment in journal_segments(path):
+        yield from iter_segment(segment)
+
+
+def iter_segment(segment: Path) -> Iterator[Event]:
+    """
+    Stream events from a single journal segment.
+    
+    Args:
+        segment: Path of an active or rotated segment
+    
+    Returns:
+        Iterator of Event objects in the order they were appended
+    """
+    with open(segment, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield Event.from_dict(json.loads(line))
+            except ValueError:
+                if line.endswith('\n'):
+                    raise
+                # Torn write at the end of the segment
+
+
+def _truncate_torn_line(segment: Path) -> None:
+    """Cut a torn final line left by a crash mid-write, so appends start on a new line."""
+    try:
+        f = open(segment, 'rb+')
+    except FileNotFoundError:
+        return
+    
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - _TAIL_CHUNK_SIZE)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        
+        if position < end:
+            f.truncate(position)
+
+
+def save_journal(events: Iterable[Event], path: Path) -> int:
+    """
+    Write events to a new single-segment journal, replacing any existing one.
+    
+    Events are streamed to a temporary file that replaces path once it is
+    complete, so memory use does not grow with the number of events.
+    
+    Args:
+        events: Events to write
+        path: Path of the journal
+    
+    Returns:
+        Number of events written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    count = 0
+    
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event.to_dict(), ensure_ascii=False) + '\n')
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    
+    return count
+
+
+class EventJournal:
+    """Appends events to a newline-delimited JSON journal."""
+    
+    def __init__(
+        self,
+        path: Path,
+        fsync: str = 'interval',
+        fsync_interval: float = 1.0,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None
+    ):
+        """
+        Open a journal for appending.
+        
+        Args:
+            path: Path of the journal's active segment
+            fsync: 'always' to fsync after every append, 'interval' to fsync at
+                most every fsync_interval seconds, 'never' to leave it to the OS
+            fsync_interval: Seconds between fsyncs with the 'interval' policy
+            max_bytes: Rotate the active segment once it reaches this size
+            max_age: Rotate the active segment after this many seconds
+        
+        Raises:
+            ValueError: If the fsync policy is unknown
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        
+        self.path = Path(path)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        
+        self._file: Optional[IO[str]] = None
+        self._opened_at = 0.0
+        self._last_sync = time.monotonic()
+        self._dirty = False
+    
+    def _open(self) -> IO[str]:
+        """Open the active segment if it isn't open yet."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Appending onto a torn line would make it look complete
+            _truncate_torn_line(self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._opened_at = time.monotonic()
+        return self._file
+    
+    def append(self, event: Event) -> None:
+        """
+        Append a single event.
+        
+        Args:
+            event: Event to append
+        """
+        self.extend([event])
+    
+    def extend(self, events: Iterable[Event]) -> int:
+        """
+        Append events, rotating and syncing according to the journal policy.
+        
+        Args:
+            events: Events to append
+        
+        Returns:
+            Number of events appended
+        """
+        count = 0
+        f = self._open()
+        
+        for event in events:
+            f.write(json.dumps(event.to_dict(), ensure_ascii=False) + '\n')
+            count += 1
+        
+        if count:
+            self._dirty = True
+            self._sync(force=self.fsync == 'always')
+            self._maybe_rotate()
+        
+        return count
+    
+    def _sync(self, force: bool = False) -> None:
+        """Flush buffered writes and fsync if the policy asks for it."""
+        if self._file is None or not self._dirty:
+            return
+        
+        self._file.flush()
+        now = time.monotonic()
+        
+        if force or (self.fsync == 'interval' and now - self._last_sync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+            self._dirty = False
+    
+    def _maybe_rotate(self) -> None:
+        """Rotate the active segment if it is too large or too old."""
+        if self._file is None:
+            return
+        
+        too_large = self.max_bytes is not None and self._file.tell() >= self.max_bytes
+        too_old = self.max_age is not None and time.monotonic() - self._opened_at >= self.max_age
+        
+        if too_large or too_old:
+            self.rotate()
+    
+    def rotate(self) -> Optional[Path]:
+        """
+        Close the active segment and rename it to the next rotated name.
+        
+        Returns:
+            Path of the rotated segment, or None if the active segment is empty
+        """
+        self.close()
+        
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        
+        segments = journal_segments(self.path)
+        sequence = len(segments)
+        if len(segments) > 1:
+            last = segments[-2].name[len(self.path.stem) + 1:-len(self.path.suffix)]
+            sequence = int(last) + 1
+        
+        rotated = self.path.with_name(f"{self.path.stem}.{sequence:06d}{self.path.suffix}")
+        os.replace(self.path, rotated)
+        return rotated
+    
+    def close(self) -> None:
+        """Flush, sync (unless the policy is 'never') and close the active segment."""
+        if self._file is None:
+            return
+        
+        self._sync(force=self.fsync != 'never')
+        self._file.close()
+        self._file = None
+        self._dirty = False
+    
+    def __enter__(self) -> 'EventJournal':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,334 @@
+"""Merkle directory tree over baselines for File Integrity Monitor.
+
+Each directory's digest is the hash of its children sorted by name, one
+line per child with its kind ('f' or 'd'), name and digest. Directories
+with the same digest in two baselines have identical entries below them,
+so comparisons only descend into directories whose digests differ.
+"""
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .binary_baseline import BinaryBaseline
+from .hasher import DEFAULT_ALGORITHM
+from .models import BaselineData, Event
+
+# Path of the root directory in a tree
+ROOT = ''
+
+_SEP = os.sep.encode()
+_AFTER_SEP = bytes([_SEP[0] + 1])  # Smallest byte sorting after the separator
+
+# A change between two baselines: (path, old hash, new hash)
+Change = Tuple[str, Optional[str], Optional[str]]
+
+
+def _encode(path: str) -> bytes:
+    """Encode a path the way binary baselines sort it."""
+    return path.encode('utf-8', 'surrogateescape')
+
+
+def _join(directory: str, name: str) -> str:
+    """Join a directory path and a child name."""
+    return directory + os.sep + name if directory else name
+
+
+def iter_sorted(hashes: Mapping[str, str]) -> Iterator[Tuple[str, str]]:
+    """
+    Iterate baseline entries in bytewise UTF-8 path order.
+    
+    Binary baselines are stored in this order; other mappings are sorted.
+    
+    Args:
+        hashes: Mapping of relative paths to hashes
+    
+    Returns:
+        Iterator of (path, hash) pairs
+    """
+    if isinstance(hashes, BinaryBaseline):
+        return hashes.iter_items()
+    return iter(sorted(hashes.items(), key=lambda item: _encode(item[0])))
+
+
+def _directory_digest(children: List[Tuple[str, str, str]], algorithm: str) -> str:
+    """Hash the (name, kind, digest) children of a directory."""
+    hash_obj = hashlib.new(algorithm)
+    for name, kind, digest in sorted(children):
+        hash_obj.update(f"{kind} {name}\0{digest}\n".encode('utf-8', 'surrogateescape'))
+    return hash_obj.hexdigest()
+
+
+def build_tree(hashes: Mapping[str, str], algorithm: str = DEFAULT_ALGORITHM) -> Dict[str, str]:
+    """
+    Compute the Merkle digest of every directory in a baseline.
+    
+    Entries are visited in sorted order, where each directory's entries are
+    contiguous, so only the children of the directories on the current
+    path are held in memory.
+    
+    Args:
+        hashes: Mapping of relative paths to hashes
+        algorithm: Hash algorithm for the directory digests
+    
+    Returns:
+        Dictionary mapping directory paths (ROOT for the root) to digests
+    """
+    tree: Dict[str, str] = {}
+    stack: List[Tuple[str, List[Tuple[str, str, str]]]] = [(ROOT, [])]
+    
+    def close() -> None:
+        directory, children = stack.pop()
+        digest = tree[directory] = _directory_digest(children, algorithm)
+        stack[-1][1].append((directory.rpartition(os.sep)[2], 'd', digest))
+    
+    for rel_path, digest in iter_sorted(hashes):
+        directory, _, name = rel_path.rpartition(os.sep)
+        
+        # Close directories that don't contain this entry, open the ones that do
+        while len(stack) > 1 and stack[-1][0] != directory \
+                and not directory.startswith(stack[-1][0] + os.sep):
+            close()
+        current = stack[-1][0]
+        if directory != current:
+            rest = directory[len(current) + 1:] if current else directory
+            for part in rest.split(os.sep):
+                current = _join(current, part)
+                stack.append((current, []))
+        
+        stack[-1][1].append((name, 'f', digest))
+    
+    while len(stack) > 1:
+        close()
+    tree[ROOT] = _directory_digest(stack[0][1], algorithm)
+    return tree
+
+
+class _Listing(ABC):
+    """Lists the children of directories in one baseline."""
+    
+    def __init__(self, hashes: Mapping[str, str], tree: Mapping[str, str]):
+        self.hashes = hashes
+        self.tree = tree
+    
+    @abstractmethod
+    def children(self, directory: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Get the children of a directory as name -> (kind, digest)."""
+    
+    def iter_files(self, directory: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """Iterate (path, hash) of every file below a directory in sorted order."""
+        children = self.children(directory)
+        keys = sorted(
+            (_encode(name) + (_SEP if kind == 'd' else b''), name, kind, digest)
+            for name, (kind, digest) in children.items()
+        )
+        for _, name, kind, digest in keys:
+            path = _join(directory, name)
+            if kind == 'd':
+                yield from self.iter_files(path)
+            else:
+                yield path, digest
+
+
+class _SortedListing(_Listing):
+    """Lists directories of a binary baseline by binary search over its sorted paths."""
+    
+    hashes: BinaryBaseline
+    
+    def _range(self, directory: str) -> Tuple[bytes, int, int]:
+        """Get the path prefix and entry range of everything below a directory."""
+        if directory == ROOT:
+            return b'', 0, len(self.hashes)
+        encoded = _encode(directory)
+        return (encoded + _SEP, self.hashes.bisect(encoded + _SEP),
+                self.hashes.bisect(encoded + _AFTER_SEP))
+    
+    def children(self, directory: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        hashes = self.hashes
+        prefix, index, end = self._range(directory)
+        children: Dict[str, Tuple[str, Optional[str]]] = {}
+        
+        while index < end:
+            name, sep, _ = hashes.path_bytes_at(index)[len(prefix):].partition(_SEP)
+            decoded = name.decode('utf-8', 'surrogateescape')
+            if sep:
+                # Skip the whole subdirectory
+                children[decoded] = ('d', self.tree.get(_join(directory, decoded)))
+                index = hashes.bisect(prefix + name + _AFTER_SEP)
+            else:
+                children[decoded] = ('f', hashes.digest_at(index))
+                index += 1
+        
+        return children
+    
+    def iter_files(self, directory: str) -> Iterator[Tuple[str, str]]:
+        _, index, end = self._range(directory)
+        for index in range(index, end):
+            yield self.hashes.path_at(index), self.hashes.digest_at(index)
+
+
+class _IndexedListing(_Listing):
+    """Lists directories of any mapping through an index built on first use."""
+    
+    def __init__(self, hashes: Mapping[str, str], tree: Mapping[str, str]):
+        super().__init__(hashes, tree)
+        self._index: Optional[Dict[str, Dict[str, Tuple[str, Optional[str]]]]] = None
+    
+    def children(self, directory: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        if self._index is None:
+            index: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = {}
+            for rel_path, digest in self.hashes.items():
+                parent, _, name = rel_path.rpartition(os.sep)
+                index.setdefault(parent, {})[name] = ('f', digest)
+            
+            for parent in list(index):
+                while parent != ROOT:
+                    grandparent, _, name = parent.rpartition(os.sep)
+                    siblings = index.setdefault(grandparent, {})
+                    if name in siblings:
+                        break
+                    siblings[name] = ('d', self.tree.get(parent))
+                    parent = grandparent
+            self._index = index
+        
+        return self._index.get(directory, {})
+
+
+def _listing(data: BaselineData) -> _Listing:
+    """Get the fastest way to list directories of a baseline."""
+    if isinstance(data.hashes, BinaryBaseline):
+        return _SortedListing(data.hashes, data.tree)
+    return _IndexedListing(data.hashes, data.tree)
+
+
+def _diff_directory(old: _Listing, new: _Listing, directory: str) -> Iterator[Change]:
+    """Compare the entries below a directory whose digests differ."""
+    old_children = old.children(directory)
+    new_children = new.children(directory)
+    entries: List[Tuple[bytes, str, str]] = []
+    
+    for name in old_children.keys() | new_children.keys():
+        old_kind, old_digest = old_children.get(name, (None, None))
+        new_kind, new_digest = new_children.get(name, (None, None))
+        if old_kind == new_kind and old_digest == new_digest and old_digest is not None:
+            continue
+        
+        # Sort keys order entries like full paths: a directory by name + separator
+        encoded = _encode(name)
+        if 'f' in (old_kind, new_kind):
+            entries.append((encoded, name, 'f'))
+        if 'd' in (old_kind, new_kind):
+            entries.append((encoded + _SEP, name, 'd'))
+    
+    for _, name, kind in sorted(entries):
+        path = _join(directory, name)
+        old_kind, old_digest = old_children.get(name, (None, None))
+        new_kind, new_digest = new_children.get(name, (None, None))
+        if kind == 'f':
+            yield (path, old_digest if old_kind == 'f' else None,
+                   new_digest if new_kind == 'f' else None)
+        elif old_kind == new_kind:
+            yield from _diff_directory(old, new, path)
+        elif old_kind == 'd':
+            for rel_path, digest in old.iter_files(path):
+                yield rel_path, digest, None
+        else:
+            for rel_path, digest in new.iter_files(path):
+                yield rel_path, None, digest
+
+
+def merge_diff(
+    old_items: Iterator[Tuple[str, str]],
+    new_items: Iterator[Tuple[str, str]]
+) -> Iterator[Change]:
+    """
+    Compare two streams of baseline entries sorted by iter_sorted().
+    
+    Args:
+        old_items: Sorted (path, hash) pairs of the older baseline
+        new_items: Sorted (path, hash) pairs of the newer baseline
+    
+    Returns:
+        Iterator of (path, old_hash, new_hash) for every differing path,
+        in path order; old_hash is None for added and new_hash for deleted paths
+    """
+    old_entry = next(old_items, None)
+    new_entry = next(new_items, None)
+    
+    while old_entry is not None and new_entry is not None:
+        old_key, new_key = _encode(old_entry[0]), _encode(new_entry[0])
+        if old_key < new_key:
+            yield old_entry[0], old_entry[1], None
+            old_entry = next(old_items, None)
+        elif new_key < old_key:
+            yield new_entry[0], None, new_entry[1]
+            new_entry = next(new_items, None)
+        else:
+            if old_entry[1] != new_entry[1]:
+                yield old_entry[0], old_entry[1], new_entry[1]
+            old_entry = next(old_items, None)
+            new_entry = next(new_items, None)
+    
+    # Whatever is left exists on one side only
+    if old_entry is not None:
+        yield old_entry[0], old_entry[1], None
+        for rel_path, digest in old_items:
+            yield rel_path, digest, None
+    if new_entry is not None:
+        yield new_entry[0], None, new_entry[1]
+        for rel_path, digest in new_items:
+            yield rel_path, None, digest
+
+
+def diff_baselines(old: BaselineData, new: BaselineData) -> Iterator[Change]:
+    """
+    Find the paths whose hashes differ between two baselines.
+    
+    If both baselines have a Merkle tree of the same algorithm, only
+    directories whose digests differ are visited; for binary baselines each
+    visit is a binary search, so a few changes among millions of entries
+    are found without reading the rest. Otherwise every entry is compared.
+    
+    Args:
+        old: Older baseline
+        new: Newer baseline
+    
+    Returns:
+        Iterator of (path, old_hash, new_hash) in path order; old_hash is
+        None for added and new_hash for deleted paths
+    """
+    if old.tree and new.tree and old.algorithm == new.algorithm:
+        old_root, new_root = old.tree.get(ROOT), new.tree.get(ROOT)
+        if old_root is not None and old_root == new_root:
+            return iter(())
+        return _diff_directory(_listing(old), _listing(new), ROOT)
+    
+    return merge_diff(iter_sorted(old.hashes), iter_sorted(new.hashes))
+
+
+def baseline_events(
+    old: BaselineData,
+    new: BaselineData,
+    timestamp: Optional[str] = None
+) -> Iterator[Event]:
+    """
+    Describe the differences between two baselines as events.
+    
+    Args:
+        old: Older baseline
+        new: Newer baseline
+        timestamp: Timestamp given to every event (default: now)
+    
+    Returns:
+        Iterator of ADDED, MODIFIED and DELETED events in path order
+    """
+    for path, old_hash, new_hash in diff_baselines(old, new):
+        if old_hash is None:
+            event_type = 'ADDED'
+        elif new_hash is None:
+            event_type = 'DELETED'
+        else:
+            event_type = 'MODIFIED'
+        yield Event(type=event_type, path=path, old_hash=old_hash, new_hash=new_hash,
+                    timestamp=timestamp)
@@ -0,0 +1,361 @@
+"""Performance metrics for File Integrity Monitor.
+
+Metrics are collected in a process-wide registry that is disabled by
+default, so instrumented code costs one attribute check until a caller
+enables it. Enabled metrics can be summarized or written in the Prometheus
+text format, e.g. for the node exporter's textfile collector.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRIC_KINDS = ('counter', 'gauge', 'histogram')
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    """Format a sample value for the Prometheus text format."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """A counter, gauge or histogram, optionally split by one label."""
+    
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        label: Optional[str] = None,
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        """
+        Initialize metric.
+        
+        Args:
+            name: Prometheus metric name
+            kind: One of METRIC_KINDS
+            help_text: Description written as the HELP line
+            label: Name of the label that splits the metric, if any
+            buckets: Sorted upper bounds of histogram buckets
+        
+        Raises:
+            ValueError: If the kind is unknown
+        """
+        if kind not in METRIC_KINDS:
+            raise ValueError(
+                f"Unknown metric kind '{kind}', expected one of: {', '.join(METRIC_KINDS)}"
+            )
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        # Label value -> value, or [bucket counts..., +Inf count, sum] for histograms
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, label: str = '') -> None:
+        """Add to a counter or gauge."""
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+    
+    def set(self, value: float, label: str = '') -> None:
+        """Set a gauge, or a counter mirrored from a total kept elsewhere."""
+        with self._lock:
+            self._values[label] = value
+    
+    def observe(self, value: float, label: str = '') -> None:
+        """Record a histogram sample."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label)
+            if state is None:
+                state = self._values[label] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+    
+    def value(self, label: str = '') -> float:
+        """Get the value of a counter or gauge (0 if never set)."""
+        value: float = self._values.get(label, 0)
+        return value
+    
+    def count(self, label: str = '') -> int:
+        """Get the number of samples of a histogram."""
+        state = self._values.get(label)
+        return sum(state[:-1]) if state else 0
+    
+    def total(self, label: str = '') -> float:
+        """Get the sum of the samples of a histogram."""
+        state = self._values.get(label)
+        return state[-1] if state else 0.0
+    
+    def quantile(self, q: float, label: str = '') -> Optional[float]:
+        """
+        Estimate a quantile of a histogram.
+        
+        Args:
+            q: Quantile between 0 and 1
+            label: Label value
+        
+        Returns:
+            Upper bound of the bucket holding the quantile (inf past the
+            last bucket), or None without samples
+        """
+        state = self._values.get(label)
+        count = self.count(label)
+        if state is None or not count:
+            return None
+        
+        rank = q * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), state):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+    
+    def labels(self) -> List[str]:
+        """Get the label values recorded so far."""
+        return list(self._values)
+    
+    def state(self) -> Dict[str, Any]:
+        """Get a copy of the recorded values, see merge()."""
+        with self._lock:
+            return {
+                label: list(value) if isinstance(value, list) else value
+                for label, value in self._values.items()
+            }
+    
+    def merge(self, state: Dict[str, Any]) -> None:
+        """Add values recorded elsewhere, e.g. in a worker process."""
+        with self._lock:
+            for label, value in state.items():
+                current = self._values.get(label)
+                if self.kind == 'histogram':
+                    self._values[label] = (
+                        [a + b for a, b in zip(current, value)] if current else list(value)
+                    )
+                elif self.kind == 'counter':
+                    self._values[label] = (current or 0) + value
+                else:
+                    self._values[label] = value
+    
+    def reset(self) -> None:
+        """Forget all recorded values."""
+        with self._lock:
+            self._values.clear()
+    
+    def samples(self) -> Iterator[str]:
+        """Generate the sample lines of the Prometheus text format."""
+        for label, value in sorted(self.state().items()):
+            pair = f'{self.label}="{_escape(label)}"' if self.label else ''
+            if self.kind != 'histogram':
+                yield f"{self.name}{{{pair}}} {_number(value)}" if pair \
+                    else f"{self.name} {_number(value)}"
+                continue
+            
+            prefix = pair + ',' if pair else ''
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), value):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{{{prefix}le="{_number(bound)}"}} {cumulative}'
+            suffix = f"{{{pair}}}" if pair else ''
+            yield f"{self.name}_sum{suffix} {_number(value[-1])}"
+            yield f"{self.name}_count{suffix} {cumulative}"
+
+
+class MetricsRegistry:
+    """Named metrics with a switch that turns instrumentation on."""
+    
+    def __init__(self) -> None:
+        self.enabled = False
+        self.started = time.monotonic()
+        self._metrics: Dict[str, Metric] = {}
+        self.phase_seconds = self.metric(
+            'fim_phase_seconds_total', 'counter', 'Wall time spent in each phase', label='phase'
+        )
+    
+    def metric(self, name: str, kind: str, help_text: str, label: Optional[str] = None,
+               buckets: Sequence[float] = LATENCY_BUCKETS) -> Metric:
+        """
+        Get a metric, creating it on first use.
+        
+        Args:
+            name: Prometheus metric name
+            kind: One of METRIC_KINDS
+            help_text: Description written as the HELP line
+            label: Name of the label that splits the metric, if any
+            buckets: Sorted upper bounds of histogram buckets
+        
+        Returns:
+            The registered metric
+        """
+        if name not in self._metrics:
+            self._metrics[name] = Metric(name, kind, help_text, label, buckets)
+        return self._metrics[name]
+    
+    def enable(self) -> None:
+        """Start collecting metrics, measuring elapsed time from now."""
+        self.enabled = True
+        self.started = time.monotonic()
+    
+    def elapsed(self) -> float:
+        """Get the seconds since metrics were enabled."""
+        return time.monotonic() - self.started
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the wall time of a block to the phase it belongs to."""
+        if not self.enabled:
+            yield
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds.inc(time.perf_counter() - start, name)
+    
+    def reset(self) -> None:
+        """Forget the values of every metric."""
+        for metric in self._metrics.values():
+            metric.reset()
+    
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """Get a picklable copy of every recorded value, see merge()."""
+        return {name: metric.state() for name, metric in self._metrics.items()}
+    
+    def merge(self, state: Dict[str, Dict[str, Any]]) -> None:
+        """Add values recorded by another registry, e.g. in a worker process."""
+        for name, values in state.items():
+            if name in self._metrics:
+                self._metrics[name].merge(values)
+    
+    def to_prometheus(self) -> str:
+        """
+        Render every metric with values in the Prometheus text format.
+        
+        Returns:
+            Text exposition, one HELP and TYPE line per metric
+        """
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            samples = list(metric.samples())
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {metric.help_text}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path: Path) -> None:
+        """
+        Write the metrics to a Prometheus text file.
+        
+        The file is written next to path and renamed into place, so a
+        collector never reads a partial file.
+        
+        Args:
+            path: Output path, e.g. in the node exporter's textfile directory
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+
+# Process-wide registry used by the instrumented modules
+REGISTRY = MetricsRegistry()
+
+PHASE_SECONDS = REGISTRY.phase_seconds
+FILES_WALKED = REGISTRY.metric(
+    'fim_files_walked_total', 'counter', 'Files found while walking the tree'
+)
+FILES_HASHED = REGISTRY.metric(
+    'fim_files_hashed_total', 'counter', 'Files read and hashed in full'
+)
+BYTES_HASHED = REGISTRY.metric(
+    'fim_bytes_hashed_total', 'counter', 'Bytes read while hashing files in full'
+)
+HASH_SECONDS = REGISTRY.metric(
+    'fim_hash_seconds', 'histogram', 'Time to hash one file'
+)
+WATCH_EVENTS = REGISTRY.metric(
+    'fim_watch_events_received_total', 'counter', 'File system events received'
+)
+WATCH_COALESCED = REGISTRY.metric(
+    'fim_watch_events_coalesced_total', 'counter',
+    'Events merged into a path that was already pending'
+)
+WATCH_QUEUE_DEPTH = REGISTRY.metric(
+    'fim_watch_queue_depth', 'gauge',
+    'Paths waiting to be hashed, pending in the coalescer or queued for a hashing thread'
+)
+WATCH_QUEUE_FULL = REGISTRY.metric(
+    'fim_watch_queue_full_total', 'counter',
+    'Times a path found its hashing queue full and was deferred'
+)
+WATCH_DROPPED = REGISTRY.metric(
+    'fim_watch_paths_dropped_total', 'counter',
+    'Paths whose processing failed, so their events were lost'
+)
+WATCH_CHANGES = REGISTRY.metric(
+    'fim_watch_changes_total', 'counter', 'Changes detected by type', label='type'
+)
+CHECKPOINT_SECONDS = REGISTRY.metric(
+    'fim_checkpoint_seconds', 'histogram', 'Time to save one checkpoint'
+)
+THROTTLE_SECONDS = REGISTRY.metric(
+    'fim_throttle_seconds_total', 'counter',
+    'Time hashing threads waited on a resource limit, by limit', label='limit'
+)
+THROTTLE_PACE = REGISTRY.metric(
+    'fim_throttle_pace', 'gauge',
+    'Fraction of time hashing may spend reading, lowered while reads are slow'
+)
+
+
+def record_hash(size: int, seconds: float) -> None:
+    """
+    Record one file hashed in full, if metrics are enabled.
+    
+    Args:
+        size: Bytes hashed
+        seconds: Time it took
+    """
+    if REGISTRY.enabled:
+        FILES_HASHED.inc()
+        BYTES_HASHED.inc(size)
+        HASH_SECONDS.observe(seconds)
+
+
+def hash_throughput() -> Tuple[float, float]:
+    """
+    Get files and bytes hashed per second of elapsed time.
+    
+    Returns:
+        Tuple of (files per second, bytes per second)
+    """
+    elapsed = REGISTRY.elapsed() or 1e-9
+    return FILES_HASHED.value() / elapsed, BYTES_HASHED.value() / elapsed
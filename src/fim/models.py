@@ -1,24 +1,189 @@
 """Data models for File Integrity Monitor."""
 
-from dataclasses import dataclass
+import sys
+import time
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union, cast
+
+
+EVENT_TYPES = ('ADDED', 'MODIFIED', 'DELETED')
+_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+
+# Epoch seconds at the start of each local hour seen in timestamps, or None
+# for hours that don't map one-to-one onto epoch time (DST transitions)
+_hour_starts: Dict[str, Optional[int]] = {}
+_HOUR_CACHE_SIZE = 65536
+
+
+def _hour_start(hour: str) -> Optional[int]:
+    """Get the epoch seconds of a local 'YYYY-MM-DDTHH' hour, if unambiguous."""
+    try:
+        return _hour_starts[hour]
+    except KeyError:
+        pass
+    
+    seconds: Optional[int]
+    try:
+        start = datetime.fromisoformat(hour + ':00:00')
+        seconds = int(start.timestamp())
+        end = datetime.fromtimestamp(seconds + 3599)
+        if datetime.fromtimestamp(seconds) != start or end != start.replace(minute=59, second=59):
+            seconds = None
+    except (ValueError, OverflowError, OSError):
+        seconds = None
+    
+    if len(_hour_starts) >= _HOUR_CACHE_SIZE:
+        _hour_starts.clear()
+    _hour_starts[hour] = seconds
+    return seconds
+
+
+def _parse_timestamp(value: str) -> Union[int, str]:
+    """
+    Convert a naive local ISO timestamp to epoch nanoseconds.
+    
+    Only the exact shapes datetime.isoformat() produces are converted, so
+    formatting the result gives back the same string; anything else is kept
+    as the original string.
+    """
+    length = len(value)
+    if length == 19:
+        microsecond = 0
+    elif length == 26 and value[19] == '.' and value[20:].isdigit() and value[20:] != '000000':
+        microsecond = int(value[20:])
+    else:
+        return value
+    
+    if value[10] != 'T' or value[13] != ':' or value[16] != ':' \
+            or not (value[14:16] + value[17:19]).isdigit():
+        return value
+    
+    minute, second = int(value[14:16]), int(value[17:19])
+    base = _hour_start(value[:13]) if minute < 60 and second < 60 else None
+    if base is None:
+        return value
+    return ((base + minute * 60 + second) * 1_000_000 + microsecond) * 1000
+
+
+def format_timestamp(value: Union[int, str]) -> str:
+    """
+    Format epoch nanoseconds as a naive local ISO timestamp.
+    
+    Args:
+        value: Epoch nanoseconds; strings are returned unchanged
+    
+    Returns:
+        Timestamp in the format of datetime.now().isoformat()
+    """
+    if isinstance(value, str):
+        return value
+    microseconds = value // 1000
+    return datetime.fromtimestamp(microseconds // 1_000_000).replace(
+        microsecond=microseconds % 1_000_000
+    ).isoformat()
+
+
+def _pack_hash(value: Optional[str]) -> Union[bytes, str, None]:
+    """Store a lowercase hex digest as raw bytes; keep anything else as is."""
+    if value is None:
+        return None
+    try:
+        digest = bytes.fromhex(value)
+    except (ValueError, TypeError):
+        return value
+    return digest if digest.hex() == value else value
+
+
+def _unpack_hash(value: Union[bytes, str, None]) -> Optional[str]:
+    """Return the hex form of a stored digest."""
+    return value.hex() if isinstance(value, bytes) else value
 
 
-@dataclass
 class Event:
-    """Represents a file system event."""
+    """
+    Represents a file system event.
     
-    type: str  # 'ADDED', 'MODIFIED', 'DELETED'
-    path: str
-    old_hash: Optional[str] = None
-    new_hash: Optional[str] = None
-    timestamp: Optional[str] = None
+    Events are kept compactly since watchers and reports may hold millions:
+    the type is a small int, paths are interned, hex digests are stored as
+    raw bytes and the timestamp as epoch nanoseconds, formatted on access.
+    Values that can't be stored compactly without changing them are kept as
+    given, so to_dict() always returns what was passed in.
+    """
+    
+    __slots__ = ('_type', 'path', '_old_hash', '_new_hash', '_timestamp')
+    
+    def __init__(
+        self,
+        type: str,  # 'ADDED', 'MODIFIED', 'DELETED'
+        path: str,
+        old_hash: Optional[str] = None,
+        new_hash: Optional[str] = None,
+        timestamp: Optional[str] = None
+    ):
+        """Set timestamp to now if not provided."""
+        self._type = _TYPE_CODES.get(type, type)
+        self.path = sys.intern(path)
+        self._old_hash = _pack_hash(old_hash)
+        self._new_hash = _pack_hash(new_hash)
+        self._timestamp = time.time_ns() if timestamp is None else _parse_timestamp(timestamp)
+    
+    @property
+    def type(self) -> str:
+        """Event type."""
+        code = self._type
+        return EVENT_TYPES[code] if isinstance(code, int) else code
+    
+    @type.setter
+    def type(self, value: str) -> None:
+        self._type = _TYPE_CODES.get(value, value)
+    
+    @property
+    def old_hash(self) -> Optional[str]:
+        """Hash before the event, as hex."""
+        return _unpack_hash(self._old_hash)
+    
+    @old_hash.setter
+    def old_hash(self, value: Optional[str]) -> None:
+        self._old_hash = _pack_hash(value)
+    
+    @property
+    def new_hash(self) -> Optional[str]:
+        """Hash after the event, as hex."""
+        return _unpack_hash(self._new_hash)
+    
+    @new_hash.setter
+    def new_hash(self, value: Optional[str]) -> None:
+        self._new_hash = _pack_hash(value)
+    
+    @property
+    def timestamp(self) -> str:
+        """Local time of the event in ISO format."""
+        return format_timestamp(self._timestamp)
+    
+    @timestamp.setter
+    def timestamp(self, value: str) -> None:
+        self._timestamp = _parse_timestamp(value)
+    
+    @property
+    def timestamp_ns(self) -> Optional[int]:
+        """Epoch nanoseconds of the event, None if the timestamp isn't convertible."""
+        value = self._timestamp
+        return value if isinstance(value, int) else None
     
-    def __post_init__(self):
-        """Set timestamp if not provided."""
-        if self.timestamp is None:
-            self.timestamp = datetime.now().isoformat()
+    def _key(self) -> tuple:
+        return (self.type, self.path, self.old_hash, self.new_hash, self.timestamp)
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()
+    
+    __hash__ = None  # type: ignore[assignment]  # Mutable, like the dataclass it replaces
+    
+    def __repr__(self) -> str:
+        return (f"Event(type={self.type!r}, path={self.path!r}, old_hash={self.old_hash!r}, "
+                f"new_hash={self.new_hash!r}, timestamp={self.timestamp!r})")
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -40,3 +205,128 @@ class Event:
             new_hash=data.get('new_hash'),
             timestamp=data.get('timestamp')
         )
+
+
+@dataclass
+class ScanOptions:
+    """Options controlling how a directory tree is scanned and hashed."""
+    
+    workers: int = 1  # Number of concurrent hashing workers
+    use_processes: bool = False  # Use a process pool instead of threads
+    use_mmap: bool = False  # Memory map large files while hashing
+    algorithm: str = 'sha256'  # Hash algorithm, see fim.hasher.ALGORITHMS
+    precheck: bool = False  # Record or compare fast CRC32 checksums
+    quick: bool = False  # Record or compare sampled fingerprints of large files
+    block_hash: bool = False  # Hash large files as blocks, several blocks at a time
+    block_digests: bool = False  # With block_hash, also record each block's digest
+    trust_stat: bool = False  # Skip rehashing files whose stat fingerprint is unchanged
+    full_rehash_every: int = 0  # With trust_stat, rehash everything every N runs (0 = never)
+    cache_mode: str = 'normal'  # Page cache policy for full reads, see fim.pagecache
+    scan_order: str = 'walk'  # Order files are hashed in, see fim.layout
+
+
+@dataclass
+class WatchOptions:
+    """Options controlling how file system events are turned into hashes."""
+    
+    quiet_window: float = 0.0  # Seconds without events before a path is hashed (0 = immediately)
+    max_delay: float = 5.0  # Longest a continuously changing path waits before it is hashed
+    hash_workers: int = 0  # Hashing threads (0 = hash inline on the calling thread)
+    queue_size: int = 1024  # Bound on queued paths per hashing thread
+    backpressure: str = 'block'  # 'block' or 'defer' when a hashing queue is full
+    checkpoint_interval: float = 0.0  # Seconds between checkpoints (0 = only on shutdown)
+    checkpoint_events: int = 0  # Checkpoint once this many events are unsaved (0 = no limit)
+    metrics_interval: float = 0.0  # Seconds between metrics exports (0 = only on shutdown)
+    cache_mode: str = 'normal'  # Page cache policy for hashing changed files, see fim.pagecache
+
+
+@dataclass
+class ThrottleOptions:
+    """Limits that keep hashing from starving other workloads of disk and CPU."""
+    
+    max_bytes_per_s: float = 0.0  # Bytes read per second (0 = unlimited)
+    max_files_per_s: float = 0.0  # Files hashed per second (0 = unlimited)
+    cpu_share: float = 0.0  # Busy fraction of each hashing thread's time (0 = unlimited)
+    max_read_latency: float = 0.0  # Back off while reads take longer, in seconds (0 = never)
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is set."""
+        return bool(self.max_bytes_per_s or self.max_files_per_s
+                    or self.cpu_share or self.max_read_latency)
+    
+    def split(self, parts: int) -> 'ThrottleOptions':
+        """Get the share of the rate limits for one of parts independent workers."""
+        return replace(
+            self,
+            max_bytes_per_s=self.max_bytes_per_s / parts,
+            max_files_per_s=self.max_files_per_s / parts
+        )
+
+
+@dataclass
+class VerifyResult:
+    """Represents a difference found while verifying files against a baseline."""
+    
+    status: str  # 'MODIFIED', 'MISSING', 'EXTRA'
+    path: str
+    expected_hash: Optional[str] = None
+    actual_hash: Optional[str] = None
+    # (start, end) byte ranges that changed, if block digests were recorded
+    changed_ranges: Optional[List[Tuple[int, int]]] = None
+
+
+@dataclass
+class BaselineData:
+    """Baseline hashes together with the metadata recorded alongside them."""
+    
+    # Mappings may be read-only views, e.g. of a memory mapped binary baseline
+    hashes: Mapping[str, str] = field(default_factory=dict)
+    stats: Mapping[str, List[int]] = field(default_factory=dict)  # Stat fingerprints
+    checksums: Mapping[str, str] = field(default_factory=dict)  # Pre-check CRC32s
+    # Sampled fingerprints; entries that have one are verified at the sampled tier
+    fingerprints: Mapping[str, str] = field(default_factory=dict)
+    # Merkle digest per directory ('' is the root), see fim.merkle
+    tree: Mapping[str, str] = field(default_factory=dict)
+    blocks: Mapping[str, List[str]] = field(default_factory=dict)  # Digest per block
+    header: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def algorithm(self) -> str:
+        """Hash algorithm used for the hashes (SHA256 for old baselines)."""
+        return cast(str, self.header.get('algorithm', 'sha256'))
+    
+    @property
+    def quick(self) -> Dict[str, int]:
+        """Sampling parameters of the fingerprints (samples, block_size, min_size)."""
+        return cast(Dict[str, int], self.header.get('quick', {}))
+    
+    @property
+    def block_hash(self) -> Dict[str, int]:
+        """Block hashing parameters of large files (block_size, min_size), if used."""
+        return cast(Dict[str, int], self.header.get('block_hash', {}))
+    
+    def tier(self, path: str) -> str:
+        """Get the tier a path is verified at in quick mode: 'sampled' or 'full'."""
+        return 'sampled' if path in self.fingerprints else 'full'
+    
+    def discard_metadata(self, paths: Iterable[str]) -> None:
+        """
+        Drop stats, checksums, fingerprints and block digests of paths whose
+        recorded hash changed, and the Merkle tree, which is rebuilt when saving.
+        """
+        stale = set(paths)
+        if stale:
+            self.tree = {}
+            self.stats = {
+                path: value for path, value in self.stats.items() if path not in stale
+            }
+            self.checksums = {
+                path: value for path, value in self.checksums.items() if path not in stale
+            }
+            self.fingerprints = {
+                path: value for path, value in self.fingerprints.items() if path not in stale
+            }
+            self.blocks = {
+                path: value for path, value in self.blocks.items() if path not in stale
+            }
@@ -0,0 +1,242 @@
+"""Page cache friendly reads for File Integrity Monitor.
+
+A full scan reads every file once, and by default each page it reads stays
+in the page cache, evicting the working set of other services. The cache
+modes, selected with ScanOptions.cache_mode, avoid that:
+
+- 'normal': plain buffered reads.
+- 'drop': buffered reads with a sequential read-ahead hint, and every
+  DROP_BEHIND_SIZE bytes the pages just hashed are evicted with
+  POSIX_FADV_DONTNEED. Pages that were cached before the file was opened
+  are left in place, so hashing a file another service keeps hot doesn't
+  evict it.
+- 'direct': O_DIRECT reads into an aligned buffer, bypassing the page
+  cache. File systems that refuse O_DIRECT (e.g. tmpfs) fall back to 'drop'.
+
+Both modes need posix_fadvise(), i.e. Linux or another POSIX system with
+it. Which pages were cached before is found with mincore(); without it,
+'drop' evicts every page it read.
+"""
+
+import ctypes
+import errno
+import mmap
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from .throttle import Throttle
+
+CACHE_MODES = ('normal', 'drop', 'direct')
+
+# Pages hashed in 'drop' mode are evicted every this many bytes
+DROP_BEHIND_SIZE = 8 * 1024 * 1024
+
+# Size of each direct read; a multiple of any logical block size
+DIRECT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Residency is looked up through mappings of at most this many bytes
+_MINCORE_WINDOW = 1 << 30
+
+# mincore() sets the low bit of each page's byte if it is resident
+_RESIDENT_BIT = bytes(i & 1 for i in range(256))
+
+_PAGE_SIZE = mmap.PAGESIZE
+
+# Aligned buffers for direct reads, one per thread
+_local = threading.local()
+
+
+@lru_cache(maxsize=None)
+def _load_mincore() -> Optional[Any]:
+    """Look up mincore() in the C library the first time it is needed."""
+    if os.name != 'posix':
+        return None
+    try:
+        mincore = ctypes.CDLL(None, use_errno=True).mincore
+    except (OSError, AttributeError, TypeError):
+        return None
+    mincore.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p)
+    mincore.restype = ctypes.c_int
+    return mincore
+
+
+def cache_modes_supported() -> bool:
+    """Whether the 'drop' and 'direct' cache modes can be used here."""
+    return hasattr(os, 'posix_fadvise')
+
+
+def resident_pages(fd: int, size: int) -> Optional[bytearray]:
+    """
+    Find which pages of a file are in the page cache.
+    
+    Args:
+        fd: Open file descriptor
+        size: File size in bytes
+    
+    Returns:
+        One byte per page, 1 if resident and 0 if not, or None if
+        residency can't be determined on this system
+    """
+    mincore = _load_mincore()
+    if mincore is None:
+        return None
+    
+    vector = bytearray((size + _PAGE_SIZE - 1) // _PAGE_SIZE)
+    for start in range(0, size, _MINCORE_WINDOW):
+        length = min(_MINCORE_WINDOW, size - start)
+        try:
+            # A private mapping is writable, which ctypes needs for its address
+            mapped = mmap.mmap(fd, length, access=mmap.ACCESS_COPY, offset=start)
+        except (OSError, ValueError):
+            return None
+        
+        with mapped:
+            address = ctypes.c_char.from_buffer(mapped)
+            pages = (ctypes.c_ubyte * ((length + _PAGE_SIZE - 1) // _PAGE_SIZE)).from_buffer(
+                vector, start // _PAGE_SIZE
+            )
+            result = mincore(ctypes.addressof(address), length, pages)
+            del address, pages
+        if result != 0:
+            return None
+    
+    return vector.translate(_RESIDENT_BIT)
+
+
+def drop_pages(fd: int, resident: Optional[bytearray], start: int, end: int) -> None:
+    """
+    Evict the pages of a byte range that were not resident before.
+    
+    Args:
+        fd: Open file descriptor
+        resident: Result of resident_pages() from before the range was read,
+            or None to evict the whole range
+        start: First byte of the range
+        end: End of the range (exclusive)
+    """
+    first = start // _PAGE_SIZE
+    last = (end + _PAGE_SIZE - 1) // _PAGE_SIZE
+    if resident is None:
+        os.posix_fadvise(fd, first * _PAGE_SIZE, (last - first) * _PAGE_SIZE,
+                         os.POSIX_FADV_DONTNEED)
+        return
+    
+    page = first
+    while page < last:
+        page = resident.find(0, page, last)
+        if page < 0:
+            return
+        run_end = resident.find(1, page, last)
+        if run_end < 0:
+            run_end = last
+        os.posix_fadvise(fd, page * _PAGE_SIZE, (run_end - page) * _PAGE_SIZE,
+                         os.POSIX_FADV_DONTNEED)
+        page = run_end
+
+
+def read_dropping(
+    fd: int,
+    size: int,
+    view: memoryview,
+    hash_objs: List[Any],
+    throttle: Optional[Throttle] = None
+) -> None:
+    """
+    Feed a file into each hash object, evicting the pages the reads cached.
+    
+    Args:
+        fd: File descriptor positioned at the start of the file
+        size: File size in bytes
+        view: Read buffer
+        hash_objs: Hash objects to update
+        throttle: Throttle to report each chunk to, if active
+    """
+    resident = resident_pages(fd, size)
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    offset = dropped = 0
+    
+    try:
+        while True:
+            start = time.perf_counter()
+            cpu_start = time.thread_time()
+            n = os.readv(fd, [view])
+            read_seconds = time.perf_counter() - start
+            if not n:
+                return
+            for hash_obj in hash_objs:
+                hash_obj.update(view[:n])
+            offset += n
+            
+            if offset - dropped >= DROP_BEHIND_SIZE:
+                drop_pages(fd, resident, dropped, offset)
+                dropped = offset
+            if throttle is not None:
+                throttle.consumed(n, read_seconds, time.thread_time() - cpu_start)
+    finally:
+        # Read-ahead stops at the end of the file, so this covers it too
+        drop_pages(fd, resident, dropped, max(offset, size))
+
+
+def _direct_buffer() -> memoryview:
+    """Get this thread's page aligned buffer for direct reads."""
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None:
+        # Anonymous mappings are page aligned, which satisfies O_DIRECT
+        buffer = memoryview(mmap.mmap(-1, DIRECT_CHUNK_SIZE))
+        _local.buffer = buffer
+    return buffer
+
+
+def open_direct(path: Any) -> Optional[int]:
+    """
+    Open a file for direct reads.
+    
+    Args:
+        path: Path to the file
+    
+    Returns:
+        File descriptor, or None if O_DIRECT is unavailable or the file
+        system refuses it
+    
+    Raises:
+        OSError: If the file can't be opened at all
+    """
+    if not hasattr(os, 'O_DIRECT'):
+        return None
+    try:
+        return os.open(path, os.O_RDONLY | os.O_DIRECT)
+    except OSError as e:
+        if e.errno == errno.EINVAL:  # Not supported by this file system
+            return None
+        raise
+
+
+def read_direct(fd: int, hash_objs: List[Any], throttle: Optional[Throttle] = None) -> None:
+    """
+    Feed a file opened with open_direct() into each hash object.
+    
+    Args:
+        fd: File descriptor from open_direct()
+        hash_objs: Hash objects to update
+        throttle: Throttle to report each chunk to, if active
+    """
+    view = _direct_buffer()
+    offset = 0
+    while True:
+        # Direct reads must start on a block boundary, so after a short read
+        # ends mid-page the partial page is read again and its head skipped
+        skip = offset % _PAGE_SIZE
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        n = os.preadv(fd, [view], offset - skip)
+        read_seconds = time.perf_counter() - start
+        if n <= skip:
+            return
+        for hash_obj in hash_objs:
+            hash_obj.update(view[skip:n])
+        offset += n - skip
+        if throttle is not None:
+            throttle.consumed(n - skip, read_seconds, time.thread_time() - cpu_start)
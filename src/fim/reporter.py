@@ -1,21 +1,20 @@
 """Report generation for File Integrity Monitor."""
 
+import itertools
+import json
 from pathlib import Path
-from typing import List, Dict
-from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Union
 import jinja2
 
+from .aggregate import EventStats, aggregate_events, aggregate_file
 from .models import Event
+from .storage import iter_events
 
+SIDECAR_SUFFIX = '.events.js'
 
-def render_report(events: List[Event], output_path: Path) -> None:
-    """
-    Render HTML report from events.
-    
-    Args:
-        events: List of Event objects
-        output_path: Path to save HTML report
-    """
+
+def _get_template() -> jinja2.Template:
+    """Load the report template."""
     # Get template directory
     template_dir = Path(__file__).parent / 'templates'
     
@@ -25,10 +24,85 @@ def render_report(events: List[Event], output_path: Path) -> None:
         autoescape=jinja2.select_autoescape(['html', 'xml'])
     )
     
-    template = env.get_template('report.html.j2')
+    return env.get_template('report.html.j2')
+
+
+def page_path(output_path: Path, page: int) -> Path:
+    """
+    Get the file name of a report page.
+    
+    Args:
+        output_path: Path of the first page
+        page: Page number, starting at 1
+    
+    Returns:
+        output_path for page 1, otherwise e.g. report-2.html
+    """
+    if page == 1:
+        return output_path
+    return output_path.with_name(f"{output_path.stem}-{page}{output_path.suffix}")
+
+
+def sidecar_path(output_path: Path) -> Path:
+    """Get the path of the file holding the full event data for a report."""
+    return output_path.with_name(output_path.stem + SIDECAR_SUFFIX)
+
+
+def _mirror(events: Iterator[Event], sidecar: TextIO) -> Iterator[Event]:
+    """Write each event to the sidecar file as it passes through."""
+    separator = '\n'
+    for event in events:
+        sidecar.write(separator + json.dumps(event.to_dict(), ensure_ascii=False))
+        separator = ',\n'
+        yield event
+
+
+def render_report(
+    events: Union[Iterable[Event], Callable[[], Iterable[Event]]],
+    output_path: Path,
+    page_size: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    stats: Optional[EventStats] = None,
+    top: int = 10
+) -> List[Path]:
+    """
+    Render HTML report from events.
+    
+    The report is streamed to disk with Template.generate, so only the
+    current page's rows are held in memory. Events are iterated twice: once
+    to aggregate statistics (skipped if stats are given) and once to render,
+    so a callable returning a fresh iterator may be passed instead of a list
+    to keep memory flat.
     
-    # Count events by type
-    event_counts = Counter(event.type for event in events)
+    With page_size, the event table is split into linked pages named
+    report.html, report-2.html, ... With max_rows, at most that many rows are
+    written inline; the full data then goes to a report.events.js sidecar
+    that the page only loads when asked to.
+    
+    Args:
+        events: List of Event objects, or a callable returning an iterator
+        output_path: Path to save HTML report (the first page)
+        page_size: Maximum number of rows per page
+        max_rows: Maximum number of rows written inline across all pages
+        stats: Pre-computed statistics of the same events
+        top: Number of paths and directories in the top-N tables
+    
+    Returns:
+        Paths of the written pages
+    """
+    if callable(events):
+        open_events: Callable[[], Iterable[Event]] = events
+    else:
+        def open_events() -> Iterable[Event]:
+            return events
+    
+    template = _get_template()
+    
+    # Count events by type, time, path and directory
+    if stats is None:
+        stats = aggregate_events(open_events())
+    event_counts = stats.type_counts
+    total_events = stats.total
     
     # Prepare chart data
     chart_data = {
@@ -40,16 +114,100 @@ def render_report(events: List[Event], output_path: Path) -> None:
         ]
     }
     
-    # Render template
-    html_content = template.render(
-        events=events,
-        chart_data=chart_data,
-        total_events=len(events)
-    )
+    # Hourly buckets unless the events span several days
+    timeline = stats.histogram('day')
+    if len(timeline) <= 2:
+        timeline = stats.histogram('hour')
+    timeline_data = {
+        'labels': [bucket.replace('T', ' ') for bucket, _ in timeline],
+        'data': [count for _, count in timeline]
+    }
+    
+    shown_events = total_events if max_rows is None else min(total_events, max_rows)
+    per_page = page_size or max(shown_events, 1)
+    page_count = max(1, -(-shown_events // per_page))
+    pages = [
+        {'number': number, 'href': page_path(output_path, number).name}
+        for number in range(1, page_count + 1)
+    ]
     
-    # Save report
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    remaining = iter(open_events())
+    sidecar = None
+    if shown_events < total_events:
+        sidecar = open(sidecar_path(output_path), 'w', encoding='utf-8')
+        sidecar.write('fimLoadEvents([')
+        remaining = _mirror(remaining, sidecar)
+    
+    written = []
+    try:
+        for number in range(1, page_count + 1):
+            first_row = (number - 1) * per_page
+            rows = min(per_page, shown_events - first_row)
+
+            # Render template, streaming rows straight to disk
+            stream = template.generate(
+                events=itertools.islice(remaining, rows),
+                chart_data=chart_data,
+                timeline_data=timeline_data,
+                top_paths=stats.top_paths(top),
+                top_directories=stats.top_directories(top),
+                total_events=total_events,
+                shown_events=shown_events,
+                first_row=first_row + 1,
+                last_row=first_row + rows,
+                page=number,
+                pages=pages if page_count > 1 else [],
+                sidecar=sidecar_path(output_path).name if sidecar else None
+            )
+            
+            # Save report
+            path = page_path(output_path, number)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(stream)
+            written.append(path)
+        
+        if sidecar is not None:
+            for _ in remaining:
+                pass
+            sidecar.write('\n]);\n')
+    finally:
+        if sidecar is not None:
+            sidecar.close()
     
-    print(f"Report saved to {output_path}")
+    if len(written) > 1:
+        print(f"Report saved to {output_path} ({len(written)} pages)")
+    else:
+        print(f"Report saved to {output_path}")
+    if sidecar is not None:
+        print(f"Showing {shown_events} of {total_events} events inline, "
+              f"full data in {sidecar_path(output_path)}")
+    
+    return written
+
+
+def render_report_file(
+    events_path: Path,
+    output_path: Path,
+    page_size: Optional[int] = None,
+    max_rows: Optional[int] = None
+) -> List[Path]:
+    """
+    Render HTML report from an events file without loading it into memory.
+    
+    Journals are streamed line by line; statistics of rotated segments are
+    taken from their cache when available.
+    
+    Args:
+        events_path: Path to events JSON file, or a .jsonl journal
+        output_path: Path to save HTML report
+        page_size: Maximum number of rows per page
+        max_rows: Maximum number of rows written inline across all pages
+    
+    Returns:
+        Paths of the written pages
+    """
+    return render_report(
+        lambda: iter_events(events_path), output_path, page_size, max_rows,
+        stats=aggregate_file(events_path)
+    )
@@ -0,0 +1,182 @@
+"""Parallel hashing engine for File Integrity Monitor."""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, cast
+
+from .hasher import CHECKSUM_ALGORITHM, file_digests, file_hash
+from .metrics import REGISTRY
+from .models import ScanOptions
+from .throttle import THROTTLE, configure_throttle
+
+# Number of paths sent to a worker process in one task
+PROCESS_BATCH_SIZE = 64
+
+# Tasks kept in flight per worker so workers never wait on the producer
+QUEUE_DEPTH_PER_WORKER = 4
+
+
+class ScanCancelled(Exception):
+    """Raised inside a scan or verification whose cancel event was set."""
+
+
+def check_cancelled(cancel: Optional[threading.Event]) -> None:
+    """
+    Stop a scan whose cancel event was set.
+    
+    Args:
+        cancel: Event set to cancel the scan, if it can be cancelled
+    
+    Raises:
+        ScanCancelled: If cancel is set
+    """
+    if cancel is not None and cancel.is_set():
+        raise ScanCancelled()
+
+
+def default_workers() -> int:
+    """
+    Get a sensible default number of hashing workers.
+    
+    Returns:
+        Worker count based on the number of available CPUs
+    """
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def _hash_batch(paths: List[Path], options: ScanOptions) -> List[Optional[str]]:
+    """Hash a batch of files (also runs inside worker processes)."""
+    return [
+        file_hash(path, options.algorithm, use_mmap=options.use_mmap,
+                  cache_mode=options.cache_mode)
+        for path in paths
+    ]
+
+
+def _hash_checksum_batch(paths: List[Path], options: ScanOptions) -> List[Optional[List[str]]]:
+    """Hash and checksum a batch of files in one read each."""
+    algorithms = (options.algorithm, CHECKSUM_ALGORITHM)
+    return [
+        file_digests(path, algorithms, use_mmap=options.use_mmap, cache_mode=options.cache_mode)
+        for path in paths
+    ]
+
+
+def _measured_batch(
+    worker: Callable[[List[Path], ScanOptions], List[Any]],
+    paths: List[Path],
+    options: ScanOptions
+) -> Tuple[List[Any], Dict[str, Dict[str, Any]]]:
+    """Run worker in a worker process, returning its results and the metrics it recorded."""
+    REGISTRY.reset()
+    REGISTRY.enabled = True
+    return worker(paths, options), REGISTRY.state()
+
+
+def _batched(items: Iterable[Tuple[str, Path]], size: int) -> Iterator[List[Tuple[str, Path]]]:
+    """Split an iterable into lists of at most size items."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def hash_files(
+    items: Iterable[Tuple[str, Path]],
+    options: Optional[ScanOptions] = None
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Hash files, possibly in parallel, yielding results in input order.
+    
+    Only a bounded number of files is in flight at any time, so memory use
+    does not grow with the number of files.
+    
+    Args:
+        items: Iterable of (key, file path) pairs
+        options: Scan options (defaults to serial SHA256 hashing)
+    
+    Returns:
+        Iterator of (key, hash) pairs; hash is None if the file can't be read
+    """
+    return _run_batches(items, options or ScanOptions(), _hash_batch)
+
+
+def hash_files_with_checksums(
+    items: Iterable[Tuple[str, Path]],
+    options: Optional[ScanOptions] = None
+) -> Iterator[Tuple[str, Optional[List[str]]]]:
+    """
+    Like hash_files(), but also compute the pre-check CRC32 of each file.
+    
+    Args:
+        items: Iterable of (key, file path) pairs
+        options: Scan options (defaults to serial SHA256 hashing)
+    
+    Returns:
+        Iterator of (key, [hash, checksum]) pairs, or (key, None) on errors
+    """
+    return _run_batches(items, options or ScanOptions(), _hash_checksum_batch)
+
+
+def _run_batches(
+    items: Iterable[Tuple[str, Path]],
+    options: ScanOptions,
+    worker: Callable[[List[Path], ScanOptions], List[Any]]
+) -> Iterator[Tuple[str, Any]]:
+    """Run worker over batches of paths, yielding results in input order."""
+    if options.workers <= 1:
+        for key, path in items:
+            yield key, worker([path], options)[0]
+        return
+    
+    executor: Executor
+    if options.use_processes and THROTTLE.active:
+        # Each worker process gets its share of the rate limits
+        executor = ProcessPoolExecutor(
+            max_workers=options.workers,
+            initializer=configure_throttle,
+            initargs=(THROTTLE.options.split(options.workers),)
+        )
+    elif options.use_processes:
+        executor = ProcessPoolExecutor(max_workers=options.workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=options.workers)
+    
+    batch_size = PROCESS_BATCH_SIZE if options.use_processes else 1
+    max_pending = options.workers * QUEUE_DEPTH_PER_WORKER
+    pending: Deque[Tuple[List[str], Future]] = deque()
+    # Worker processes record metrics in their own registry and send them back
+    measured = options.use_processes and REGISTRY.enabled
+    
+    def results(future: Future) -> List[Any]:
+        if not measured:
+            return cast(List[Any], future.result())
+        batch_results, state = future.result()
+        REGISTRY.merge(state)
+        return cast(List[Any], batch_results)
+    
+    try:
+        for batch in _batched(items, batch_size):
+            keys = [key for key, _ in batch]
+            paths = [path for _, path in batch]
+            future: Future
+            if measured:
+                future = executor.submit(_measured_batch, worker, paths, options)
+            else:
+                future = executor.submit(worker, paths, options)
+            pending.append((keys, future))
+            
+            if len(pending) >= max_pending:
+                keys, future = pending.popleft()
+                yield from zip(keys, results(future))
+        
+        while pending:
+            keys, future = pending.popleft()
+            yield from zip(keys, results(future))
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -1,9 +1,11 @@
 """Storage utilities for File Integrity Monitor."""
 
 import json
+import os
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 
+from .journal import JOURNAL_SUFFIX, is_journal, iter_journal, journal_segments
 from .models import Event
 
 
@@ -29,26 +31,40 @@ def save_json(data: Dict[str, Any], path: Path) -> None:
     """
     Save data to JSON file.
     
+    The data is written to a temporary file that replaces the target once
+    it is complete, so a crash never leaves a truncated file behind.
+    
     Args:
         data: Dictionary to save
         path: Path to save to
     """
     path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
     
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
 
 
 def load_events(path: Path) -> List[Event]:
     """
-    Load events from JSON file.
+    Load events from JSON file or journal.
     
     Args:
-        path: Path to events JSON file
+        path: Path to events JSON file, or a .jsonl journal
         
     Returns:
         List of Event objects
     """
+    if is_journal(path):
+        return list(iter_journal(path))
+    
     try:
         data = load_json(path)
         return [Event.from_dict(event_data) for event_data in data.get('events', [])]
@@ -56,6 +72,23 @@ def load_events(path: Path) -> List[Event]:
         return []
 
 
+def iter_events(path: Path) -> Iterator[Event]:
+    """
+    Iterate events from JSON file or journal.
+    
+    Journals are streamed line by line; JSON files are loaded whole.
+    
+    Args:
+        path: Path to events JSON file, or a .jsonl journal
+    
+    Returns:
+        Iterator of Event objects
+    """
+    if is_journal(path):
+        return iter_journal(path)
+    return iter(load_events(path))
+
+
 def save_events(events: List[Event], path: Path) -> None:
     """
     Save events to JSON file.
@@ -68,3 +101,42 @@ def save_events(events: List[Event], path: Path) -> None:
         'events': [event.to_dict() for event in events]
     }
     save_json(data, path)
+
+
+def pending_events_path(path: Path) -> Path:
+    """
+    Get the journal that holds events not yet merged into a JSON events file.
+    
+    Args:
+        path: Path to the events JSON file
+    
+    Returns:
+        Path of the pending journal, e.g. events.json.pending.jsonl
+    """
+    return path.with_name(path.name + '.pending' + JOURNAL_SUFFIX)
+
+
+def merge_pending_events(path: Path) -> int:
+    """
+    Append the events of a JSON events file's pending journal to it.
+    
+    The JSON file is rewritten once for all pending events, then the
+    journal is removed.
+    
+    Args:
+        path: Path to the events JSON file
+    
+    Returns:
+        Number of events merged
+    """
+    pending = pending_events_path(path)
+    segments = journal_segments(pending)
+    if not segments:
+        return 0
+    
+    events = list(iter_journal(pending))
+    if events:
+        save_events(load_events(path) + events, path)
+    for segment in segments:
+        segment.unlink()
+    return len(events)
@@ -0,0 +1,201 @@
+"""Resource limits for hashing in File Integrity Monitor.
+
+Hashing threads report every file and chunk they hash to the process-wide
+THROTTLE, which makes them sleep as needed to keep to the configured
+limits:
+
+- Token buckets cap the bytes and files hashed per second.
+- A CPU share caps the fraction of time each hashing thread spends on CPU.
+- Adaptive back-off lowers the fraction of time spent reading while the
+  smoothed read latency is above a threshold, and raises it again slowly
+  once reads are fast (additive increase, multiplicative decrease).
+
+The throttle is inactive by default, so unthrottled hashing costs one
+attribute check per file.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from .metrics import REGISTRY, THROTTLE_PACE, THROTTLE_SECONDS
+from .models import ThrottleOptions
+
+# Seconds of traffic a token bucket lets through at once after idling
+BURST_SECONDS = 0.25
+
+# Adaptive back-off never reads less than this fraction of the time
+MIN_PACE = 0.05
+
+# Seconds between adjustments of the pace
+PACE_INTERVAL = 0.1
+
+# The pace is multiplied by this while reads are slow...
+PACE_DECREASE = 0.5
+
+# ...and grows by this once they are fast again
+PACE_INCREASE = 0.05
+
+# Weight of the newest read in the smoothed read latency
+LATENCY_WEIGHT = 0.2
+
+_UNITS = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+
+def parse_size(text: str) -> float:
+    """
+    Parse a byte count such as '512k', '50M' or '1.5G' (binary units).
+    
+    Args:
+        text: Number with an optional k, m or g suffix and optional B
+    
+    Returns:
+        Number of bytes
+    
+    Raises:
+        ValueError: If the text is not a non-negative size
+    """
+    number = text.strip().lower().removesuffix('b')
+    unit = _UNITS.get(number[-1:], 1)
+    if unit != 1:
+        number = number[:-1]
+    value = float(number) * unit
+    if not value >= 0:
+        raise ValueError(f"Invalid size: {text!r}")
+    return value
+
+
+class TokenBucket:
+    """Rate limiter shared by threads; callers sleep off the debt they run up."""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Most tokens saved up while idle (default: BURST_SECONDS of rate)
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate * BURST_SECONDS, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def take(self, amount: float) -> float:
+        """
+        Take tokens, going into debt if there are not enough.
+        
+        Args:
+            amount: Tokens to take
+        
+        Returns:
+            Seconds the caller must wait before using them
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class Throttle:
+    """Paces hashing threads to keep to the configured ThrottleOptions."""
+    
+    def __init__(self) -> None:
+        self.options = ThrottleOptions()
+        self.active = False
+        self.pace = 1.0  # Fraction of time adaptive back-off allows reading
+        self.latency = 0.0  # Smoothed seconds per read
+        self._bytes: Optional[TokenBucket] = None
+        self._files: Optional[TokenBucket] = None
+        self._pace_updated = 0.0
+        self._lock = threading.Lock()
+    
+    def configure(self, options: ThrottleOptions) -> None:
+        """
+        Set the limits, or lift them with a default ThrottleOptions.
+        
+        Args:
+            options: Limits for all hashing threads of this process
+        
+        Raises:
+            ValueError: If a limit is negative or cpu_share is above 1
+        """
+        if min(options.max_bytes_per_s, options.max_files_per_s,
+               options.cpu_share, options.max_read_latency) < 0:
+            raise ValueError("Throttle limits must not be negative")
+        if options.cpu_share > 1:
+            raise ValueError("The CPU share must be a fraction between 0 and 1")
+        
+        self.options = options
+        self._bytes = TokenBucket(options.max_bytes_per_s) if options.max_bytes_per_s else None
+        self._files = TokenBucket(options.max_files_per_s) if options.max_files_per_s else None
+        self.pace = 1.0
+        self.latency = 0.0
+        self.active = options.enabled
+    
+    def begin_file(self) -> None:
+        """Wait until another file may be hashed."""
+        if self._files is not None:
+            self._wait(self._files.take(1), 'files')
+    
+    def consumed(self, size: int, read_seconds: float, cpu_seconds: float) -> None:
+        """
+        Account for one chunk and wait as long as the limits require.
+        
+        Args:
+            size: Bytes read
+            read_seconds: Wall time the read took
+            cpu_seconds: CPU time the thread spent reading and hashing the chunk
+        """
+        if self._bytes is not None:
+            self._wait(self._bytes.take(size), 'bytes')
+        if self.options.cpu_share:
+            self._wait(cpu_seconds * (1 / self.options.cpu_share - 1), 'cpu')
+        if self.options.max_read_latency:
+            pace = self._adapt(read_seconds)
+            if pace < 1:
+                self._wait(read_seconds * (1 / pace - 1), 'latency')
+    
+    def _adapt(self, read_seconds: float) -> float:
+        """Update the smoothed read latency and adjust the pace to it."""
+        with self._lock:
+            if self.latency:
+                self.latency += LATENCY_WEIGHT * (read_seconds - self.latency)
+            else:
+                self.latency = read_seconds
+            
+            now = time.monotonic()
+            if now - self._pace_updated >= PACE_INTERVAL:
+                self._pace_updated = now
+                if self.latency > self.options.max_read_latency:
+                    self.pace = max(MIN_PACE, self.pace * PACE_DECREASE)
+                else:
+                    self.pace = min(1.0, self.pace + PACE_INCREASE)
+                if REGISTRY.enabled:
+                    THROTTLE_PACE.set(self.pace)
+            return self.pace
+    
+    def _wait(self, seconds: float, limit: str) -> None:
+        """Sleep on behalf of a limit."""
+        if seconds <= 0:
+            return
+        time.sleep(seconds)
+        if REGISTRY.enabled:
+            THROTTLE_SECONDS.inc(seconds, limit)
+
+
+# Process-wide throttle consulted by the hashing functions
+THROTTLE = Throttle()
+
+
+def configure_throttle(options: ThrottleOptions) -> None:
+    """
+    Set the limits of the process-wide throttle (also a worker process initializer).
+    
+    Args:
+        options: Limits for all hashing threads of this process
+    """
+    THROTTLE.configure(options)
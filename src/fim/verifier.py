@@ -0,0 +1,209 @@
+"""Single-pass baseline verification for File Integrity Monitor."""
+
+import threading
+from collections import deque
+from dataclasses import replace
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Set, Tuple
+
+from .hasher import (
+    CHECKSUM_ALGORITHM, QUICK_BLOCK_SIZE, QUICK_SAMPLES, changed_ranges, file_block_digests,
+    file_fingerprint, file_hash,
+)
+from .layout import order_files
+from .metrics import FILES_WALKED, REGISTRY
+from .models import BaselineData, ScanOptions, VerifyResult
+from .scanner import check_cancelled, hash_files
+from .walker import PathFilter, iter_files
+
+
+class TreeVerifier:
+    """Verifies a directory tree against a baseline in a single walk."""
+    
+    def __init__(
+        self,
+        root: Path,
+        data: BaselineData,
+        options: Optional[ScanOptions] = None,
+        path_filter: Optional[PathFilter] = None,
+        cancel: Optional[threading.Event] = None
+    ):
+        """
+        Initialize verifier.
+        
+        Args:
+            root: Root directory to verify
+            data: Baseline to verify against; its header selects the algorithm
+            options: Scan options; with trust_stat, files whose fingerprint
+                matches the baseline are not hashed, and with precheck, files
+                whose CRC32 differs from the baseline are reported without a
+                cryptographic hash, and with quick, files with a recorded fingerprint are accepted
+                if their sampled fingerprint still matches. Whether large files
+                are block hashed follows the baseline, like the algorithm.
+                With a scan_order other than 'walk', the tree is walked before
+                the first file is hashed, so EXTRA results come first
+            path_filter: Include/exclude patterns; excluded baseline entries
+                are neither walked nor reported missing
+            cancel: Event that stops the verification when set, checked
+                between files; results() then raises ScanCancelled
+        """
+        self.root = Path(root).resolve()
+        self.data = data
+        self.options = replace(options or ScanOptions(), algorithm=data.algorithm)
+        self.path_filter = path_filter
+        self.cancel = cancel
+        
+        self.files_seen = 0
+        self.files_hashed = 0
+        self.files_trusted = 0
+        self.files_prechecked = 0  # Reported as modified on a changed CRC32 alone
+        self.sampled_paths: List[str] = []  # Accepted on a sampled fingerprint only
+    
+    def results(self) -> Iterator[VerifyResult]:
+        """
+        Walk the tree once and stream differences as they are found.
+        
+        Each file is hashed at most once, and files that are not in the
+        baseline are reported without being hashed. Only the set of visited
+        baseline paths is kept in memory to find missing files at the end.
+        
+        Returns:
+            Iterator of MODIFIED, EXTRA and finally MISSING results
+        """
+        baseline = self.data.hashes
+        seen: Set[str] = set()
+        extra_files: Deque[str] = deque()
+        trust_stat = self.options.trust_stat
+        fingerprints = self.data.fingerprints if self.options.quick else {}
+        samples = self.data.quick.get('samples', QUICK_SAMPLES)
+        block_size = self.data.quick.get('block_size', QUICK_BLOCK_SIZE)
+        block_hash = self.data.block_hash
+        # Block-hashed files are verified while walking; differences wait here
+        block_results: Deque[VerifyResult] = deque()
+        
+        def files_to_hash() -> Iterator[Tuple[str, Path, List[int]]]:
+            for rel_path, file_path, fingerprint in iter_files(self.root, self.path_filter):
+                check_cancelled(self.cancel)
+                self.files_seen += 1
+                
+                if rel_path not in baseline:
+                    extra_files.append(rel_path)
+                    continue
+                
+                seen.add(rel_path)
+                if trust_stat and self.data.stats.get(rel_path) == fingerprint:
+                    self.files_trusted += 1
+                elif rel_path in fingerprints and file_fingerprint(
+                    file_path, self.data.algorithm, samples, block_size
+                ) == fingerprints[rel_path]:
+                    self.sampled_paths.append(rel_path)
+                elif block_hash and fingerprint[2] >= block_hash['min_size']:
+                    self.files_hashed += 1
+                    result = self._verify_blocks(rel_path, file_path, fingerprint[2])
+                    if result is not None:
+                        block_results.append(result)
+                else:
+                    # Fingerprint changed or not recorded: fall back to the full hash
+                    yield rel_path, file_path, fingerprint
+        
+        if self.options.precheck:
+            hash_options = replace(self.options, algorithm=CHECKSUM_ALGORITHM)
+        else:
+            hash_options = self.options
+        
+        ordered = order_files(files_to_hash(), self.options.scan_order, self.options.workers)
+        for rel_path, actual_hash in hash_files(ordered, hash_options):
+            check_cancelled(self.cancel)
+            self.files_hashed += 1
+            
+            while extra_files:
+                yield VerifyResult(status='EXTRA', path=extra_files.popleft())
+            while block_results:
+                yield block_results.popleft()
+            
+            if self.options.precheck:
+                expected_checksum = self.data.checksums.get(rel_path)
+                if actual_hash is not None and expected_checksum is not None \
+                        and actual_hash != expected_checksum:
+                    self.files_prechecked += 1
+                    yield VerifyResult(
+                        status='MODIFIED', path=rel_path, expected_hash=baseline[rel_path]
+                    )
+                    continue
+                
+                # A matching CRC32 proves nothing, as collisions are easy to
+                # forge: only the full hash can accept the file
+                actual_hash = file_hash(
+                    self.root / rel_path, self.data.algorithm, use_mmap=self.options.use_mmap,
+                    cache_mode=self.options.cache_mode
+                )
+            
+            expected_hash = baseline[rel_path]
+            if actual_hash != expected_hash:
+                yield VerifyResult(
+                    status='MODIFIED',
+                    path=rel_path,
+                    expected_hash=expected_hash,
+                    actual_hash=actual_hash
+                )
+        
+        while extra_files:
+            yield VerifyResult(status='EXTRA', path=extra_files.popleft())
+        while block_results:
+            yield block_results.popleft()
+        if REGISTRY.enabled:
+            FILES_WALKED.inc(self.files_seen)
+        
+        path_filter = self.path_filter
+        for rel_path, expected_hash in baseline.items():
+            if rel_path in seen or (path_filter and not path_filter.matches(rel_path)):
+                continue
+            yield VerifyResult(status='MISSING', path=rel_path, expected_hash=expected_hash)
+    
+    def _verify_blocks(self, rel_path: str, file_path: Path, size: int) -> Optional[VerifyResult]:
+        """Block hash a file; if it changed, find the changed ranges from recorded blocks."""
+        block_size = self.data.block_hash['block_size']
+        digests = file_block_digests(
+            file_path, self.data.algorithm, block_size, self.options.workers,
+            self.options.cache_mode
+        )
+        expected_hash = self.data.hashes[rel_path]
+        if digests is None:
+            return VerifyResult(status='MODIFIED', path=rel_path, expected_hash=expected_hash)
+        
+        actual_hash, blocks = digests
+        if actual_hash == expected_hash:
+            return None
+        
+        expected_blocks = self.data.blocks.get(rel_path)
+        return VerifyResult(
+            status='MODIFIED',
+            path=rel_path,
+            expected_hash=expected_hash,
+            actual_hash=actual_hash,
+            changed_ranges=(
+                changed_ranges(expected_blocks, blocks, block_size, size)
+                if expected_blocks else None
+            )
+        )
+
+
+def verify_tree(
+    root: Path,
+    data: BaselineData,
+    options: Optional[ScanOptions] = None,
+    path_filter: Optional[PathFilter] = None
+) -> Iterator[VerifyResult]:
+    """
+    Verify a directory tree against a baseline, streaming differences.
+    
+    Args:
+        root: Root directory to verify
+        data: Baseline to verify against
+        options: Scan options
+        path_filter: Include/exclude patterns
+    
+    Returns:
+        Iterator of VerifyResult objects
+    """
+    return TreeVerifier(root, data, options, path_filter).results()
@@ -0,0 +1,238 @@
+"""Directory tree walking with include/exclude filters for File Integrity Monitor."""
+
+import configparser
+import fnmatch
+import os
+import re
+import stat
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CONFIG_SECTION = 'fim'
+
+
+def stat_fingerprint(st: os.stat_result) -> List[int]:
+    """
+    Build a stat fingerprint used to detect unchanged files without hashing.
+    
+    Args:
+        st: Result of os.stat() for the file
+    
+    Returns:
+        List of [dev, inode, size, mtime_ns, ctime_ns]
+    """
+    return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns]
+
+
+def _compile(patterns: Iterable[str]) -> Optional['re.Pattern[str]']:
+    """Compile glob patterns into a single regular expression."""
+    translated = [fnmatch.translate(pattern) for pattern in patterns]
+    if not translated:
+        return None
+    return re.compile('|'.join(f'(?:{regex})' for regex in translated))
+
+
+class PathFilter:
+    """
+    Include/exclude glob sets matched against paths relative to the root.
+    
+    A pattern without a slash matches a file or directory name at any depth
+    (e.g. 'node_modules' or '*.pyc'); a pattern with a slash matches the
+    whole relative path (e.g. 'logs/*.log'). Excluded directories are not
+    descended into. Include patterns only apply to files; without any, every
+    file not excluded is included.
+    """
+    
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = ()):
+        """
+        Initialize filter.
+        
+        Args:
+            include: Glob patterns files must match
+            exclude: Glob patterns for files and directories to skip
+        """
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self._include_names = _compile(p for p in self.include if '/' not in p)
+        self._include_paths = _compile(p for p in self.include if '/' in p)
+        self._exclude_names = _compile(p for p in self.exclude if '/' not in p)
+        self._exclude_paths = _compile(p for p in self.exclude if '/' in p)
+        self._own: Optional['re.Pattern[str]'] = None
+    
+    def __bool__(self) -> bool:
+        return bool(self.include or self.exclude or self._own)
+    
+    @staticmethod
+    def _match(regex: Optional['re.Pattern[str]'], value: str) -> bool:
+        return regex is not None and regex.match(value) is not None
+    
+    def excludes(self, rel_path: str, name: str) -> bool:
+        """
+        Check whether a file or directory is excluded.
+        
+        Args:
+            rel_path: Path relative to the root, with '/' separators
+            name: Last component of the path
+        
+        Returns:
+            True if an exclude pattern matches
+        """
+        return (
+            self._match(self._exclude_names, name)
+            or self._match(self._exclude_paths, rel_path)
+            or (self._own is not None and self._own.fullmatch(rel_path) is not None)
+        )
+    
+    def includes(self, rel_path: str, name: str) -> bool:
+        """
+        Check whether a file passes the include patterns and is not excluded.
+        
+        Args:
+            rel_path: Path relative to the root, with '/' separators
+            name: Last component of the path
+        
+        Returns:
+            True if the file should be monitored
+        """
+        if self.excludes(rel_path, name):
+            return False
+        if not self.include:
+            return True
+        return self._match(self._include_names, name) or self._match(self._include_paths, rel_path)
+    
+    def matches(self, rel_path: str) -> bool:
+        """
+        Check whether a file would be yielded by a walk of the root.
+        
+        Unlike includes(), this also checks every parent directory, for
+        paths that do not come from a walk (e.g. watcher events).
+        
+        Args:
+            rel_path: Path relative to the root, in native or '/' form
+        
+        Returns:
+            True if the file should be monitored
+        """
+        parts = Path(rel_path).parts
+        for depth in range(1, len(parts)):
+            if self.excludes('/'.join(parts[:depth]), parts[depth - 1]):
+                return False
+        return self.includes('/'.join(parts), parts[-1]) if parts else False
+    
+    def exclude_own_files(self, root: Path, paths: Iterable[Path]) -> None:
+        """
+        Exclude files written by FIM itself when they live under root.
+        
+        Each path is excluded along with files named after it, which covers
+        temporary files, run state, rotated journal segments and their cached
+        statistics (e.g. baseline.json.tmp, baseline.json.state,
+        events.000001.jsonl or events.000001.jsonl.stats).
+        
+        Args:
+            root: Root directory being monitored
+            paths: Baseline, events and other output files
+        """
+        root = Path(root).resolve()
+        regexes = [self._own.pattern] if self._own is not None else []
+        for path in paths:
+            try:
+                rel_path = Path(path).resolve().relative_to(root).as_posix()
+            except ValueError:
+                continue
+            
+            regexes.append(re.escape(rel_path) + r'(?:\..*)?')
+            stem, dot, suffix = rel_path.rpartition('.')
+            if dot:
+                regexes.append(re.escape(stem) + r'\.\d+\.' + re.escape(suffix) + r'(?:\..*)?')
+        
+        if regexes:
+            self._own = re.compile('|'.join(f'(?:{regex})' for regex in regexes))
+
+
+def iter_files(
+    root: Path,
+    path_filter: Optional[PathFilter] = None
+) -> Iterator[Tuple[str, Path, List[int]]]:
+    """
+    Yield (relative path, absolute path, fingerprint) for every file under root.
+    
+    The tree is walked with os.scandir, reusing each entry's type and stat
+    data. Excluded directories are pruned before they are read. Symbolic
+    links to files are followed; symbolic links to directories are not.
+    
+    Args:
+        root: Root directory to walk
+        path_filter: Include/exclude patterns
+    
+    Returns:
+        Iterator of (relative path, absolute path, stat fingerprint)
+    """
+    root = Path(root)
+    path_filter = path_filter if path_filter else None
+    stack: List[Tuple[str, str]] = [(str(root), '')]
+    
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirectories = []
+                for entry in entries:
+                    rel_path = prefix + entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if path_filter is None or not path_filter.excludes(
+                                    rel_path.replace(os.sep, '/'), entry.name):
+                                subdirectories.append((entry.path, rel_path + os.sep))
+                            continue
+                        
+                        if path_filter is not None and not path_filter.includes(
+                                rel_path.replace(os.sep, '/'), entry.name):
+                            continue
+                        
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    
+                    if stat.S_ISREG(st.st_mode):
+                        yield rel_path, Path(entry.path), stat_fingerprint(st)
+        except OSError:
+            continue
+        
+        # Depth first, in directory order
+        stack.extend(reversed(subdirectories))
+
+
+def load_config(path: Path) -> Tuple[List[str], List[str]]:
+    """
+    Load include and exclude patterns from an INI config file.
+    
+    The file has a [fim] section whose include and exclude options list one
+    pattern per line or separated by commas:
+        
+        [fim]
+        exclude = .git
+            node_modules
+            *.pyc
+    
+    Args:
+        path: Path to the config file
+    
+    Returns:
+        Tuple of (include_patterns, exclude_patterns)
+    
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file is not valid INI
+    """
+    parser = configparser.ConfigParser()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            parser.read_file(f)
+    except configparser.Error as e:
+        raise ValueError(f"Invalid config file {path}: {e}") from e
+    
+    def patterns(option: str) -> List[str]:
+        value = parser.get(CONFIG_SECTION, option, fallback='')
+        return [p.strip() for line in value.splitlines() for p in line.split(',') if p.strip()]
+    
+    return patterns('include'), patterns('exclude')
@@ -1,168 +1,647 @@
 """File system watcher for File Integrity Monitor."""
 
 import os
+import queue
+import threading
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 from watchdog.observers import Observer
 import time
 
-from .models import Event
-from .hasher import file_sha256
+from .baseline_store import BaselineStore
+from .models import Event, WatchOptions
+from .hasher import DEFAULT_ALGORITHM, file_hash, file_hash_blocks
+from .metrics import (
+    CHECKPOINT_SECONDS, REGISTRY, WATCH_CHANGES, WATCH_COALESCED, WATCH_DROPPED,
+    WATCH_EVENTS, WATCH_QUEUE_DEPTH, WATCH_QUEUE_FULL,
+)
+from .walker import PathFilter
+
+
+class EventCoalescer:
+    """Collapses bursts of file system events into one pending entry per path."""
+    
+    def __init__(
+        self,
+        quiet_window: float = 0.5,
+        max_delay: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize coalescer.
+        
+        Args:
+            quiet_window: A path is due once no event arrived for this many seconds
+            max_delay: A path is due this many seconds after its first event,
+                even if events keep arriving
+            clock: Monotonic time source
+        """
+        self.quiet_window = quiet_window
+        self.max_delay = max(max_delay, quiet_window)
+        self._clock = clock
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        
+        self.events_received = 0
+        self.paths_released = 0
+    
+    @property
+    def events_coalesced(self) -> int:
+        """Number of events merged into an already pending path."""
+        return self.events_received - self.paths_released - len(self._pending)
+    
+    def add(self, path: str) -> None:
+        """
+        Record an event for a path.
+        
+        Args:
+            path: Relative path the event refers to
+        """
+        now = self._clock()
+        with self._lock:
+            self.events_received += 1
+            first_seen, _ = self._pending.get(path, (now, now))
+            self._pending[path] = (first_seen, now)
+    
+    def pop_due(self, force: bool = False) -> List[str]:
+        """
+        Remove and return the paths that are ready to be processed.
+        
+        Args:
+            force: Return every pending path regardless of timing
+        
+        Returns:
+            Paths in the order their first event arrived
+        """
+        now = self._clock()
+        with self._lock:
+            due = [
+                path for path, (first_seen, last_seen) in self._pending.items()
+                if force
+                or now - last_seen >= self.quiet_window
+                or now - first_seen >= self.max_delay
+            ]
+            for path in due:
+                del self._pending[path]
+            self.paths_released += len(due)
+        return due
+    
+    def requeue(self, path: str) -> None:
+        """
+        Put back a released path that could not be processed yet.
+        
+        The path becomes due again on the next call to pop_due.
+        
+        Args:
+            path: Relative path returned by pop_due
+        """
+        overdue = self._clock() - self.max_delay
+        with self._lock:
+            self.paths_released -= 1
+            _, last_seen = self._pending.get(path, (overdue, overdue))
+            self._pending[path] = (overdue, last_seen)
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+BACKPRESSURE_POLICIES = ('block', 'defer')
+
+
+class HashWorkerPool:
+    """
+    Bounded pool of hashing threads, sharded by path.
+    
+    Every path is always handled by the same thread, so work for one path
+    runs in submission order while different paths are hashed concurrently.
+    Each thread has its own bounded queue; when it is full, submit either
+    blocks until there is room ('block') or refuses the path ('defer') so
+    the caller can retry later without stalling.
+    """
+    
+    def __init__(
+        self,
+        worker: Callable[[str], None],
+        workers: int = 2,
+        queue_size: int = 1024,
+        backpressure: str = 'block'
+    ):
+        """
+        Initialize and start the pool.
+        
+        Args:
+            worker: Function called with each submitted path
+            workers: Number of hashing threads
+            queue_size: Maximum number of queued paths per thread
+            backpressure: Policy when a queue is full, see BACKPRESSURE_POLICIES
+        
+        Raises:
+            ValueError: If an argument is out of range
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy '{backpressure}', "
+                f"expected one of: {', '.join(BACKPRESSURE_POLICIES)}"
+            )
+        
+        self.backpressure = backpressure
+        self._worker = worker
+        self._queues: List[queue.Queue] = [queue.Queue(queue_size) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(i,), name=f'fim-hash-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        
+        self.submitted = 0
+        self.deferred = 0
+        # One counter per shard, each only written by its own thread
+        self._errors = [0] * workers
+        
+        for thread in self._threads:
+            thread.start()
+    
+    def _run(self, shard: int) -> None:
+        """Serve one shard until the stop sentinel arrives."""
+        work = self._queues[shard]
+        while True:
+            path = work.get()
+            try:
+                if path is None:
+                    return
+                self._worker(path)
+            except Exception as e:
+                self._errors[shard] += 1
+                print(f"Warning: Could not process {path}: {e}")
+            finally:
+                work.task_done()
+    
+    def submit(self, path: str, block: Optional[bool] = None) -> bool:
+        """
+        Queue a path for processing.
+        
+        Args:
+            path: Path to pass to the worker function
+            block: Override the backpressure policy for this call
+        
+        Returns:
+            False if the path was refused because its queue is full
+        """
+        if block is None:
+            block = self.backpressure == 'block'
+        
+        shard = self._queues[hash(path) % len(self._queues)]
+        try:
+            shard.put(path, block=block)
+        except queue.Full:
+            self.deferred += 1
+            return False
+        
+        self.submitted += 1
+        return True
+    
+    @property
+    def errors(self) -> int:
+        """Number of paths whose processing raised."""
+        return sum(self._errors)
+    
+    @property
+    def depth(self) -> int:
+        """Number of paths currently queued."""
+        return sum(q.qsize() for q in self._queues)
+    
+    def join(self) -> None:
+        """Wait until every submitted path has been processed."""
+        for work in self._queues:
+            work.join()
+    
+    def close(self) -> None:
+        """Process the remaining paths and stop the threads."""
+        for work in self._queues:
+            work.put(None)
+        for thread in self._threads:
+            thread.join()
 
 
 class FIMEventHandler(FileSystemEventHandler):
     """Handler for file system events."""
     
-    def __init__(self, root_path: Path, baseline: Dict[str, str]):
+    def __init__(
+        self,
+        root_path: Path,
+        baseline: Mapping[str, str],
+        algorithm: str = DEFAULT_ALGORITHM,
+        options: Optional[WatchOptions] = None,
+        path_filter: Optional[PathFilter] = None,
+        block_hash: Optional[Mapping[str, int]] = None,
+        on_event: Optional[Callable[[Event], None]] = None
+    ):
         """
         Initialize event handler.
         
+        Callbacks only record the path. Events are collected per path and
+        the file is hashed once the path has been quiet for
+        options.quiet_window seconds (or options.max_delay has passed), on
+        options.hash_workers threads. With a quiet window of 0 and no
+        hashing threads every event is processed immediately.
+        
         Args:
             root_path: Root directory being watched
             baseline: Current baseline dictionary
+            algorithm: Hash algorithm the baseline was built with
+            options: Coalescing and hashing options
+            path_filter: Include/exclude patterns; events for other paths
+                are ignored
+            block_hash: Block hashing parameters (block_size, min_size) of
+                the baseline, if its large files were block hashed
+            on_event: Called with every event as it is recorded, in order,
+                on the thread that reconciled the path
         """
+        options = options or WatchOptions()
         self.root_path = Path(root_path).resolve()
-        self.baseline = baseline.copy()
+        # Copied on write, so a store passed in is not duplicated up front
+        self.baseline = BaselineStore.from_mapping(baseline, algorithm)
+        self.algorithm = algorithm
+        self.block_hash = block_hash or {}
+        self.cache_mode = options.cache_mode
+        self.path_filter = path_filter if path_filter else None
         self.events: List[Event] = []
+        self.on_event = on_event
+        self.coalescer = EventCoalescer(options.quiet_window, options.max_delay)
+        self.hashes_performed = 0
+        self._lock = threading.Lock()
+        # Serializes inline reconciliation, which both the observer thread
+        # and process_pending callers may run
+        self._inline_lock = threading.Lock()
+    
+        self.pool: Optional[HashWorkerPool] = None
+        if options.hash_workers > 0:
+            self.pool = HashWorkerPool(
+                self._reconcile,
+                workers=options.hash_workers,
+                queue_size=options.queue_size,
+                backpressure=options.backpressure
+            )
+    
+    def _hash(self, path: Path) -> Optional[str]:
+        """Hash a file with the baseline's algorithm."""
+        with self._lock:
+            self.hashes_performed += 1
+        if self.block_hash:
+            return file_hash_blocks(
+                path, self.algorithm, self.block_hash['block_size'], self.block_hash['min_size'],
+                cache_mode=self.cache_mode
+            )
+        return file_hash(path, self.algorithm, cache_mode=self.cache_mode)
     
     def _get_relative_path(self, path: str) -> str:
         """Get relative path from absolute path."""
         abs_path = Path(path).resolve()
         return str(abs_path.relative_to(self.root_path))
     
-    def on_created(self, event: FileSystemEvent) -> None:
-        """Handle file creation."""
-        if event.is_directory:
+    def _queue(self, path: str) -> None:
+        """Queue a path for reconciliation with the baseline."""
+        try:
+            rel_path = self._get_relative_path(path)
+        except ValueError:
+            # Ignore files outside root
             return
         
-        try:
-            rel_path = self._get_relative_path(event.src_path)
-            new_hash = file_sha256(Path(event.src_path))
+        if self.path_filter is not None and not self.path_filter.matches(rel_path):
+            return
+        
+        self.coalescer.add(rel_path)
+        if self.coalescer.quiet_window <= 0:
+            self.process_pending()
+    
+    def process_pending(self, force: bool = False) -> int:
+        """
+        Dispatch the paths whose events have settled.
+        
+        Paths are reconciled inline, or handed to the hashing pool. Paths
+        the pool defers stay pending and are retried on the next call.
+        
+        Args:
+            force: Dispatch every pending path, blocking on full queues
+        
+        Returns:
+            Number of paths dispatched
+        """
+        due = self.coalescer.pop_due(force=force or self.coalescer.quiet_window <= 0)
+        dispatched = 0
+        for rel_path in due:
+            if self.pool is None:
+                with self._inline_lock:
+                    self._reconcile(rel_path)
+            elif not self.pool.submit(rel_path, block=True if force else None):
+                self.coalescer.requeue(rel_path)
+                continue
+            dispatched += 1
+        return dispatched
+    
+    def snapshot(self) -> Tuple[BaselineStore, List[Event]]:
+        """
+        Take a consistent copy of the baseline and the unsaved events.
+        
+        The baseline copy is a read-only snapshot sharing its data with the
+        live baseline; only the parts changed afterwards are copied.
+        
+        Returns:
+            Tuple of (baseline_snapshot, events); pass len(events) to
+            release_events once they have been persisted
+        """
+        with self._lock:
+            return self.baseline.snapshot(), list(self.events)
+    
+    def release_events(self, count: int) -> None:
+        """
+        Drop the oldest events after they have been persisted.
+        
+        Args:
+            count: Number of events returned by snapshot
+        """
+        with self._lock:
+            del self.events[:count]
+    
+    def close(self) -> None:
+        """Process everything still pending and stop the hashing threads."""
+        self.process_pending(force=True)
+        if self.pool is not None:
+            self.pool.close()
+    
+    def _reconcile(self, rel_path: str) -> None:
+        """
+        Compare the current state of a path with the baseline.
+        
+        Only the final state counts, so e.g. create, modify, delete of a new
+        file yields no event and delete followed by re-create yields MODIFIED
+        (or nothing if the content is unchanged). The file is hashed without
+        holding the lock; the pool never runs one path on two threads, and
+        inline calls are serialized by process_pending.
+        """
+        file_path = self.root_path / rel_path
+        new_hash = self._hash(file_path) if file_path.is_file() else None
+        
+        with self._lock:
+            old_hash = self.baseline.get(rel_path)
+        
+            if new_hash is None:
+                if old_hash is not None and not file_path.is_file():
+                    del self.baseline[rel_path]
+                    self._record(Event(type='DELETED', path=rel_path, old_hash=old_hash))
+                # Otherwise unreadable right now, or never known
+                return
+        
+            if new_hash == old_hash:
+                return
             
-            if new_hash is not None:
-                self.baseline[rel_path] = new_hash
-                
-                fim_event = Event(
-                    type='ADDED',
-                    path=rel_path,
-                    new_hash=new_hash
-                )
-                self.events.append(fim_event)
-        except (ValueError, OSError):
-            # Ignore files outside root or access errors
-            pass
+            event_type = 'ADDED' if old_hash is None else 'MODIFIED'
+            self.baseline[rel_path] = new_hash
+            self._record(Event(
+                type=event_type,
+                path=rel_path,
+                old_hash=old_hash,
+                new_hash=new_hash
+            ))
+    
+    def _record(self, event: Event) -> None:
+        """Keep an event and pass it on (called with the lock held)."""
+        self.events.append(event)
+        if REGISTRY.enabled:
+            WATCH_CHANGES.inc(label=event.type)
+        if self.on_event is not None:
+            self.on_event(event)
+    
+    def on_created(self, event: FileSystemEvent) -> None:
+        """Handle file creation."""
+        if not event.is_directory:
+            self._queue(event.src_path)
     
     def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification."""
-        if event.is_directory:
-            return
-        
-        try:
-            rel_path = self._get_relative_path(event.src_path)
-            new_hash = file_sha256(Path(event.src_path))
-            
-            if new_hash is not None:
-                old_hash = self.baseline.get(rel_path)
-                
-                # Only record if hash actually changed
-                if old_hash != new_hash:
-                    self.baseline[rel_path] = new_hash
-                    
-                    fim_event = Event(
-                        type='MODIFIED',
-                        path=rel_path,
-                        old_hash=old_hash,
-                        new_hash=new_hash
-                    )
-                    self.events.append(fim_event)
-        except (ValueError, OSError):
-            # Ignore files outside root or access errors
-            pass
+        if not event.is_directory:
+            self._queue(event.src_path)
     
     def on_deleted(self, event: FileSystemEvent) -> None:
         """Handle file deletion."""
-        if event.is_directory:
-            return
-        
-        try:
-            rel_path = self._get_relative_path(event.src_path)
-            old_hash = self.baseline.pop(rel_path, None)
-            
-            if old_hash is not None:
-                fim_event = Event(
-                    type='DELETED',
-                    path=rel_path,
-                    old_hash=old_hash
-                )
-                self.events.append(fim_event)
-        except ValueError:
-            # Ignore files outside root
-            pass
+        if not event.is_directory:
+            self._queue(event.src_path)
     
     def on_moved(self, event: FileSystemEvent) -> None:
         """Handle file moves (treat as delete + create)."""
-        if event.is_directory:
-            return
+        if not event.is_directory:
+            self._queue(event.src_path)
+            self._queue(event.dest_path)
+
+
+Checkpoint = Callable[[Mapping[str, str], List[Event]], None]
+
+
+def update_watch_metrics(event_handler: FIMEventHandler) -> None:
+    """
+    Copy the handler's counters and queue depth into the metrics registry.
+    
+    Events dropped are paths whose hashing failed on a pool thread; paths
+    deferred because their queue was full are counted separately, as they
+    are retried rather than lost.
+    """
+    coalescer = event_handler.coalescer
+    pool = event_handler.pool
+    WATCH_EVENTS.set(coalescer.events_received)
+    WATCH_COALESCED.set(coalescer.events_coalesced)
+    WATCH_QUEUE_DEPTH.set(len(coalescer) + (pool.depth if pool is not None else 0))
+    WATCH_QUEUE_FULL.set(pool.deferred if pool is not None else 0)
+    WATCH_DROPPED.set(pool.errors if pool is not None else 0)
+
+
+def _save_checkpoint(event_handler: FIMEventHandler, checkpoint: Checkpoint) -> bool:
+    """
+    Persist the handler's state and release the saved events.
+    
+    Events are only released once the checkpoint function returned, so a
+    failed checkpoint is retried with the same events next time. Nothing is
+    written when there are no new events.
+    
+    Returns:
+        True if the checkpoint succeeded
+    """
+    baseline, events = event_handler.snapshot()
+    if not events:
+        # The baseline only changes together with an event
+        return True
+    
+    start = time.perf_counter()
+    try:
+        checkpoint(baseline, events)
+    except Exception as e:
+        print(f"Warning: Checkpoint failed: {e}")
+        return False
+    
+    if REGISTRY.enabled:
+        CHECKPOINT_SECONDS.observe(time.perf_counter() - start)
+    event_handler.release_events(len(events))
+    return True
+
+
+def _export_metrics(export_metrics: Callable[[], None]) -> None:
+    """Export metrics, warning instead of stopping the watcher on failure."""
+    try:
+        export_metrics()
+    except OSError as e:
+        print(f"Warning: Metrics export failed: {e}")
+
+
+class WatchSession:
+    """
+    One watch of a directory: the observer, the event handler and the
+    periodic checkpoints and metrics exports, driven by the caller's loop.
+    
+    Call start(), then step() every tick seconds, then stop() once. The
+    calls may come from different threads, but not concurrently.
+    """
+    
+    def __init__(
+        self,
+        root_path: Path,
+        baseline: Mapping[str, str],
+        algorithm: str = DEFAULT_ALGORITHM,
+        options: Optional[WatchOptions] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        path_filter: Optional[PathFilter] = None,
+        block_hash: Optional[Mapping[str, int]] = None,
+        export_metrics: Optional[Callable[[], None]] = None,
+        on_event: Optional[Callable[[Event], None]] = None
+    ):
+        """
+        Initialize session; see watch_directory() for the arguments.
         
-        # Handle as deletion from old location
-        try:
-            old_rel_path = self._get_relative_path(event.src_path)
-            old_hash = self.baseline.pop(old_rel_path, None)
-            
-            if old_hash is not None:
-                fim_event = Event(
-                    type='DELETED',
-                    path=old_rel_path,
-                    old_hash=old_hash
-                )
-                self.events.append(fim_event)
-        except ValueError:
-            pass
+        Args:
+            on_event: Called with every event as it is recorded, see
+                FIMEventHandler
+        """
+        self.root_path = root_path
+        self.options = options or WatchOptions()
+        self.checkpoint = checkpoint
+        self.export_metrics = export_metrics
+        self.event_handler = FIMEventHandler(
+            root_path, baseline, algorithm, self.options, path_filter, block_hash, on_event
+        )
+        self.observer = Observer()
         
-        # Handle as creation at new location
-        try:
-            new_rel_path = self._get_relative_path(event.dest_path)
-            new_hash = file_sha256(Path(event.dest_path))
-            
-            if new_hash is not None:
-                self.baseline[new_rel_path] = new_hash
-                
-                fim_event = Event(
-                    type='ADDED',
-                    path=new_rel_path,
-                    new_hash=new_hash
-                )
-                self.events.append(fim_event)
-        except (ValueError, OSError):
-            pass
-
-
-def watch_directory(root_path: Path, baseline: Dict[str, str]) -> tuple[Dict[str, str], List[Event]]:
+        options = self.options
+        self.tick = min(1.0, options.quiet_window / 2) if options.quiet_window > 0 else 1.0
+        if checkpoint is not None and options.checkpoint_interval > 0:
+            self.tick = min(self.tick, options.checkpoint_interval)
+        if export_metrics is not None and options.metrics_interval > 0:
+            self.tick = min(self.tick, options.metrics_interval)
+        self._last_checkpoint = self._last_export = 0.0
+    
+    def start(self) -> None:
+        """Start watching."""
+        self.observer.schedule(self.event_handler, str(self.root_path), recursive=True)
+        self.observer.start()
+        self._last_checkpoint = self._last_export = time.monotonic()
+    
+    def step(self) -> None:
+        """Dispatch settled paths, and checkpoint and export metrics when due."""
+        event_handler = self.event_handler
+        options = self.options
+        event_handler.process_pending()
+        now = time.monotonic()
+        
+        if self.export_metrics is not None and options.metrics_interval > 0 \
+                and now - self._last_export >= options.metrics_interval:
+            update_watch_metrics(event_handler)
+            _export_metrics(self.export_metrics)
+            self._last_export = now
+        
+        if self.checkpoint is None:
+            return
+        
+        interval_due = (options.checkpoint_interval > 0
+                        and now - self._last_checkpoint >= options.checkpoint_interval)
+        count_due = (options.checkpoint_events > 0
+                     and len(event_handler.events) >= options.checkpoint_events)
+        if interval_due or count_due:
+            _save_checkpoint(event_handler, self.checkpoint)
+            self._last_checkpoint = now
+    
+    def stop(self) -> None:
+        """Stop watching, process what is pending and checkpoint one last time."""
+        self.observer.stop()
+        self.observer.join()
+        self.event_handler.close()
+        if self.checkpoint is not None:
+            _save_checkpoint(self.event_handler, self.checkpoint)
+        if REGISTRY.enabled:
+            update_watch_metrics(self.event_handler)
+        if self.export_metrics is not None:
+            _export_metrics(self.export_metrics)
+
+
+def watch_directory(
+    root_path: Path,
+    baseline: Mapping[str, str],
+    algorithm: str = DEFAULT_ALGORITHM,
+    options: Optional[WatchOptions] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    path_filter: Optional[PathFilter] = None,
+    block_hash: Optional[Mapping[str, int]] = None,
+    export_metrics: Optional[Callable[[], None]] = None
+) -> tuple[BaselineStore, List[Event]]:
     """
     Watch directory for changes and return updated baseline and events.
     
+    If a checkpoint function is given it is called with a snapshot of the
+    baseline and the events detected since the previous checkpoint, every
+    options.checkpoint_interval seconds, whenever options.checkpoint_events
+    events are unsaved, and once more on shutdown. Saved events are released
+    from memory, so only events not yet checkpointed are returned.
+    
+    If an export_metrics function is given, the metrics registry is updated
+    and the function called every options.metrics_interval seconds and once
+    more on shutdown, e.g. to write a Prometheus text file. Without one, the
+    watcher counters are still copied into an enabled registry on shutdown.
+    
     Args:
         root_path: Directory to watch
         baseline: Initial baseline
+        algorithm: Hash algorithm the baseline was built with
+        options: Coalescing, hashing and checkpoint options
+        checkpoint: Function persisting (baseline, new_events)
+        path_filter: Include/exclude patterns
+        block_hash: Block hashing parameters of the baseline, if any
+        export_metrics: Function exporting the metrics registry
         
     Returns:
         Tuple of (updated_baseline, events_list)
     """
-    event_handler = FIMEventHandler(root_path, baseline)
-    observer = Observer()
-    observer.schedule(event_handler, str(root_path), recursive=True)
-    
-    observer.start()
+    session = WatchSession(
+        root_path, baseline, algorithm, options, checkpoint, path_filter, block_hash,
+        export_metrics
+    )
+    session.start()
     
     try:
         print(f"Watching {root_path} for changes. Press Ctrl+C to stop...")
         while True:
-            time.sleep(1)
+            time.sleep(session.tick)
+            session.step()
     except KeyboardInterrupt:
         print("\nStopping watcher...")
     finally:
-        observer.stop()
-        observer.join()
+        session.stop()
+    
+    event_handler = session.event_handler
+    coalescer = event_handler.coalescer
+    print(f"Received {coalescer.events_received} file system events "
+          f"({coalescer.events_coalesced} coalesced), "
+          f"performed {event_handler.hashes_performed} hashes")
+    if event_handler.pool is not None and event_handler.pool.deferred:
+        print(f"Hashing queues were full {event_handler.pool.deferred} times")
     
     return event_handler.baseline, event_handler.events
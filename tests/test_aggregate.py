@@ -0,0 +1,111 @@
+"""Tests for aggregate module."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim.aggregate import (
+    EventStats, aggregate_events, aggregate_file, load_stats, save_stats
+)
+from fim.journal import EventJournal, journal_segments
+from fim.models import Event
+
+
+def _event(event_type: str, path: str, timestamp: str) -> Event:
+    return Event(type=event_type, path=path, new_hash="hash", timestamp=timestamp)
+
+
+EVENTS = [
+    _event("ADDED", os.path.join("etc", "hosts"), "2025-01-15T10:05:00"),
+    _event("MODIFIED", os.path.join("etc", "hosts"), "2025-01-15T10:45:00"),
+    _event("MODIFIED", os.path.join("etc", "ssh", "sshd_config"), "2025-01-15T11:00:00"),
+    _event("DELETED", "README", "2025-01-16T09:00:00"),
+]
+
+
+class TestEventStats:
+    """Test cases for single-pass event statistics."""
+
+    def test_counts_and_histograms(self):
+        """Test type counts and hourly/daily histograms."""
+        stats = aggregate_events(EVENTS)
+
+        assert stats.total == 4
+        assert stats.type_counts == {"ADDED": 1, "MODIFIED": 2, "DELETED": 1}
+        assert stats.histogram("day") == [("2025-01-15", 3), ("2025-01-16", 1)]
+        assert stats.histogram("hour") == [
+            ("2025-01-15T10", 2), ("2025-01-15T11", 1), ("2025-01-16T09", 1)
+        ]
+        assert stats.first_timestamp == "2025-01-15T10:05:00"
+        assert stats.last_timestamp == "2025-01-16T09:00:00"
+
+        with pytest.raises(ValueError):
+            stats.histogram("minute")
+
+    def test_top_paths_and_directories(self):
+        """Test top-N files and per-directory rollups."""
+        stats = aggregate_events(EVENTS)
+
+        assert stats.top_paths(1) == [(os.path.join("etc", "hosts"), 2)]
+        assert dict(stats.top_directories()) == {
+            "etc": 2, os.path.join("etc", "ssh"): 1, ".": 1
+        }
+        assert dict(stats.top_directories(depth=1)) == {"etc": 3, ".": 1}
+        assert dict(stats.top_directories(depth=0)) == {".": 4}
+
+    def test_merge_matches_single_pass(self):
+        """Test that merged partial statistics equal one pass over all events."""
+        merged = aggregate_events(EVENTS[:2]).merge(aggregate_events(EVENTS[2:]))
+
+        assert merged.to_dict() == aggregate_events(EVENTS).to_dict()
+        assert EventStats().merge(EventStats()).first_timestamp is None
+
+    def test_save_and_load(self):
+        """Test that pre-aggregated statistics round-trip."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "summary.json"
+            stats = aggregate_events(EVENTS)
+
+            save_stats(stats, path)
+
+            assert load_stats(path).to_dict() == stats.to_dict()
+
+    def test_load_rejects_other_files(self):
+        """Test that files without statistics are rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.json"
+            path.write_text('{"events": []}')
+
+            with pytest.raises(ValueError):
+                load_stats(path)
+
+    def test_aggregate_journal_caches_rotated_segments(self):
+        """Test that rotated segments are aggregated once and then cached."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            with EventJournal(path) as journal:
+                journal.extend(EVENTS[:3])
+                journal.rotate()
+                journal.extend(EVENTS[3:])
+
+            rotated = journal_segments(path)[0]
+            expected = aggregate_events(EVENTS).to_dict()
+
+            assert aggregate_file(path).to_dict() == expected
+            cache = rotated.with_name(rotated.name + ".stats")
+            assert cache.exists()
+
+            # The cache is used instead of the segment while it is current
+            data = json.loads(cache.read_text())
+            data["stats"]["total"] = 100
+            cache.write_text(json.dumps(data))
+            assert aggregate_file(path).total == 101
+            assert aggregate_file(path, cache=False).total == 4
+
+            # A changed segment invalidates the cache
+            with open(rotated, "a", encoding="utf-8") as f:
+                f.write("\n")
+            assert aggregate_file(path).total == 4
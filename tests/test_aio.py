@@ -0,0 +1,128 @@
+"""Tests for aio module."""
+
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from fim import aio
+from fim.baseline import scan_baseline
+from fim.hasher import file_sha256
+from fim.models import ScanOptions, WatchOptions
+from fim.scanner import ScanCancelled
+
+
+@pytest.fixture
+def tree():
+    """A small tree of files with distinct contents."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        for i in range(60):
+            subdir = root / f"dir{i % 3}"
+            subdir.mkdir(exist_ok=True)
+            (subdir / f"file{i}.txt").write_text(f"content {i}" * (i + 1))
+        yield root
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestScan:
+    """Test cases for async scanning and verification."""
+    
+    def test_scan_matches_sync(self, tree):
+        """Test that the async scan yields the hashes of the sync one."""
+        expected = dict(scan_baseline(tree).hashes)
+        
+        results = asyncio.run(_collect(aio.scan(tree, ScanOptions(workers=4))))
+        data = asyncio.run(aio.scan_baseline(tree))
+        
+        assert dict(results) == expected
+        assert dict(data.hashes) == expected
+    
+    def test_verify(self, tree):
+        """Test that differences are streamed."""
+        data = scan_baseline(tree)
+        (tree / 'dir0' / 'file0.txt').write_text('changed')
+        
+        results = asyncio.run(_collect(aio.verify(tree, data, ScanOptions(workers=2))))
+        
+        assert [(result.status, result.path) for result in results] == [
+            ('MODIFIED', str(Path('dir0') / 'file0.txt'))
+        ]
+    
+    def test_hash_file(self, tree):
+        """Test that files are hashed on an executor thread."""
+        path = tree / 'dir1' / 'file1.txt'
+        assert asyncio.run(aio.hash_file(path)) == file_sha256(path)
+    
+    def test_early_exit_stops_scan(self, tree, monkeypatch):
+        """Test that leaving the loop early stops the scan before it finishes."""
+        monkeypatch.setattr(aio, 'STREAM_BUFFER_SIZE', 1)
+        finished = threading.Event()
+        original = aio._baseline.scan_baseline
+        
+        def tracking_scan(*args, **kwargs):
+            original(*args, **kwargs)
+            finished.set()
+        
+        monkeypatch.setattr(aio._baseline, 'scan_baseline', tracking_scan)
+        
+        async def first():
+            async for item in aio.scan(tree):
+                return item
+        
+        assert asyncio.run(first()) is not None
+        assert not finished.is_set()
+    
+    def test_cancel_scan(self, tree):
+        """Test that cancelling the consuming task cancels the scan."""
+        async def main():
+            started = asyncio.Event()
+            
+            async def consume():
+                async for _ in aio.scan(tree):
+                    started.set()
+                    await asyncio.sleep(10)
+            
+            task = asyncio.create_task(consume())
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        asyncio.run(main())
+    
+    def test_cancel_event(self, tree):
+        """Test that a set cancel event stops the sync scan."""
+        cancel = threading.Event()
+        cancel.set()
+        with pytest.raises(ScanCancelled):
+            scan_baseline(tree, cancel=cancel)
+
+
+class TestAsyncWatcher:
+    """Test cases for the async watcher."""
+    
+    def test_events_are_queued(self, tree):
+        """Test that changes are yielded as events and end on stop()."""
+        data = scan_baseline(tree)
+        
+        async def main():
+            async with aio.AsyncWatcher(tree, data.hashes, options=WatchOptions()) as watcher:
+                await asyncio.sleep(0.2)
+                (tree / 'new.txt').write_text('new')
+                event = await asyncio.wait_for(watcher.__anext__(), timeout=10)
+            rest = [event async for event in watcher]
+            return event, rest, watcher
+        
+        event, rest, watcher = asyncio.run(main())
+        
+        assert (event.type, event.path) == ('ADDED', 'new.txt')
+        assert all(other.path == 'new.txt' for other in rest)
+        assert watcher.baseline['new.txt'] == file_sha256(tree / 'new.txt')
+        # Queued events are not kept a second time without a checkpoint
+        assert watcher._session.event_handler.events == []
@@ -5,7 +5,13 @@ import json
 from pathlib import Path
 import pytest
 
-from fim.baseline import build_baseline, save_baseline, load_baseline
+from fim.baseline import (
+    build_baseline, load_baseline, load_baseline_data, needs_full_rehash,
+    record_run, save_baseline, save_baseline_data, scan_baseline,
+)
+from fim.hasher import file_hash, file_sha256
+from fim.models import BaselineData, ScanOptions
+from fim.walker import stat_fingerprint
 
 
 class TestBaseline:
@@ -167,3 +173,99 @@ class TestBaseline:
                     unreadable_file.chmod(0o644)  # Restore permissions for cleanup
                 except (OSError, PermissionError):
                     pass
+
+    def test_scan_baseline_records_stat_fingerprints(self):
+        """Test that scanning records a stat fingerprint per file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "file1.txt").write_text("content1")
+            
+            data = scan_baseline(temp_path)
+            
+            st = (temp_path / "file1.txt").stat()
+            assert set(data.stats) == set(data.hashes)
+            assert data.stats["file1.txt"] == stat_fingerprint(st)
+    
+    def test_scan_baseline_trust_stat_skips_unchanged(self):
+        """Test that trust-stat reuses hashes of files with unchanged fingerprints."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "same.txt").write_text("same")
+            (temp_path / "changed.txt").write_text("before")
+            
+            data = scan_baseline(temp_path)
+            
+            # A fake hash survives only if the file is not read again
+            previous = scan_baseline(temp_path)
+            previous.hashes = {"same.txt": "f" * 64, "changed.txt": "f" * 64}
+            (temp_path / "changed.txt").write_text("after, and longer")
+            
+            rescanned = scan_baseline(temp_path, ScanOptions(trust_stat=True), previous)
+            
+            assert rescanned.hashes["same.txt"] == "f" * 64
+            assert rescanned.hashes["changed.txt"] == file_sha256(temp_path / "changed.txt")
+            
+            # Without trust-stat every file is hashed again
+            full = scan_baseline(temp_path, ScanOptions(), previous)
+            assert full.hashes["same.txt"] == data.hashes["same.txt"]
+    
+            # Hashes from a different algorithm are never reused
+            options = ScanOptions(trust_stat=True, algorithm="blake2b")
+            other = scan_baseline(temp_path, options, previous)
+            assert other.hashes["same.txt"] == file_hash(temp_path / "same.txt", "blake2b")
+    
+    def test_save_and_load_baseline_data(self):
+        """Test that the header, stats and checksums round-trip through the file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            baseline_path = Path(temp_dir) / "baseline.json"
+            data = BaselineData(
+                hashes={"a.txt": "hash"},
+                stats={"a.txt": [1, 2, 3, 4, 5]},
+                checksums={"a.txt": "0000abcd"},
+                header={"algorithm": "blake2b"}
+            )
+            save_baseline_data(data, baseline_path)
+            
+            loaded = load_baseline_data(baseline_path)
+            assert loaded == data
+            assert loaded.algorithm == "blake2b"
+            assert load_baseline(baseline_path) == {"a.txt": "hash"}
+    
+    def test_load_baseline_data_without_header(self):
+        """Test that baselines without a header are treated as SHA256."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            baseline_path = Path(temp_dir) / "baseline.json"
+            baseline_path.write_text(json.dumps({"baseline": {"a.txt": "hash"}}))
+            
+            data = load_baseline_data(baseline_path)
+            assert data.algorithm == "sha256"
+            assert data.stats == {}
+    
+    def test_scan_baseline_algorithm_and_precheck(self):
+        """Test that the algorithm is recorded and checksums come from the same read."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "file1.txt").write_text("hello world")
+            
+            options = ScanOptions(algorithm="blake2s", precheck=True, workers=2)
+            data = scan_baseline(temp_path, options)
+            
+            assert data.algorithm == "blake2s"
+            assert data.hashes["file1.txt"] == file_hash(temp_path / "file1.txt", "blake2s")
+            assert data.checksums["file1.txt"] == "0d4a1185"
+    
+    def test_full_rehash_every_n_runs(self):
+        """Test that a full rehash is forced every N trust-stat runs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            baseline_path = Path(temp_dir) / "baseline.json"
+            options = ScanOptions(trust_stat=True, full_rehash_every=3)
+            
+            decisions = []
+            for _ in range(6):
+                full = needs_full_rehash(baseline_path, options)
+                decisions.append(full)
+                record_run(baseline_path, full)
+            
+            assert decisions == [False, False, True, False, False, True]
+            assert needs_full_rehash(baseline_path, ScanOptions())
+            assert not needs_full_rehash(baseline_path, ScanOptions(trust_stat=True))
@@ -0,0 +1,125 @@
+"""Tests for baseline_store module."""
+
+import hashlib
+import os
+
+import pytest
+
+from fim.baseline_store import PAGE_ENTRIES, BaselineStore
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _paths(count: int) -> dict:
+    return {
+        os.path.join(f"dir{i % 7}", "sub", f"file{i}.txt") if i % 3 else f"top{i}.txt": _digest(str(i))
+        for i in range(count)
+    }
+
+
+class TestBaselineStore:
+    """Test cases for the compact baseline store."""
+
+    def test_mapping_interface(self):
+        """Test that the store behaves like the dictionary it replaces."""
+        expected = _paths(100)
+        store = BaselineStore(expected)
+
+        assert len(store) == 100
+        assert store == expected
+        assert dict(store.items()) == expected
+        assert sorted(store) == sorted(expected)
+        for rel_path, digest in expected.items():
+            assert rel_path in store
+            assert store[rel_path] == digest
+
+        assert "missing.txt" not in store
+        assert os.path.join("dir1", "missing.txt") not in store
+        assert store.get(os.path.join("nowhere", "file")) is None
+        with pytest.raises(KeyError):
+            store["missing.txt"]
+
+    def test_update_and_delete(self):
+        """Test that slots are overwritten, freed and reused."""
+        store = BaselineStore(_paths(10))
+        path = os.path.join("dir1", "sub", "file1.txt")
+
+        store[path] = _digest("changed")
+        assert store[path] == _digest("changed")
+        assert len(store) == 10
+
+        del store[path]
+        assert path not in store
+        assert len(store) == 9
+        with pytest.raises(KeyError):
+            del store[path]
+
+        store["new.txt"] = _digest("new")
+        assert store["new.txt"] == _digest("new")
+        assert len(store) == 10
+
+    @pytest.mark.parametrize("value", ["hash1", "AB" * 32, "ab" * 16, ""])
+    def test_other_values_kept(self, value):
+        """Test that values that aren't digests of the algorithm are kept as given."""
+        store = BaselineStore({"a.txt": _digest("a")})
+
+        store["a.txt"] = value
+        assert store["a.txt"] == value
+        assert len(store) == 1
+
+        store["a.txt"] = _digest("b")
+        assert store["a.txt"] == _digest("b")
+        assert dict(store) == {"a.txt": _digest("b")}
+
+        del store["a.txt"]
+        assert len(store) == 0
+
+    def test_unusual_paths(self):
+        """Test that paths with empty components round-trip exactly."""
+        paths = [os.sep + "abs", "dir" + os.sep + os.sep + "x", "dir" + os.sep + "x", "x"]
+        store = BaselineStore({path: _digest(path) for path in paths})
+
+        assert sorted(store) == sorted(paths)
+        assert all(store[path] == _digest(path) for path in paths)
+
+    def test_snapshot_is_isolated(self):
+        """Test that snapshots keep their contents while the store changes."""
+        expected = _paths(PAGE_ENTRIES + 10)
+        store = BaselineStore(expected)
+        snapshot = store.snapshot()
+
+        changed = os.path.join("dir2", "sub", "file2.txt")
+        store[changed] = _digest("changed")
+        store[os.path.join("new", "dir", "file")] = _digest("new")
+        del store["top0.txt"]
+
+        assert snapshot == expected
+        assert snapshot[changed] == expected[changed]
+        assert len(store) == len(expected)
+        assert store[changed] == _digest("changed")
+
+        with pytest.raises(TypeError):
+            snapshot["x"] = _digest("x")
+
+    def test_copy_shares_unchanged_pages(self):
+        """Test that copies only duplicate the pages they change."""
+        store = BaselineStore(_paths(3 * PAGE_ENTRIES))
+        copy = store.copy()
+
+        copy["top0.txt"] = _digest("changed")
+
+        assert store["top0.txt"] == _digest("0")
+        assert copy["top0.txt"] == _digest("changed")
+        assert copy._pages[0] is not store._pages[0]
+        assert copy._pages[1] is store._pages[1]
+
+    def test_from_mapping(self):
+        """Test building from other mappings and algorithms."""
+        store = BaselineStore({"a": hashlib.sha512(b"a").hexdigest()}, "sha512")
+
+        assert store.digest_size == 64
+        assert BaselineStore.from_mapping(store, "sha512") == store
+        assert BaselineStore.from_mapping(store, "sha512") is not store
+        assert BaselineStore.from_mapping(store, "sha256") == store
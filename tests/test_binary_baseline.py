@@ -0,0 +1,129 @@
+"""Tests for binary_baseline module."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim.baseline import (
+    convert_baseline, load_baseline, load_baseline_data, save_baseline_data, scan_baseline,
+)
+from fim.binary_baseline import BinaryBaseline, is_binary_baseline
+from fim.models import BaselineData, ScanOptions
+from fim.verifier import verify_tree
+
+
+class TestBinaryBaseline:
+    """Test cases for the compact binary baseline format."""
+    
+    def _make_data(self) -> BaselineData:
+        """Create baseline data with paths that sort differently as bytes."""
+        hashes = {
+            "b.txt": "11" * 32,
+            "a/z.txt": "22" * 32,
+            "a.txt": "33" * 32,
+            "dir/café.txt": "44" * 32,
+        }
+        return BaselineData(
+            hashes=hashes,
+            stats={"b.txt": [1, 2, 3, -4, 5]},
+            checksums={"a.txt": "0d4a1185"},
+            fingerprints={"a/z.txt": "55" * 32},
+            blocks={"b.txt": ["66" * 32, "77" * 32], "dir/café.txt": ["88" * 32]},
+            header={"algorithm": "sha256"}
+        )
+    
+    def test_save_and_load_round_trip(self):
+        """Test that all sections round-trip through the binary format."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "baseline.fimb"
+            data = self._make_data()
+            save_baseline_data(data, path)
+            
+            assert is_binary_baseline(path)
+            loaded = load_baseline_data(path)
+            
+            assert loaded.algorithm == "sha256"
+            assert dict(loaded.hashes) == data.hashes
+            assert dict(loaded.stats) == data.stats
+            assert dict(loaded.checksums) == data.checksums
+            assert dict(loaded.fingerprints) == data.fingerprints
+            assert dict(loaded.blocks) == data.blocks
+            assert load_baseline(path) == data.hashes
+            loaded.hashes.close()
+    
+    def test_binary_search_lookup(self):
+        """Test lookups of present and absent paths."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "baseline.fimb"
+            save_baseline_data(self._make_data(), path)
+            
+            with BinaryBaseline(path) as baseline:
+                assert len(baseline) == 4
+                assert list(baseline) == sorted(baseline, key=lambda p: p.encode())
+                assert baseline["a/z.txt"] == "22" * 32
+                assert "dir/café.txt" in baseline
+                assert "missing.txt" not in baseline
+                assert baseline.get("zzz") is None
+                assert baseline.stats.get("a.txt") is None
+                with pytest.raises(KeyError):
+                    baseline["missing.txt"]
+    
+    def test_column_truthiness_does_not_count(self, monkeypatch):
+        """Test that testing a column stops at its first entry and caches its length."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "baseline.fimb"
+            data = self._make_data()
+            data.checksums = {}
+            save_baseline_data(data, path)
+            
+            with BinaryBaseline(path) as baseline:
+                reads = []
+                original = baseline.blocks_at
+                
+                def counting_blocks_at(index):
+                    reads.append(index)
+                    return original(index)
+                
+                monkeypatch.setattr(baseline.blocks, '_getter', counting_blocks_at)
+                assert baseline.blocks
+                assert len(reads) < len(baseline)
+                assert not baseline.checksums
+                assert len(baseline.checksums) == 0
+                
+                assert len(baseline.blocks) == 2
+                reads.clear()
+                assert len(baseline.blocks) == 2
+                assert reads == []
+    
+    def test_convert_json_to_binary_and_back(self):
+        """Test converting a scanned baseline to binary and back to JSON."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            tree = temp_path / "tree"
+            tree.mkdir()
+            (tree / "file1.txt").write_text("content1")
+            (tree / "file2.txt").write_text("content2")
+            
+            data = scan_baseline(tree, ScanOptions(algorithm="sha512", precheck=True))
+            save_baseline_data(data, temp_path / "baseline.json")
+            
+            convert_baseline(temp_path / "baseline.json", temp_path / "baseline.fimb")
+            convert_baseline(temp_path / "baseline.fimb", temp_path / "again.json")
+            
+            assert load_baseline_data(temp_path / "again.json") == data
+            
+            binary = load_baseline_data(temp_path / "baseline.fimb")
+            assert binary.algorithm == "sha512"
+            assert list(verify_tree(tree, binary)) == []
+    
+    def test_invalid_digest_rejected(self):
+        """Test that hashes which are not digests of the algorithm are rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "baseline.fimb"
+            
+            with pytest.raises(ValueError):
+                save_baseline_data(BaselineData(hashes={"a.txt": "hash1"}), path)
+            
+            assert not path.exists()
+            assert list(Path(temp_dir).iterdir()) == []
@@ -0,0 +1,114 @@
+"""Tests for cli module."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim import cli, storage
+from fim.baseline import save_baseline_data, scan_baseline
+from fim.models import Event
+from fim.storage import load_events, pending_events_path, save_events
+
+
+def _events(count: int, prefix: str) -> list:
+    """Create a list of distinct events."""
+    return [
+        Event(type="ADDED", path=f"{prefix}{i}.txt", new_hash=f"hash{i}",
+              timestamp="2025-01-15T10:30:00")
+        for i in range(count)
+    ]
+
+
+class TestRootValidation:
+    """Test cases for checking the root path before anything else."""
+    
+    @pytest.mark.parametrize("command", ["init", "verify"])
+    def test_missing_root_reported_first(self, command, capsys, monkeypatch):
+        """Test that a missing root is reported before option errors."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp = Path(temp_dir)
+            baseline_path = temp / "baseline.json"
+            save_baseline_data(scan_baseline(temp), baseline_path)
+            monkeypatch.setattr(sys, 'argv', [
+                'fim', command, '--path', str(temp / "missing"),
+                '--baseline', str(baseline_path), '--workers', '-1',
+            ])
+            
+            with pytest.raises(SystemExit):
+                cli.main()
+            
+            assert "does not exist" in capsys.readouterr().out
+
+
+class TestWatchCommand:
+    """Test cases for fim watch checkpoints."""
+    
+    def test_checkpoints_append_without_reading_events(self, monkeypatch):
+        """Test that checkpoints of a JSON events file don't reload its history."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp = Path(temp_dir)
+            root = temp / "root"
+            root.mkdir()
+            (root / "file.txt").write_text("data")
+            baseline_path = temp / "baseline.json"
+            events_path = temp / "events.json"
+            save_baseline_data(scan_baseline(root), baseline_path)
+            history = _events(3, "old")
+            save_events(history, events_path)
+            new = [_events(2, "a"), _events(1, "b")]
+            
+            loads = []
+            original_load_json = storage.load_json
+            
+            def counting_load_json(path):
+                loads.append(Path(path))
+                return original_load_json(path)
+            
+            def fake_watch(root_path, baseline, algorithm, options, checkpoint, *args):
+                before = len(loads)
+                for events in new:
+                    checkpoint(baseline, events)
+                assert events_path not in loads[before:]
+                assert load_events(events_path) == history
+                assert load_events(pending_events_path(events_path)) == new[0] + new[1]
+            
+            monkeypatch.setattr(storage, 'load_json', counting_load_json)
+            monkeypatch.setattr(cli, 'watch_directory', fake_watch)
+            monkeypatch.setattr(sys, 'argv', [
+                'fim', 'watch', '--path', str(root), '--baseline', str(baseline_path),
+                '--events', str(events_path),
+            ])
+            
+            cli.main()
+            
+            assert load_events(events_path) == history + new[0] + new[1]
+            assert not pending_events_path(events_path).exists()
+    
+    def test_pending_events_merged_after_crash(self, monkeypatch):
+        """Test that events left pending by a crash are merged on the next start."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp = Path(temp_dir)
+            root = temp / "root"
+            root.mkdir()
+            baseline_path = temp / "baseline.json"
+            events_path = temp / "events.json"
+            save_baseline_data(scan_baseline(root), baseline_path)
+            pending = _events(2, "pending")
+            with cli.EventJournal(pending_events_path(events_path)) as journal:
+                journal.extend(pending)
+            
+            def fake_watch(*args):
+                assert load_events(events_path) == pending
+            
+            monkeypatch.setattr(cli, 'watch_directory', fake_watch)
+            monkeypatch.setattr(sys, 'argv', [
+                'fim', 'watch', '--path', str(root), '--baseline', str(baseline_path),
+                '--events', str(events_path),
+            ])
+            
+            cli.main()
+            
+            assert load_events(events_path) == pending
+            assert not pending_events_path(events_path).exists()
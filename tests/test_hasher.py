@@ -1,10 +1,12 @@
 """Tests for hasher module."""
 
+import hashlib
 import tempfile
 from pathlib import Path
 import pytest
 
-from fim.hasher import file_sha256
+from fim import hasher
+from fim.hasher import file_digests, file_hash, file_sha256
 
 
 class TestFileHasher:
@@ -93,3 +95,123 @@ class TestFileHasher:
             dir_path = Path(temp_dir)
             hash_value = file_sha256(dir_path)
             assert hash_value is None
+
+    def test_file_sha256_mmap_matches_read(self, monkeypatch):
+        """Test that the mmap path produces the same hash as reading."""
+        monkeypatch.setattr(hasher, "MMAP_MIN_SIZE", 1024)
+        
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(bytes(range(256)) * 64)
+            temp_path = Path(f.name)
+        
+        try:
+            expected = file_sha256(temp_path)
+            assert file_sha256(temp_path, use_mmap=True) == expected
+            assert file_sha256(temp_path, chunk_size=100) == expected
+        finally:
+            temp_path.unlink()
+    
+    def test_choose_chunk_size(self):
+        """Test that small files are read in one call and large ones in chunks."""
+        assert hasher.choose_chunk_size(0) == 1
+        assert hasher.choose_chunk_size(1000) == 1001
+        assert hasher.choose_chunk_size(100 * 1024 * 1024) == hasher.MAX_CHUNK_SIZE
+
+    def test_file_hash_algorithms(self):
+        """Test that every supported algorithm matches hashlib."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            f.write("hello world")
+            temp_path = Path(f.name)
+        
+        try:
+            for algorithm in hasher.ALGORITHMS:
+                expected = hashlib.new(algorithm, b"hello world").hexdigest()
+                assert file_hash(temp_path, algorithm) == expected
+            
+            assert file_hash(temp_path, hasher.CHECKSUM_ALGORITHM) == "0d4a1185"
+            assert file_digests(temp_path, ("sha256", "crc32")) == [
+                "b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9",
+                "0d4a1185",
+            ]
+            
+            with pytest.raises(ValueError):
+                file_hash(temp_path, "md4")
+        finally:
+            temp_path.unlink()
+    
+    def test_sample_offsets(self):
+        """Test that small files are read whole and large ones sampled."""
+        assert hasher.sample_offsets(0, 2, 100) == []
+        assert hasher.sample_offsets(400, 2, 100) == [0, 100, 200, 300]
+        
+        offsets = hasher.sample_offsets(10 * 1024 * 1024, 4, 4096)
+        assert len(offsets) == 6
+        assert offsets[0] == 0 and offsets[-1] == 10 * 1024 * 1024 - 4096
+        assert offsets == sorted(offsets)
+        assert all(offset % 4096 == 0 for offset in offsets)
+    
+    def test_file_fingerprint(self):
+        """Test that fingerprints see sampled blocks and size but not unsampled ranges."""
+        block_size = 4096
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(bytes(range(256)) * 4096)
+            temp_path = Path(f.name)
+        
+        try:
+            fingerprint = hasher.file_fingerprint(temp_path, samples=4, block_size=block_size)
+            assert fingerprint is not None
+            assert fingerprint != file_sha256(temp_path)
+            
+            offsets = hasher.sample_offsets(temp_path.stat().st_size, 4, block_size)
+            unsampled = offsets[1] + block_size
+            with open(temp_path, 'r+b') as f:
+                f.seek(unsampled)
+                f.write(b'x')
+            assert hasher.file_fingerprint(temp_path, samples=4, block_size=block_size) == fingerprint
+            
+            with open(temp_path, 'r+b') as f:
+                f.seek(offsets[2] + 10)
+                f.write(b'x')
+            assert hasher.file_fingerprint(temp_path, samples=4, block_size=block_size) != fingerprint
+            
+            assert hasher.file_fingerprint(temp_path.with_name("missing")) is None
+        finally:
+            temp_path.unlink()
+    
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_file_block_digests(self, workers):
+        """Test that blocks hashed in parallel combine to the same root as serially."""
+        block_size = 64 * 1024
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(bytes(range(256)) * 1000)
+            temp_path = Path(f.name)
+        
+        try:
+            data = temp_path.read_bytes()
+            root, blocks = hasher.file_block_digests(temp_path, 'sha256', block_size, workers)
+            
+            assert len(blocks) == 4
+            assert blocks[3] == hashlib.sha256(data[3 * block_size:]).hexdigest()
+            assert root == hasher.block_root(
+                [bytes.fromhex(digest) for digest in blocks], len(data), block_size, 'sha256'
+            )
+            assert root != file_sha256(temp_path)
+            assert hasher.file_block_digests(temp_path, 'sha256', block_size, 1)[0] == root
+            
+            assert hasher.file_hash_blocks(temp_path, 'sha256', block_size, len(data)) == root
+            assert hasher.file_hash_blocks(temp_path, 'sha256', block_size, len(data) + 1) \
+                == file_sha256(temp_path)
+            assert hasher.file_block_digests(temp_path.with_name("missing")) is None
+        finally:
+            temp_path.unlink()
+    
+    def test_changed_ranges(self):
+        """Test that differing blocks are merged into byte ranges."""
+        old = ["a", "b", "c", "d", "e"]
+        
+        assert hasher.changed_ranges(old, old, 10, 45) == []
+        assert hasher.changed_ranges(old, ["a", "x", "x", "d", "x"], 10, 45) == [(10, 30), (40, 45)]
+        # Truncated to 25 bytes: the rest of block 2 and blocks 3-4 are gone
+        assert hasher.changed_ranges(old, ["a", "b", "x"], 10, 25) == [(20, 50)]
+        assert hasher.changed_ranges(old[:2], old[:2] + ["x"], 10, 21) == [(20, 21)]
+
@@ -0,0 +1,122 @@
+"""Tests for journal module."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim.journal import EventJournal, iter_journal, journal_segments, save_journal
+from fim.models import Event
+from fim.storage import iter_events, load_events
+
+
+class TestJournal:
+    """Test cases for the append-only event journal."""
+    
+    def _events(self, count: int, prefix: str = "file") -> list:
+        """Create a list of distinct events."""
+        return [
+            Event(type="ADDED", path=f"{prefix}{i}.txt", new_hash=f"hash{i}",
+                  timestamp="2025-01-15T10:30:00")
+            for i in range(count)
+        ]
+    
+    def test_append_and_stream(self):
+        """Test that appended events are streamed back in order across opens."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            first, second = self._events(3, "a"), self._events(2, "b")
+            
+            with EventJournal(path, fsync='always') as journal:
+                assert journal.extend(first) == 3
+            with EventJournal(path, fsync='never') as journal:
+                for event in second:
+                    journal.append(event)
+            
+            assert list(iter_journal(path)) == first + second
+            assert load_events(path) == first + second
+            assert list(iter_events(path)) == first + second
+    
+    def test_rotation_by_size(self):
+        """Test that segments rotate by size and are read oldest first."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            events = self._events(10)
+            
+            with EventJournal(path, max_bytes=200) as journal:
+                for event in events:
+                    journal.append(event)
+            
+            segments = journal_segments(path)
+            assert len(segments) > 2
+            assert segments[0].name == "events.000001.jsonl"
+            assert list(iter_journal(path)) == events
+    
+    def test_rotation_by_age(self):
+        """Test that a segment older than max_age is rotated on the next append."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            
+            with EventJournal(path, max_age=0) as journal:
+                journal.extend(self._events(2))
+            
+            assert [segment.name for segment in journal_segments(path)] == ["events.000001.jsonl"]
+            assert len(list(iter_journal(path))) == 2
+    
+    def test_torn_final_line_is_skipped(self):
+        """Test that a partial line left by a crash is ignored."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            with EventJournal(path) as journal:
+                journal.extend(self._events(2))
+            
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('{"type": "ADDED", "pa')
+            
+            assert len(list(iter_journal(path))) == 2
+    
+    def test_append_after_torn_final_line(self):
+        """Test that appending after a crash drops the partial line instead of extending it."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            first, second = self._events(2, "a"), self._events(2, "b")
+            with EventJournal(path) as journal:
+                journal.extend(first)
+            
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('{"type": "ADDED", "pa')
+            
+            with EventJournal(path) as journal:
+                journal.extend(second)
+            
+            assert list(iter_journal(path)) == first + second
+    
+    def test_append_after_torn_only_line(self):
+        """Test that a segment holding only a partial line is emptied before appending."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            path.write_text('{"type": "ADDED", "pa', encoding='utf-8')
+            events = self._events(1)
+            
+            with EventJournal(path) as journal:
+                journal.extend(events)
+            
+            assert list(iter_journal(path)) == events
+    
+    def test_invalid_fsync_policy(self):
+        """Test that unknown fsync policies are rejected."""
+        with pytest.raises(ValueError):
+            EventJournal(Path("events.jsonl"), fsync="sometimes")
+    
+    def test_save_journal_replaces_file(self):
+        """Test that saved journals replace existing contents and stream from iterators."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "events.jsonl"
+            with EventJournal(path) as journal:
+                journal.extend(self._events(5, "old"))
+            
+            events = self._events(3)
+            assert save_journal(iter(events), path) == 3
+            
+            assert list(iter_journal(path)) == events
+            assert not path.with_name(path.name + ".tmp").exists()
@@ -0,0 +1,125 @@
+"""Tests for layout module."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim.baseline import scan_baseline
+from fim.layout import LARGE_FILE_SIZE, SCAN_ORDERS, interleave, order_files, physical_offset
+from fim.models import ScanOptions
+from fim.verifier import verify_tree
+from fim.walker import iter_files
+
+
+@pytest.fixture
+def tree():
+    """A tree of small files with a few large ones among them."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        for i in range(40):
+            subdir = root / f"dir{i % 4}"
+            subdir.mkdir(exist_ok=True)
+            size = LARGE_FILE_SIZE if i % 10 == 0 else 100 * (i + 1)
+            (subdir / f"file{i}.bin").write_bytes(bytes([i]) * size)
+        yield root
+
+
+class TestInterleave:
+    """Test cases for spreading large files among small ones."""
+    
+    def test_spreads_evenly(self):
+        """Test that large items are spaced out and both lists keep their order."""
+        merged = interleave(list('abcdef'), [1, 2])
+        
+        assert merged == [1, 'a', 'b', 'c', 2, 'd', 'e', 'f']
+    
+    def test_one_list_empty(self):
+        """Test that an empty list leaves the other unchanged."""
+        assert interleave([], [1, 2]) == [1, 2]
+        assert interleave(['a'], []) == ['a']
+
+
+class TestOrderFiles:
+    """Test cases for ordering files by their layout."""
+    
+    def test_walk_order_is_lazy(self):
+        """Test that walk order hashes files while walking."""
+        def files():
+            yield 'a', Path('a'), [0, 2, 10, 0, 0]
+            raise AssertionError("walked ahead")
+        
+        ordered = order_files(files(), 'walk')
+        assert next(ordered) == ('a', Path('a'))
+    
+    def test_inode_order(self, tree):
+        """Test that inode order sorts by device and inode."""
+        files = list(iter_files(tree))
+        
+        ordered = [key for key, _ in order_files(files, 'inode')]
+        
+        inodes = {key: (fingerprint[0], fingerprint[1]) for key, _, fingerprint in files}
+        assert ordered == sorted(inodes, key=inodes.get)
+    
+    def test_physical_order(self, tree):
+        """Test that physical order sorts by the offset of the first extent."""
+        files = list(iter_files(tree))
+        try:
+            offsets = {key: physical_offset(path) for key, path, _ in files}
+        except OSError:
+            pytest.skip("FIEMAP is not supported here")
+        
+        ordered = [key for key, _ in order_files(files, 'physical')]
+        
+        mapped = [key for key in ordered if offsets[key] is not None]
+        assert mapped == sorted(mapped, key=offsets.get)
+        # Files without a mapped extent follow the mapped ones
+        assert ordered[:len(mapped)] == mapped
+    
+    def test_large_files_interleaved(self, tree):
+        """Test that with several workers large files are spread out."""
+        files = list(iter_files(tree))
+        
+        ordered = [key for key, _ in order_files(files, 'inode', workers=4)]
+        
+        sizes = {key: fingerprint[2] for key, _, fingerprint in files}
+        large = [i for i, key in enumerate(ordered) if sizes[key] >= LARGE_FILE_SIZE]
+        assert sorted(ordered) == sorted(sizes)
+        assert len(large) == 4
+        assert min(b - a for a, b in zip(large, large[1:])) >= 9
+    
+    def test_unknown_order(self):
+        """Test that unknown orders are rejected."""
+        with pytest.raises(ValueError):
+            order_files([], 'random')
+    
+    @pytest.mark.parametrize("scan_order", SCAN_ORDERS)
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_results_unchanged(self, tree, scan_order, workers):
+        """Test that the scan order doesn't change the baseline."""
+        expected = scan_baseline(tree, ScanOptions(precheck=True))
+        
+        data = scan_baseline(tree, ScanOptions(workers=workers, precheck=True,
+                                               scan_order=scan_order))
+        
+        assert dict(data.hashes) == dict(expected.hashes)
+        assert data.checksums == expected.checksums
+        assert data.stats == expected.stats
+        assert data.tree == expected.tree
+    
+    @pytest.mark.parametrize("scan_order", SCAN_ORDERS)
+    def test_verify_finds_changes(self, tree, scan_order):
+        """Test that verifying in layout order reports the same differences."""
+        data = scan_baseline(tree)
+        (tree / 'dir1' / 'file5.bin').write_bytes(b'changed')
+        (tree / 'dir2' / 'extra.bin').write_bytes(b'new')
+        os.remove(tree / 'dir3' / 'file7.bin')
+        
+        results = verify_tree(tree, data, ScanOptions(workers=4, scan_order=scan_order))
+        
+        assert sorted((result.status, result.path) for result in results) == [
+            ('EXTRA', os.path.join('dir2', 'extra.bin')),
+            ('MISSING', os.path.join('dir3', 'file7.bin')),
+            ('MODIFIED', os.path.join('dir1', 'file5.bin')),
+        ]
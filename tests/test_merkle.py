@@ -0,0 +1,137 @@
+"""Tests for merkle module."""
+
+import hashlib
+import os
+import random
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim.baseline import load_baseline_data, save_baseline_data
+from fim.merkle import (
+    ROOT, baseline_events, build_tree, diff_baselines, iter_sorted, merge_diff,
+)
+from fim.models import BaselineData
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _hashes() -> dict:
+    """Create a baseline whose paths sort differently as strings and as trees."""
+    paths = [
+        "a.txt", "a", "b/c.txt", "b/c/d.txt", "b/c/e/f.txt", "b/c.d/g.txt",
+        "b/c0.txt", "b/café.txt", "z/y/x/w.txt",
+    ]
+    return {path.replace("/", os.sep): _digest(path) for path in paths}
+
+
+def _expected_diff(old: dict, new: dict) -> list:
+    """Compare two baselines entry by entry."""
+    changes = [
+        (path, old.get(path), new.get(path))
+        for path in old.keys() | new.keys() if old.get(path) != new.get(path)
+    ]
+    return sorted(changes, key=lambda change: change[0].encode("utf-8", "surrogateescape"))
+
+
+class TestMerkleTree:
+    """Test cases for building Merkle directory trees."""
+
+    def test_build_tree(self):
+        """Test that every directory gets a digest that covers its subtree."""
+        hashes = _hashes()
+        tree = build_tree(hashes)
+
+        assert set(tree) == {
+            ROOT, "b", os.path.join("b", "c"), os.path.join("b", "c", "e"),
+            os.path.join("b", "c.d"), "z", os.path.join("z", "y"), os.path.join("z", "y", "x"),
+        }
+
+        changed = dict(hashes)
+        changed[os.path.join("b", "c", "e", "f.txt")] = _digest("changed")
+        changed_tree = build_tree(changed)
+
+        differing = {directory for directory in tree if tree[directory] != changed_tree[directory]}
+        assert differing == {ROOT, "b", os.path.join("b", "c"), os.path.join("b", "c", "e")}
+
+    def test_build_tree_is_order_independent(self):
+        """Test that insertion order doesn't change the digests."""
+        items = list(_hashes().items())
+        random.Random(1).shuffle(items)
+
+        assert build_tree(dict(items)) == build_tree(_hashes())
+        assert build_tree({}) == {ROOT: hashlib.sha256().hexdigest()}
+
+    def test_build_tree_moved_file(self):
+        """Test that moving a file to another directory changes the root digest."""
+        hashes = {os.path.join("a", "x"): _digest("x"), os.path.join("b", "y"): _digest("y")}
+        moved = {os.path.join("b", "x"): _digest("x"), os.path.join("b", "y"): _digest("y")}
+
+        assert build_tree(hashes)[ROOT] != build_tree(moved)[ROOT]
+
+
+class TestDiffBaselines:
+    """Test cases for comparing baselines."""
+
+    def _mutate(self, hashes: dict, seed: int) -> dict:
+        """Apply random additions, modifications, deletions and file/directory swaps."""
+        rng = random.Random(seed)
+        changed = dict(hashes)
+        for path in rng.sample(sorted(hashes), 3):
+            if rng.random() < 0.5:
+                del changed[path]
+            else:
+                changed[path] = _digest(path + "changed")
+        changed[os.path.join("b", "new", "file.txt")] = _digest("new")
+        changed[os.path.join("a", "now-a-directory.txt")] = _digest("swap")
+        changed.pop("a", None)
+        return changed
+
+    @pytest.mark.parametrize("suffix", [".json", ".fimb"])
+    def test_diff_matches_entry_comparison(self, suffix):
+        """Test that pruned comparisons find exactly the differing paths, in path order."""
+        old_hashes = _hashes()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for seed in range(5):
+                new_hashes = self._mutate(old_hashes, seed)
+                old_path = Path(temp_dir) / f"old{seed}{suffix}"
+                new_path = Path(temp_dir) / f"new{seed}{suffix}"
+                save_baseline_data(BaselineData(hashes=old_hashes), old_path)
+                save_baseline_data(BaselineData(hashes=new_hashes), new_path)
+
+                old, new = load_baseline_data(old_path), load_baseline_data(new_path)
+                assert old.tree and new.tree
+                assert list(diff_baselines(old, new)) == _expected_diff(old_hashes, new_hashes)
+                assert list(diff_baselines(old, old)) == []
+
+                if suffix == ".fimb":
+                    old.hashes.close()
+                    new.hashes.close()
+
+    def test_diff_without_tree_merges(self):
+        """Test that baselines without a tree are compared entry by entry."""
+        old_hashes = _hashes()
+        new_hashes = self._mutate(old_hashes, 7)
+
+        changes = list(diff_baselines(BaselineData(hashes=old_hashes), BaselineData(hashes=new_hashes)))
+
+        assert changes == _expected_diff(old_hashes, new_hashes)
+        assert list(merge_diff(iter_sorted(old_hashes), iter_sorted(new_hashes))) == changes
+
+    def test_baseline_events(self):
+        """Test that differences become events in the journal schema."""
+        old = BaselineData(hashes={"a": _digest("a"), "b": _digest("b")})
+        new = BaselineData(hashes={"b": _digest("changed"), "c": _digest("c")})
+
+        events = list(baseline_events(old, new, "2025-01-15T10:30:00"))
+
+        assert [(event.type, event.path) for event in events] == [
+            ("DELETED", "a"), ("MODIFIED", "b"), ("ADDED", "c"),
+        ]
+        assert events[1].old_hash == _digest("b")
+        assert events[1].new_hash == _digest("changed")
+        assert all(event.timestamp == "2025-01-15T10:30:00" for event in events)
@@ -0,0 +1,180 @@
+"""Tests for metrics module."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from watchdog.events import FileCreatedEvent
+
+from fim.baseline import scan_baseline
+from fim.metrics import (
+    BYTES_HASHED, FILES_HASHED, FILES_WALKED, HASH_SECONDS, PHASE_SECONDS, REGISTRY,
+    WATCH_EVENTS, Metric, MetricsRegistry,
+)
+from fim.models import ScanOptions, WatchOptions
+from fim.watcher import WatchSession
+
+
+@pytest.fixture
+def registry():
+    """Enable the process-wide registry for one test, leaving it clean and disabled."""
+    REGISTRY.reset()
+    REGISTRY.enable()
+    yield REGISTRY
+    REGISTRY.enabled = False
+    REGISTRY.reset()
+
+
+class TestMetric:
+    """Test cases for counters, gauges and histograms."""
+    
+    def test_counter_with_label(self):
+        """Test that labelled values are kept apart."""
+        metric = Metric('fim_test_total', 'counter', 'Test counter', label='type')
+        metric.inc(label='ADDED')
+        metric.inc(2, label='ADDED')
+        metric.inc(label='DELETED')
+        
+        assert metric.value('ADDED') == 3
+        assert metric.value('DELETED') == 1
+        assert metric.value('MODIFIED') == 0
+        assert list(metric.samples()) == [
+            'fim_test_total{type="ADDED"} 3',
+            'fim_test_total{type="DELETED"} 1',
+        ]
+    
+    def test_unknown_kind(self):
+        """Test that unknown metric kinds are rejected."""
+        with pytest.raises(ValueError):
+            Metric('fim_test', 'summary', 'Test')
+    
+    def test_histogram_quantiles(self):
+        """Test that quantiles are estimated as bucket upper bounds."""
+        metric = Metric('fim_test_seconds', 'histogram', 'Test histogram', buckets=(0.1, 1.0))
+        assert metric.quantile(0.5) is None
+        
+        for value in (0.05, 0.05, 0.05, 0.5, 2.0):
+            metric.observe(value)
+        
+        assert metric.count() == 5
+        assert metric.total() == pytest.approx(2.65)
+        assert metric.quantile(0.5) == 0.1
+        assert metric.quantile(0.8) == 1.0
+        assert metric.quantile(0.99) == float('inf')
+    
+    def test_histogram_samples(self):
+        """Test that histograms are written with cumulative buckets, sum and count."""
+        metric = Metric('fim_test_seconds', 'histogram', 'Test histogram', buckets=(0.1, 1.0))
+        metric.observe(0.05)
+        metric.observe(0.5)
+        
+        assert list(metric.samples()) == [
+            'fim_test_seconds_bucket{le="0.1"} 1',
+            'fim_test_seconds_bucket{le="1"} 2',
+            'fim_test_seconds_bucket{le="+Inf"} 2',
+            'fim_test_seconds_sum 0.55',
+            'fim_test_seconds_count 2',
+        ]
+
+
+class TestMetricsRegistry:
+    """Test cases for the registry and its Prometheus output."""
+    
+    def test_prometheus_text(self):
+        """Test that metrics with values are written with HELP and TYPE lines."""
+        registry = MetricsRegistry()
+        registry.metric('fim_depth', 'gauge', 'Queue depth').set(7)
+        registry.metric('fim_unused_total', 'counter', 'Never recorded')
+        
+        text = registry.to_prometheus()
+        
+        assert '# HELP fim_depth Queue depth\n# TYPE fim_depth gauge\nfim_depth 7\n' in text
+        assert 'fim_unused_total' not in text
+    
+    def test_write_prometheus(self):
+        """Test that the text file is written in place without leftovers."""
+        registry = MetricsRegistry()
+        registry.metric('fim_depth', 'gauge', 'Queue depth').set(3)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'textfile' / 'fim.prom'
+            registry.write_prometheus(path)
+            
+            assert path.read_text(encoding='utf-8') == registry.to_prometheus()
+            assert [p.name for p in path.parent.iterdir()] == ['fim.prom']
+    
+    def test_phase_only_when_enabled(self):
+        """Test that phases are timed only while the registry is enabled."""
+        registry = MetricsRegistry()
+        with registry.phase('scan'):
+            pass
+        assert registry.phase_seconds.labels() == []
+        
+        registry.enable()
+        with registry.phase('scan'):
+            pass
+        assert registry.phase_seconds.labels() == ['scan']
+    
+    def test_merge(self):
+        """Test that state from another registry adds counters and histograms."""
+        registry = MetricsRegistry()
+        worker = MetricsRegistry()
+        for target in (registry, worker):
+            target.metric('fim_files_total', 'counter', 'Files').inc(2)
+            target.metric('fim_seconds', 'histogram', 'Seconds').observe(0.01)
+        worker.metric('fim_depth', 'gauge', 'Queue depth').set(5)
+        
+        registry.merge(worker.state())
+        
+        assert registry.metric('fim_files_total', 'counter', 'Files').value() == 4
+        assert registry.metric('fim_seconds', 'histogram', 'Seconds').count() == 2
+        # Metrics the registry doesn't know are ignored
+        assert 'fim_depth' not in registry.to_prometheus()
+
+
+class TestInstrumentation:
+    """Test cases for the metrics recorded while scanning and watching."""
+    
+    def _make_tree(self, root: Path, count: int) -> int:
+        """Create files of distinct sizes and return their total size."""
+        for i in range(count):
+            (root / f"file{i}.txt").write_bytes(b'x' * (i + 1) * 100)
+        return sum((i + 1) * 100 for i in range(count))
+    
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_scan_records_hashes(self, registry, use_processes):
+        """Test that scans count walked and hashed files, also from worker processes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            total = self._make_tree(root, 10)
+            
+            scan_baseline(root, ScanOptions(workers=2, use_processes=use_processes))
+        
+        assert FILES_WALKED.value() == 10
+        assert FILES_HASHED.value() == 10
+        assert BYTES_HASHED.value() == total
+        assert HASH_SECONDS.count() == 10
+        assert {'scan', 'tree'} <= set(PHASE_SECONDS.labels())
+    
+    def test_watch_records_counters_on_stop(self, registry):
+        """Test that stopping a watch fills the watcher counters without an exporter."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            session = WatchSession(root, {}, options=WatchOptions())
+            session.start()
+            (root / "new.txt").write_text("new")
+            session.event_handler.on_created(FileCreatedEvent(str(root / "new.txt")))
+            session.stop()
+        
+        assert WATCH_EVENTS.value() >= 1
+    
+    def test_disabled_registry_records_nothing(self):
+        """Test that nothing is recorded while the registry is disabled."""
+        REGISTRY.reset()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            self._make_tree(root, 3)
+            scan_baseline(root)
+        
+        assert FILES_HASHED.value() == 0
+        assert PHASE_SECONDS.labels() == []
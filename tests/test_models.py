@@ -0,0 +1,62 @@
+"""Tests for models module."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from fim.models import Event, format_timestamp
+
+
+HASH = "ab" * 32
+
+
+class TestEvent:
+    """Test cases for the compact Event representation."""
+
+    @pytest.mark.parametrize("timestamp", [
+        "2025-01-15T08:00:00",
+        "2025-01-15T08:00:00.123456",
+        "2025-01-15T08:00:00.000000",
+        "2025-01-15 08:00:00",
+        "not a timestamp",
+    ])
+    def test_round_trip_preserves_timestamp(self, timestamp):
+        """Test that to_dict returns timestamps exactly as given."""
+        data = {"type": "MODIFIED", "path": "etc/hosts", "old_hash": HASH,
+                "new_hash": HASH.upper(), "timestamp": timestamp}
+
+        event = Event.from_dict(json.loads(json.dumps(data)))
+
+        assert event.to_dict() == data
+        assert Event.from_dict(event.to_dict()) == event
+
+    def test_compact_storage(self):
+        """Test that types, hashes and timestamps are stored compactly."""
+        event = Event(type="ADDED", path="etc/hosts", new_hash=HASH,
+                      timestamp="2025-01-15T08:00:00.5")
+
+        assert not hasattr(event, "__dict__")
+        assert event.new_hash == HASH
+        assert event.old_hash is None
+        assert event.timestamp == "2025-01-15T08:00:00.5"
+        assert event.timestamp_ns is None
+
+        event.timestamp = "2025-01-15T08:00:00.500000"
+        assert event.timestamp_ns == int(datetime(2025, 1, 15, 8, 0, 0, 500000).timestamp() * 1e9)
+        assert format_timestamp(event.timestamp_ns) == "2025-01-15T08:00:00.500000"
+
+    def test_default_timestamp(self):
+        """Test that events default to the current time."""
+        before = datetime.now().isoformat()
+        event = Event(type="DELETED", path="README")
+
+        assert before <= event.timestamp <= datetime.now().isoformat()
+        assert event.timestamp_ns is not None
+
+    def test_unknown_type_kept(self):
+        """Test that unknown event types are kept as strings."""
+        event = Event(type="RENAMED", path="a")
+
+        assert event.type == "RENAMED"
+        assert event.to_dict()["type"] == "RENAMED"
@@ -0,0 +1,128 @@
+"""Tests for pagecache module."""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim.hasher import file_block_digests, file_digests, file_sha256
+from fim.pagecache import (
+    CACHE_MODES, cache_modes_supported, drop_pages, read_direct, resident_pages,
+)
+
+pytestmark = pytest.mark.skipif(not cache_modes_supported(), reason="needs posix_fadvise()")
+
+
+def _residency(path: Path) -> bytearray:
+    """Get the page residency of a file, skipping if it can't be determined."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        resident = resident_pages(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    if resident is None:
+        pytest.skip("mincore() is not available")
+    return resident
+
+
+def _evict(path: Path) -> None:
+    """Drop a file from the page cache."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+@pytest.fixture
+def data_file():
+    """A 3 MiB file of distinct pages, not ending on a page boundary."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "data.bin"
+        path.write_bytes(os.urandom(3 * 1024 * 1024 + 123))
+        yield path
+
+
+class TestCacheModes:
+    """Test cases for hashing without polluting the page cache."""
+    
+    @pytest.mark.parametrize("cache_mode", CACHE_MODES)
+    def test_digests_match(self, data_file, cache_mode):
+        """Test that every cache mode computes the same digests."""
+        expected = file_digests(data_file, ('sha256', 'crc32'))
+        
+        assert file_digests(data_file, ('sha256', 'crc32'), cache_mode=cache_mode) == expected
+        assert file_block_digests(data_file, block_size=1 << 20, workers=2,
+                                  cache_mode=cache_mode) == \
+            file_block_digests(data_file, block_size=1 << 20)
+    
+    def test_unknown_cache_mode(self, data_file):
+        """Test that unknown cache modes are rejected."""
+        with pytest.raises(ValueError):
+            file_digests(data_file, ('sha256',), cache_mode='bypass')
+    
+    def test_drop_evicts_pages_it_read(self, data_file):
+        """Test that drop mode leaves a cold file out of the page cache."""
+        _evict(data_file)
+        if any(_residency(data_file)):
+            pytest.skip("file system keeps pages cached")
+        
+        file_sha256(data_file)
+        assert any(_residency(data_file))
+        
+        _evict(data_file)
+        file_digests(data_file, ('sha256',), cache_mode='drop')
+        assert not any(_residency(data_file))
+    
+    def test_drop_keeps_pages_cached_before(self, data_file):
+        """Test that drop mode doesn't evict pages another reader had cached."""
+        _evict(data_file)
+        fd = os.open(data_file, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_RANDOM)
+            os.pread(fd, 4096, 1 << 20)
+        finally:
+            os.close(fd)
+        before = _residency(data_file)
+        if not before[256] or sum(before) > 64:
+            pytest.skip("file system doesn't cache single pages")
+        
+        file_digests(data_file, ('sha256',), cache_mode='drop')
+        
+        after = _residency(data_file)
+        assert after[256]
+        assert sum(after) <= sum(before)
+    
+    def test_direct_short_reads(self, data_file, monkeypatch):
+        """Test that direct reads resume after short reads instead of stopping early."""
+        preadv = os.preadv
+        
+        def short_preadv(fd, buffers, offset):
+            # Report partial reads ending mid-page, as an interrupted read may
+            return min(preadv(fd, buffers, offset), 100_000)
+        
+        monkeypatch.setattr(os, 'preadv', short_preadv)
+        hash_obj = hashlib.sha256()
+        fd = os.open(data_file, os.O_RDONLY)
+        try:
+            read_direct(fd, [hash_obj])
+        finally:
+            os.close(fd)
+        
+        assert hash_obj.hexdigest() == file_sha256(data_file)
+    
+    def test_drop_pages_without_residency(self, data_file):
+        """Test that without a residency snapshot the whole range is evicted."""
+        file_sha256(data_file)
+        fd = os.open(data_file, os.O_RDONLY)
+        try:
+            # Dirty pages can't be dropped until they are written back
+            os.fsync(fd)
+            drop_pages(fd, None, 0, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        
+        assert not any(_residency(data_file))
@@ -1,11 +1,13 @@
 """Tests for reporter module."""
 
+import json
 import tempfile
 from pathlib import Path
 from datetime import datetime
 import pytest
 
-from fim.reporter import render_report
+from fim.journal import EventJournal
+from fim.reporter import page_path, render_report, render_report_file, sidecar_path
 from fim.models import Event
 
 
@@ -209,3 +211,60 @@ class TestReporter:
             
         finally:
             output_path.unlink()
+
+    def _events(self, count: int) -> list:
+        """Create a list of distinct events."""
+        return [
+            Event(type="ADDED", path=f"file{i:04d}.txt", new_hash=f"hash{i}",
+                  timestamp="2025-01-15T10:30:00")
+            for i in range(count)
+        ]
+    
+    def test_render_report_paginated(self):
+        """Test that the event table is split into linked pages."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "report.html"
+            
+            pages = render_report(self._events(25), output_path, page_size=10)
+            
+            assert pages == [page_path(output_path, n) for n in (1, 2, 3)]
+            assert pages[1].name == "report-2.html"
+            first, last = pages[0].read_text(), pages[2].read_text()
+            assert "<strong>file0009.txt</strong>" in first
+            assert "<strong>file0010.txt</strong>" not in first
+            assert "<strong>file0024.txt</strong>" in last
+            assert "<strong>file0019.txt</strong>" not in last
+            assert 'href="report-2.html"' in first and 'href="report.html"' in last
+            assert "Showing events 21 to 25 of 25" in last
+            assert not sidecar_path(output_path).exists()
+    
+    def test_render_report_row_cap_writes_sidecar(self):
+        """Test that rows beyond max_rows only go to the lazily loaded sidecar."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "report.html"
+            
+            render_report(self._events(30), output_path, max_rows=5)
+            
+            content = output_path.read_text()
+            assert "<strong>file0004.txt</strong>" in content
+            assert "<strong>file0005.txt</strong>" not in content
+            assert 'data-sidecar="report.events.js"' in content
+            
+            sidecar = sidecar_path(output_path).read_text()
+            assert sidecar.startswith("fimLoadEvents([")
+            assert sidecar.rstrip().endswith("]);")
+            data = json.loads(sidecar.strip()[len("fimLoadEvents("):-len(");")])
+            assert [event["path"] for event in data] == [f"file{i:04d}.txt" for i in range(30)]
+    
+    def test_render_report_from_journal(self):
+        """Test that reports stream events from a journal file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            events_path = Path(temp_dir) / "events.jsonl"
+            with EventJournal(events_path) as journal:
+                journal.extend(self._events(12))
+            output_path = Path(temp_dir) / "report.html"
+            
+            pages = render_report_file(events_path, output_path, page_size=5)
+            
+            assert len(pages) == 3
+            assert "<h3>12</h3>" in output_path.read_text()
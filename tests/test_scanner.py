@@ -0,0 +1,53 @@
+"""Tests for scanner module."""
+
+import tempfile
+from pathlib import Path
+
+from fim.baseline import build_baseline
+from fim.hasher import file_sha256
+from fim.models import ScanOptions
+from fim.scanner import hash_files
+
+
+class TestScanner:
+    """Test cases for the parallel hashing engine."""
+    
+    def _make_tree(self, root: Path, count: int) -> None:
+        """Create a small tree of files with distinct contents."""
+        for i in range(count):
+            subdir = root / f"dir{i % 5}"
+            subdir.mkdir(exist_ok=True)
+            (subdir / f"file{i}.txt").write_text(f"content {i}" * (i + 1))
+    
+    def test_hash_files_preserves_order(self):
+        """Test that parallel results come back in input order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path, 50)
+            
+            items = [(str(p), p) for p in sorted(temp_path.rglob('*.txt'))]
+            results = list(hash_files(items, ScanOptions(workers=4)))
+            
+            assert [key for key, _ in results] == [key for key, _ in items]
+            for key, hash_value in results:
+                assert hash_value == file_sha256(Path(key))
+    
+    def test_hash_files_missing_file(self):
+        """Test that unreadable files yield None instead of raising."""
+        items = [("missing", Path("/this/file/does/not/exist.txt"))]
+        results = list(hash_files(items, ScanOptions(workers=2)))
+        assert results == [("missing", None)]
+    
+    def test_build_baseline_parallel_matches_serial(self):
+        """Test that thread and process pools produce the serial baseline."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path, 120)
+            
+            serial = build_baseline(temp_path)
+            threaded = build_baseline(temp_path, ScanOptions(workers=8))
+            processes = build_baseline(temp_path, ScanOptions(workers=2, use_processes=True))
+            
+            assert len(serial) == 120
+            assert threaded == serial
+            assert processes == serial
@@ -0,0 +1,131 @@
+"""Tests for throttle module."""
+
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from fim import throttle as throttle_module
+from fim.hasher import file_sha256
+from fim.models import ScanOptions, ThrottleOptions
+from fim.scanner import hash_files
+from fim.throttle import MIN_PACE, THROTTLE, Throttle, TokenBucket, parse_size
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the sleeps of the throttle instead of sleeping."""
+    recorded = []
+    monkeypatch.setattr(throttle_module.time, 'sleep', recorded.append)
+    return recorded
+
+
+@pytest.fixture
+def process_throttle():
+    """Lift the process-wide limits after a test."""
+    yield THROTTLE
+    THROTTLE.configure(ThrottleOptions())
+
+
+class TestParseSize:
+    """Test cases for byte counts given on the command line."""
+    
+    def test_units(self):
+        """Test plain numbers and binary suffixes."""
+        assert parse_size('1000') == 1000
+        assert parse_size('512k') == 512 * 1024
+        assert parse_size('50M') == 50 * 1024 ** 2
+        assert parse_size('1.5GB') == 1.5 * 1024 ** 3
+    
+    @pytest.mark.parametrize("text", ['', 'fast', '-5M', 'nan'])
+    def test_invalid(self, text):
+        """Test that malformed and negative sizes are rejected."""
+        with pytest.raises(ValueError):
+            parse_size(text)
+
+
+class TestTokenBucket:
+    """Test cases for the rate limiter."""
+    
+    def test_debt(self):
+        """Test that taking more than the burst returns the time to pay it back."""
+        bucket = TokenBucket(rate=100, burst=10)
+        
+        assert bucket.take(10) == 0
+        assert bucket.take(50) == pytest.approx(0.5, abs=0.01)
+        # Later callers queue up behind the debt
+        assert bucket.take(50) == pytest.approx(1.0, abs=0.01)
+
+
+class TestThrottle:
+    """Test cases for pacing hashing threads."""
+    
+    def test_inactive_by_default(self):
+        """Test that no limits means an inactive throttle."""
+        throttle = Throttle()
+        assert not throttle.active
+        
+        throttle.configure(ThrottleOptions(max_files_per_s=10))
+        assert throttle.active
+        
+        throttle.configure(ThrottleOptions())
+        assert not throttle.active
+    
+    @pytest.mark.parametrize("options", [
+        ThrottleOptions(max_bytes_per_s=-1),
+        ThrottleOptions(cpu_share=1.5),
+    ])
+    def test_invalid_limits(self, options):
+        """Test that impossible limits are rejected."""
+        with pytest.raises(ValueError):
+            Throttle().configure(options)
+    
+    def test_cpu_share(self, sleeps):
+        """Test that busy time is followed by enough idle time to keep the share."""
+        throttle = Throttle()
+        throttle.configure(ThrottleOptions(cpu_share=0.25))
+        
+        throttle.consumed(1024, read_seconds=0.001, cpu_seconds=0.01)
+        
+        assert sleeps == [pytest.approx(0.03)]
+    
+    def test_adaptive_backoff(self, sleeps, monkeypatch):
+        """Test that slow reads lower the pace and fast reads raise it again."""
+        clock = [0.0]
+        monkeypatch.setattr(throttle_module.time, 'monotonic', lambda: clock[0])
+        throttle = Throttle()
+        throttle.configure(ThrottleOptions(max_read_latency=0.01))
+        
+        for _ in range(10):
+            clock[0] += 1
+            throttle.consumed(1024, read_seconds=0.1, cpu_seconds=0)
+        assert throttle.pace == MIN_PACE
+        # Reads sleep long enough to only use the pace's share of the time
+        assert sleeps[-1] == pytest.approx(0.1 * (1 / MIN_PACE - 1))
+        
+        for _ in range(100):
+            clock[0] += 1
+            throttle.consumed(1024, read_seconds=0.001, cpu_seconds=0)
+        assert throttle.pace == 1.0
+    
+    def test_byte_rate_limits_hashing(self, process_throttle):
+        """Test that a byte rate limit slows hashing down without changing results."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for i in range(4):
+                path = Path(temp_dir) / f"file{i}.bin"
+                path.write_bytes(bytes([i]) * 100_000)
+                paths.append(path)
+            items = [(str(path), path) for path in paths]
+            
+            process_throttle.configure(ThrottleOptions(max_bytes_per_s=1_000_000))
+            start = time.monotonic()
+            results = list(hash_files(items, ScanOptions(workers=2)))
+            elapsed = time.monotonic() - start
+            
+            # 400 kB at 1 MB/s, less the initial burst of 250 kB
+            assert elapsed >= 0.14
+            assert [hash_value for _, hash_value in results] == [
+                file_sha256(path) for path in paths
+            ]
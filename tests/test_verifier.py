@@ -0,0 +1,171 @@
+"""Tests for verifier module."""
+
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from fim.baseline import scan_baseline
+from fim.hasher import file_hash
+from fim.models import ScanOptions
+from fim.verifier import TreeVerifier, verify_tree
+
+
+class TestVerifier:
+    """Test cases for single-pass verification."""
+    
+    def _make_tree(self, root: Path) -> None:
+        """Create a small tree of files."""
+        (root / "keep.txt").write_text("keep")
+        (root / "change.txt").write_text("before")
+        (root / "remove.txt").write_text("remove")
+        (root / "subdir").mkdir()
+        (root / "subdir" / "nested.txt").write_text("nested")
+    
+    def test_verify_tree_clean(self):
+        """Test that an unchanged tree produces no results."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            data = scan_baseline(temp_path)
+            
+            assert list(verify_tree(temp_path, data)) == []
+    
+    def test_verify_tree_reports_all_differences(self):
+        """Test that modified, missing and extra files are reported."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            data = scan_baseline(temp_path)
+            baseline = data.hashes
+            
+            (temp_path / "change.txt").write_text("after")
+            (temp_path / "remove.txt").unlink()
+            (temp_path / "subdir" / "extra.txt").write_text("extra")
+            
+            results = list(verify_tree(temp_path, data, ScanOptions(workers=4)))
+            by_status = {result.status: result for result in results}
+            
+            assert len(results) == 3
+            assert by_status["MODIFIED"].path == "change.txt"
+            assert by_status["MODIFIED"].expected_hash == baseline["change.txt"]
+            assert by_status["MISSING"].path == "remove.txt"
+            assert by_status["EXTRA"].path == str(Path("subdir") / "extra.txt")
+            assert by_status["EXTRA"].actual_hash is None
+    
+    def test_verify_tree_hashes_each_file_once(self):
+        """Test that baseline files are hashed once and extra files not at all."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            data = scan_baseline(temp_path)
+            (temp_path / "extra.txt").write_text("extra")
+            
+            with mock.patch("fim.scanner.file_hash", return_value="0" * 64) as hasher:
+                verifier = TreeVerifier(temp_path, data)
+                list(verifier.results())
+            
+            assert hasher.call_count == len(data.hashes)
+            assert verifier.files_hashed == len(data.hashes)
+            assert verifier.files_seen == len(data.hashes) + 1
+    
+    def test_verify_tree_trust_stat(self):
+        """Test that trusted files with unchanged fingerprints are not hashed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            data = scan_baseline(temp_path)
+            (temp_path / "change.txt").write_text("after, and longer")
+            
+            verifier = TreeVerifier(temp_path, data, ScanOptions(trust_stat=True))
+            results = list(verifier.results())
+            
+            assert [result.path for result in results] == ["change.txt"]
+            assert verifier.files_hashed == 1
+            assert verifier.files_trusted == len(data.hashes) - 1
+
+    def test_verify_tree_uses_baseline_algorithm_and_precheck(self):
+        """Test that the recorded algorithm is used and a changed CRC32 skips hashing."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            data = scan_baseline(temp_path, ScanOptions(algorithm="sha512", precheck=True))
+            (temp_path / "change.txt").write_text("after")
+            
+            # Options asking for another algorithm are overridden by the header
+            options = ScanOptions(algorithm="blake2b", precheck=True)
+            verifier = TreeVerifier(temp_path, data, options)
+            results = list(verifier.results())
+            
+            assert [result.path for result in results] == ["change.txt"]
+            assert results[0].actual_hash is None
+            assert verifier.files_prechecked == 1
+    
+    def test_verify_tree_precheck_match_is_not_trusted(self):
+        """Test that a file whose CRC32 matches is still hashed in full."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            data = scan_baseline(temp_path, ScanOptions(algorithm="sha512", precheck=True))
+            (temp_path / "change.txt").write_text("after")
+            # Stands in for a forged CRC32 collision
+            data.checksums["change.txt"] = file_hash(temp_path / "change.txt", "crc32")
+            
+            verifier = TreeVerifier(temp_path, data, ScanOptions(precheck=True))
+            results = list(verifier.results())
+            
+            assert [result.path for result in results] == ["change.txt"]
+            assert results[0].actual_hash == file_hash(temp_path / "change.txt", "sha512")
+            assert verifier.files_prechecked == 0
+    
+    def test_verify_tree_quick_samples_large_files(self):
+        """Test that large files with unchanged fingerprints are not hashed fully."""
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch("fim.baseline.QUICK_MIN_SIZE", 1024):
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            (temp_path / "big.img").write_bytes(b"\0" * 4 * 1024 * 1024)
+            (temp_path / "grown.img").write_bytes(b"\0" * 2048)
+            data = scan_baseline(temp_path, ScanOptions(quick=True))
+            
+            assert set(data.fingerprints) == {"big.img", "grown.img"}
+            assert data.tier("big.img") == "sampled"
+            assert data.tier("keep.txt") == "full"
+            assert data.quick["min_size"] == 1024
+            
+            with open(temp_path / "grown.img", "ab") as f:
+                f.write(b"more")
+            verifier = TreeVerifier(temp_path, data, ScanOptions(quick=True))
+            results = list(verifier.results())
+            
+            assert [result.path for result in results] == ["grown.img"]
+            assert verifier.sampled_paths == ["big.img"]
+            assert verifier.files_hashed == len(data.hashes) - 1
+            
+            # Without quick mode every file is hashed fully
+            verifier = TreeVerifier(temp_path, data, ScanOptions())
+            list(verifier.results())
+            assert verifier.sampled_paths == []
+            assert verifier.files_hashed == len(data.hashes)
+    
+    def test_verify_tree_block_hash_reports_changed_ranges(self):
+        """Test that block-hashed files are verified with the baseline's block layout."""
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch("fim.baseline.BLOCK_HASH_MIN_SIZE", 1024), \
+                mock.patch("fim.baseline.HASH_BLOCK_SIZE", 1024):
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            (temp_path / "big.img").write_bytes(b"\0" * 10 * 1024)
+            data = scan_baseline(temp_path, ScanOptions(block_hash=True, block_digests=True, workers=4))
+            
+            assert data.block_hash == {"block_size": 1024, "min_size": 1024}
+            assert list(data.blocks) == ["big.img"] and len(data.blocks["big.img"]) == 10
+            assert list(verify_tree(temp_path, data)) == []
+            
+            with open(temp_path / "big.img", "r+b") as f:
+                f.seek(3000)
+                f.write(b"x" * 2000)
+            results = list(verify_tree(temp_path, data, ScanOptions(workers=4)))
+            
+            assert [result.path for result in results] == ["big.img"]
+            assert results[0].changed_ranges == [(2048, 5120)]
+
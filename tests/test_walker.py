@@ -0,0 +1,121 @@
+"""Tests for walker module."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from fim.baseline import scan_baseline
+from fim.walker import PathFilter, iter_files, load_config, stat_fingerprint
+
+
+def _make_tree(root: Path) -> None:
+    """Create a small tree with directories worth pruning."""
+    for rel_path in ("a.py", "b.txt", "src/c.py", "src/d.pyc",
+                     "node_modules/pkg/index.js", ".git/HEAD", "logs/app.log"):
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel_path)
+
+
+class TestWalker:
+    """Test cases for the scandir-based walker and path filters."""
+    
+    def test_walk_all_files(self):
+        """Test that every regular file is yielded with its stat fingerprint."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            _make_tree(root)
+            
+            files = {rel: (path, fp) for rel, path, fp in iter_files(root)}
+            
+            assert len(files) == 7
+            path, fingerprint = files[os.path.join("src", "c.py")]
+            assert path == root / "src" / "c.py"
+            assert fingerprint == stat_fingerprint(path.stat())
+    
+    def test_exclude_prunes_directories(self, monkeypatch):
+        """Test that excluded directories are never opened."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            _make_tree(root)
+            
+            opened = []
+            real_scandir = os.scandir
+            
+            def scandir(path):
+                opened.append(os.path.basename(path) if isinstance(path, str) else path)
+                return real_scandir(path)
+            
+            monkeypatch.setattr(os, "scandir", scandir)
+            path_filter = PathFilter(exclude=["node_modules", ".git", "*.pyc"])
+            files = sorted(Path(rel).as_posix() for rel, _, _ in iter_files(root, path_filter))
+            
+            assert files == ["a.py", "b.txt", "logs/app.log", "src/c.py"]
+            assert "node_modules" not in opened
+            assert ".git" not in opened
+    
+    def test_include_patterns(self):
+        """Test name and path include patterns."""
+        path_filter = PathFilter(include=["*.py", "logs/*.log"])
+        
+        assert path_filter.matches("a.py")
+        assert path_filter.matches("src/c.py")
+        assert path_filter.matches("logs/app.log")
+        assert not path_filter.matches("b.txt")
+        assert not path_filter.matches("src/logs/app.log")
+    
+    def test_matches_checks_parents(self):
+        """Test that paths under an excluded directory do not match."""
+        path_filter = PathFilter(exclude=["node_modules", "build/cache"])
+        
+        assert not path_filter.matches("node_modules/pkg/index.js")
+        assert not path_filter.matches("build/cache/x.o")
+        assert path_filter.matches("build/x.o")
+    
+    def test_exclude_own_files(self):
+        """Test that baseline, events and their companions are excluded."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            path_filter = PathFilter()
+            assert not path_filter
+            
+            path_filter.exclude_own_files(root, [
+                root / "baseline.json", root / "out" / "events.jsonl", Path("/elsewhere/x.json")
+            ])
+            
+            assert path_filter
+            for rel_path in ("baseline.json", "baseline.json.tmp", "baseline.json.state",
+                             "out/events.jsonl", "out/events.000003.jsonl"):
+                assert not path_filter.matches(rel_path)
+            assert path_filter.matches("baseline.txt")
+            assert path_filter.matches("out/events.json")
+    
+    def test_scan_baseline_uses_filter(self):
+        """Test that init skips excluded files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            _make_tree(root)
+            
+            data = scan_baseline(root, path_filter=PathFilter(exclude=["node_modules", ".git"]))
+            
+            assert len(data.hashes) == 5
+            assert not any(rel.startswith("node_modules") for rel in data.hashes)
+    
+    def test_load_config(self):
+        """Test reading patterns from an INI config file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Path(temp_dir) / "fim.ini"
+            config.write_text("[fim]\ninclude = *.py, *.cfg\nexclude =\n    .git\n    node_modules\n")
+            
+            assert load_config(config) == (["*.py", "*.cfg"], [".git", "node_modules"])
+    
+    def test_load_invalid_config(self):
+        """Test that malformed config files are rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Path(temp_dir) / "fim.ini"
+            config.write_text("exclude = .git\n")
+            
+            with pytest.raises(ValueError):
+                load_config(config)
@@ -0,0 +1,330 @@
+"""Tests for watcher module."""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from watchdog.events import (
+    FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent
+)
+
+from fim import watcher
+from fim.hasher import file_hash_blocks, file_sha256
+from fim.models import WatchOptions
+from fim.walker import PathFilter
+from fim.watcher import EventCoalescer, FIMEventHandler, HashWorkerPool, _save_checkpoint
+
+
+class FakeClock:
+    """Manually advanced clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestEventCoalescer:
+    """Test cases for per-path event coalescing."""
+    
+    def test_quiet_window(self):
+        """Test that a path is released only after it has been quiet."""
+        clock = FakeClock()
+        coalescer = EventCoalescer(quiet_window=1.0, max_delay=10.0, clock=clock)
+        
+        for _ in range(5):
+            coalescer.add("a.txt")
+            clock.now += 0.5
+        assert coalescer.pop_due() == []
+        
+        clock.now += 0.5
+        assert coalescer.pop_due() == ["a.txt"]
+        assert coalescer.events_received == 5
+        assert coalescer.events_coalesced == 4
+        assert len(coalescer) == 0
+    
+    def test_max_delay(self):
+        """Test that a continuously changing path is released after max_delay."""
+        clock = FakeClock()
+        coalescer = EventCoalescer(quiet_window=1.0, max_delay=3.0, clock=clock)
+        
+        released = []
+        for _ in range(20):
+            coalescer.add("log.txt")
+            clock.now += 0.5
+            released += coalescer.pop_due()
+        
+        assert released == ["log.txt"] * 3
+    
+    def test_force(self):
+        """Test that force releases every pending path in arrival order."""
+        coalescer = EventCoalescer(quiet_window=60.0, clock=FakeClock())
+        coalescer.add("b.txt")
+        coalescer.add("a.txt")
+        coalescer.add("b.txt")
+        
+        assert coalescer.pop_due() == []
+        assert coalescer.pop_due(force=True) == ["b.txt", "a.txt"]
+
+    def test_requeue(self):
+        """Test that a requeued path is due again immediately."""
+        coalescer = EventCoalescer(quiet_window=60.0, clock=FakeClock())
+        coalescer.add("a.txt")
+        assert coalescer.pop_due(force=True) == ["a.txt"]
+        
+        coalescer.requeue("a.txt")
+        assert coalescer.pop_due() == ["a.txt"]
+        assert coalescer.events_coalesced == 0
+
+
+class TestHashWorkerPool:
+    """Test cases for the sharded hashing pool."""
+    
+    def test_same_path_same_shard(self):
+        """Test that a path always maps to the same thread, preserving its order."""
+        threads = {}
+        
+        def record(path: str) -> None:
+            threads.setdefault(path, set()).add(threading.current_thread().name)
+        
+        pool = HashWorkerPool(record, workers=4)
+        for _ in range(20):
+            for i in range(10):
+                pool.submit(f"file{i}.txt")
+        pool.close()
+        
+        assert len(threads) == 10
+        assert all(len(names) == 1 for names in threads.values())
+    
+    def test_defer_when_full(self):
+        """Test that the defer policy refuses paths instead of blocking."""
+        release = threading.Event()
+        pool = HashWorkerPool(lambda path: release.wait(), workers=1,
+                              queue_size=1, backpressure='defer')
+        
+        results = [pool.submit(f"file{i}.txt") for i in range(5)]
+        assert results.count(False) >= 3
+        assert pool.deferred == results.count(False)
+        
+        release.set()
+        pool.close()
+    
+    def test_worker_errors_are_contained(self):
+        """Test that an exception in the worker does not stop the thread."""
+        done = []
+        
+        def work(path: str) -> None:
+            if path == "bad":
+                raise OSError("boom")
+            done.append(path)
+        
+        pool = HashWorkerPool(work, workers=1)
+        for path in ("bad", "good"):
+            pool.submit(path)
+        pool.close()
+        
+        assert done == ["good"]
+        assert pool.errors == 1
+    
+    def test_invalid_policy(self):
+        """Test that unknown backpressure policies are rejected."""
+        with pytest.raises(ValueError):
+            HashWorkerPool(lambda path: None, backpressure='drop')
+
+
+class TestFIMEventHandler:
+    """Test cases for the coalescing event handler."""
+    
+    def _handler(self, root: Path, baseline: dict, quiet_window: float) -> FIMEventHandler:
+        handler = FIMEventHandler(root, baseline, options=WatchOptions(quiet_window=quiet_window))
+        handler.coalescer._clock = FakeClock()
+        return handler
+    
+    def test_burst_hashed_once(self):
+        """Test that many modify events on one file lead to a single hash."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            path = root / "file.txt"
+            path.write_text("old")
+            handler = self._handler(root, {"file.txt": file_sha256(path)}, 1.0)
+            
+            for i in range(100):
+                path.write_text(f"content {i}")
+                handler.on_modified(FileModifiedEvent(str(path)))
+            handler.process_pending(force=True)
+            
+            assert handler.hashes_performed == 1
+            assert [event.type for event in handler.events] == ["MODIFIED"]
+            assert handler.baseline["file.txt"] == file_sha256(path)
+    
+    def test_transient_file_produces_no_event(self):
+        """Test that create, modify, delete within the window yields nothing."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            path = root / "tmp.swp"
+            handler = self._handler(root, {}, 1.0)
+            
+            path.write_text("x")
+            handler.on_created(FileCreatedEvent(str(path)))
+            handler.on_modified(FileModifiedEvent(str(path)))
+            path.unlink()
+            handler.on_deleted(FileDeletedEvent(str(path)))
+            handler.process_pending(force=True)
+            
+            assert handler.events == []
+            assert handler.hashes_performed == 0
+    
+    def test_atomic_replace(self):
+        """Test that a write-to-temp-then-rename save reports one modification."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            path = root / "config.ini"
+            path.write_text("a = 1")
+            handler = self._handler(root, {"config.ini": file_sha256(path)}, 1.0)
+            
+            temp = root / ".config.ini.tmp"
+            temp.write_text("a = 2")
+            handler.on_created(FileCreatedEvent(str(temp)))
+            temp.replace(path)
+            handler.on_moved(FileMovedEvent(str(temp), str(path)))
+            handler.process_pending(force=True)
+            
+            assert [(e.type, e.path) for e in handler.events] == [("MODIFIED", "config.ini")]
+            assert ".config.ini.tmp" not in handler.baseline
+    
+    def test_no_window_processes_immediately(self):
+        """Test that a zero quiet window keeps the per-event behaviour."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            path = root / "new.txt"
+            path.write_text("data")
+            handler = FIMEventHandler(root, {})
+            
+            handler.on_created(FileCreatedEvent(str(path)))
+            assert [event.type for event in handler.events] == ["ADDED"]
+            
+            path.unlink()
+            handler.on_deleted(FileDeletedEvent(str(path)))
+            assert [event.type for event in handler.events] == ["ADDED", "DELETED"]
+            assert handler.baseline == {}
+    
+    def test_inline_reconciliation_is_serialized(self, monkeypatch):
+        """Test that inline reconciliation never runs on two threads at once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            path = root / "file.txt"
+            path.write_text("data")
+            handler = FIMEventHandler(root, {})
+            
+            lock = threading.Lock()
+            active = []
+            overlaps = []
+            original_hash = handler._hash
+            
+            def slow_hash(file_path: Path):
+                with lock:
+                    active.append(file_path)
+                    overlaps.append(len(active))
+                time.sleep(0.05)
+                with lock:
+                    active.remove(file_path)
+                return original_hash(file_path)
+            
+            monkeypatch.setattr(handler, '_hash', slow_hash)
+            threads = [
+                threading.Thread(target=handler.on_modified, args=(FileModifiedEvent(str(path)),))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            assert max(overlaps) == 1
+            assert [event.type for event in handler.events] == ["ADDED"]
+    
+    def test_cache_mode_passed_to_block_hashing(self, monkeypatch):
+        """Test that block hashed baselines are rehashed with the configured cache mode."""
+        cache_modes = []
+        
+        def recording_hash_blocks(*args, **kwargs):
+            cache_modes.append(kwargs.get('cache_mode'))
+            return file_hash_blocks(*args, **kwargs)
+        
+        monkeypatch.setattr(watcher, 'file_hash_blocks', recording_hash_blocks)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            path = root / "large.bin"
+            path.write_bytes(b'x' * 3000)
+            block_hash = {'block_size': 1024, 'min_size': 2048}
+            handler = FIMEventHandler(root, {}, options=WatchOptions(cache_mode='drop'),
+                                      block_hash=block_hash)
+            
+            handler.on_created(FileCreatedEvent(str(path)))
+            
+            assert cache_modes == ['drop']
+            assert handler.baseline["large.bin"] == file_hash_blocks(path, 'sha256', 1024, 2048)
+
+    def test_hashing_pool(self):
+        """Test that events processed on hashing threads update the baseline."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            handler = FIMEventHandler(root, {}, options=WatchOptions(hash_workers=3))
+            
+            for i in range(30):
+                path = root / f"file{i}.txt"
+                path.write_text(f"data {i}")
+                handler.on_created(FileCreatedEvent(str(path)))
+            handler.close()
+            
+            assert len(handler.events) == 30
+            assert handler.baseline == {
+                f"file{i}.txt": file_sha256(root / f"file{i}.txt") for i in range(30)
+            }
+
+    def test_checkpoint_releases_events(self):
+        """Test that checkpointed events are released and failed ones kept."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            handler = FIMEventHandler(root, {})
+            saved = []
+            
+            def failing(baseline: dict, events: list) -> None:
+                raise OSError("disk full")
+            
+            def checkpoint(baseline: dict, events: list) -> None:
+                saved.append((baseline, events))
+            
+            for name in ("a.txt", "b.txt"):
+                (root / name).write_text(name)
+                handler.on_created(FileCreatedEvent(str(root / name)))
+            
+            assert not _save_checkpoint(handler, failing)
+            assert len(handler.events) == 2
+            
+            assert _save_checkpoint(handler, checkpoint)
+            assert handler.events == []
+            assert set(saved[0][0]) == {"a.txt", "b.txt"}
+            assert [event.path for event in saved[0][1]] == ["a.txt", "b.txt"]
+            
+            # Nothing new, nothing written
+            assert _save_checkpoint(handler, checkpoint)
+            assert len(saved) == 1
+
+    def test_filtered_paths_are_ignored(self):
+        """Test that events for excluded paths never reach the coalescer."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / ".git").mkdir()
+            handler = FIMEventHandler(root, {}, path_filter=PathFilter(exclude=[".git"]))
+            
+            for name in (".git/index", "kept.txt"):
+                (root / name).write_text(name)
+                handler.on_created(FileCreatedEvent(str(root / name)))
+            
+            assert handler.coalescer.events_received == 1
+            assert list(handler.baseline) == ["kept.txt"]